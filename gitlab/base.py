@@ -16,8 +16,9 @@
 # along with this program.  If not, see <http://www.gnu.org/licenses/>.
 
 import asyncio
-import importlib
+import sys
 
+from gitlab import columnar, profiling
 from gitlab.utils import awaitable_postprocess
 
 
@@ -33,6 +34,13 @@ class RESTObject:
     """
 
     _id_attr = "id"
+    _module = sys.modules[__name__]
+
+    def __init_subclass__(cls, **kwargs):
+        super().__init_subclass__(**kwargs)
+        # The module is being imported when the class is defined, so it is
+        # already registered
+        cls._module = sys.modules.get(cls.__module__)
 
     def __init__(self, manager, attrs):
         self.__dict__.update(
@@ -40,11 +48,11 @@ class RESTObject:
                 "manager": manager,
                 "_attrs": attrs,
                 "_updated_attrs": {},
-                "_module": importlib.import_module(self.__module__),
+                "_parent_attrs": manager.parent_attrs,
             }
         )
-        self.__dict__["_parent_attrs"] = self.manager.parent_attrs
-        self._create_managers()
+        for profile in profiling.active():
+            profile.object_created(type(self))
 
     @classmethod
     def create(cls, manager, attrs):
@@ -60,16 +68,22 @@ class RESTObject:
 
     def __getstate__(self):
         state = self.__dict__.copy()
-        module = state.pop("_module")
-        state["_module_name"] = module.__name__
+        # Kept so that older python-gitlab versions can load the object
+        state["_module_name"] = self._module.__name__
         return state
 
     def __setstate__(self, state):
-        module_name = state.pop("_module_name")
+        # The module is a class attribute: drop what older versions stored
+        state = state.copy()
+        state.pop("_module_name", None)
+        state.pop("_module", None)
         self.__dict__.update(state)
-        self.__dict__["_module"] = importlib.import_module(module_name)
 
     def __getattr__(self, name):
+        # Managers are created on first access, and then found in __dict__
+        if name in self._get_managers() and "manager" in self.__dict__:
+            return self._create_manager(name)
+
         try:
             return self.__dict__["_updated_attrs"][name]
         except KeyError:
@@ -131,15 +145,55 @@ class RESTObject:
             return super(RESTObject, self).__hash__()
         return hash(self.get_id())
 
+    @classmethod
+    def _get_managers(cls):
+        """Return the ``{attribute: manager class name}`` mapping of the class."""
+        try:
+            return cls.__dict__["_managers_map"]
+        except KeyError:
+            cls._managers_map = dict(getattr(cls, "_managers", None) or ())
+            return cls._managers_map
+
+    @classmethod
+    def _get_manager_class(cls, attr):
+        # Manager classes are defined after the objects in the module, so
+        # they are resolved on first use and cached on the class
+        classes = cls.__dict__.get("_manager_classes")
+        if classes is None:
+            classes = cls._manager_classes = {}
+        try:
+            return classes[attr]
+        except KeyError:
+            classes[attr] = getattr(cls._module, cls._get_managers()[attr])
+            return classes[attr]
+
+    def _create_manager(self, attr):
+        cls = self._get_manager_class(attr)
+        manager = cls(self.manager.gitlab, parent=self)
+        self.__dict__[attr] = manager
+        return manager
+
     def _create_managers(self):
-        managers = getattr(self, "_managers", None)
-        if managers is None:
-            return
+        """Create all the managers of the object (they are lazy by default)."""
+        for attr in self._get_managers():
+            if attr not in self.__dict__:
+                self._create_manager(attr)
 
-        for attr, cls_name in self._managers:
-            cls = getattr(self._module, cls_name)
-            manager = cls(self.manager.gitlab, parent=self)
-            self.__dict__[attr] = manager
+    @classmethod
+    def _get_record_class(cls):
+        """Return the compact read-only record class for this object class."""
+        try:
+            return cls.__dict__["_record_cls"]
+        except KeyError:
+            attrs = {
+                "__slots__": (),
+                "__module__": cls.__module__,
+                "_obj_cls": cls,
+                "_id_attr": cls._id_attr,
+                "_schemas": {},
+            }
+            cls._record_cls = type("%sRecord" % cls.__name__, (RESTRecord,), attrs)
+            return cls._record_cls
 
     @awaitable_postprocess
     def _update_attrs(self, new_attrs):
@@ -163,6 +217,128 @@ class RESTObject:
         return d
 
 
+def _rebuild_record(obj_cls, manager, attrs):
+    return obj_cls._get_record_class()(manager, attrs)
+
+
+class RESTRecord:
+    """Compact, read-only representation of a RESTObject.
+
+    Records are returned by ``list(compact=True)``. The server values are
+    stored in a tuple, and the attribute names in a mapping shared by all the
+    records with the same keys, so a record uses a fraction of the memory of
+    a RESTObject. Records have no nested managers and cannot be modified: use
+    :meth:`to_object` to get the full object.
+
+    A record class is generated for each RESTObject class, see
+    ``RESTObject._get_record_class()``.
+    """
+
+    __slots__ = ("manager", "_schema", "_values")
+
+    _obj_cls = None
+    _id_attr = "id"
+    _schemas = {}
+
+    def __init__(self, manager, attrs):
+        keys = tuple(attrs)
+        schema = self._schemas.get(keys)
+        if schema is None:
+            schema = self._schemas.setdefault(
+                keys, {key: i for i, key in enumerate(keys)}
+            )
+        _set_manager(self, manager)
+        _set_schema(self, schema)
+        # Identical strings (dates, states, URLs prefixes...) are shared
+        _set_values(
+            self,
+            tuple(
+                [
+                    _intern(value) if value.__class__ is str else value
+                    for value in attrs.values()
+                ]
+            ),
+        )
+
+    def __reduce__(self):
+        return (_rebuild_record, (self._obj_cls, self.manager, self._get_attrs()))
+
+    def __getattr__(self, name):
+        # Avoid recursing while the slots are not set (e.g. when copying)
+        if name in RESTRecord.__slots__:
+            raise AttributeError(name)
+        try:
+            return self._values[self._schema[name]]
+        except KeyError:
+            try:
+                return self.manager.parent_attrs[name]
+            except KeyError:
+                raise AttributeError(name)
+
+    def __setattr__(self, name, value):
+        raise AttributeError(
+            "%s is read-only, use to_object() to modify it" % self.__class__.__name__
+        )
+
+    def __str__(self):
+        return "%s => %s" % (type(self), self._get_attrs())
+
+    def __repr__(self):
+        if self._id_attr:
+            return "<%s %s:%s>" % (
+                self.__class__.__name__,
+                self._id_attr,
+                self.get_id(),
+            )
+        else:
+            return "<%s>" % self.__class__.__name__
+
+    def __eq__(self, other):
+        if self.get_id() and other.get_id():
+            return self.get_id() == other.get_id()
+        return super(RESTRecord, self) == other
+
+    def __ne__(self, other):
+        if self.get_id() and other.get_id():
+            return self.get_id() != other.get_id()
+        return super(RESTRecord, self) != other
+
+    def __hash__(self):
+        if not self.get_id():
+            return super(RESTRecord, self).__hash__()
+        return hash(self.get_id())
+
+    def _get_attrs(self):
+        return dict(zip(self._schema, self._values))
+
+    def get_id(self):
+        """Returns the id of the resource."""
+        if self._id_attr is None or not hasattr(self, self._id_attr):
+            return None
+        return getattr(self, self._id_attr)
+
+    @property
+    def attributes(self):
+        d = self._get_attrs()
+        d.update(self.manager.parent_attrs)
+        return d
+
+    def to_object(self):
+        """Return the full RESTObject built from the record data.
+
+        Returns:
+            RESTObject: A new object, with managers and write methods
+        """
+        return self._obj_cls(self.manager, self._get_attrs())
+
+
+# The slots are set with their descriptors since __setattr__ is disabled
+_set_manager = RESTRecord.manager.__set__
+_set_schema = RESTRecord._schema.__set__
+_set_values = RESTRecord._values.__set__
+_intern = sys.intern
+
+
 class RESTObjectList:
     """Generator object representing a list of RESTObject's.
 
@@ -228,6 +404,41 @@ class RESTObjectList:
         data = await self._list.anext()
         return self._obj_cls(self.manager, data)
 
+    def to_columns(self, fields):
+        """Store the remaining items in columns instead of objects.
+
+        The pages are fetched as needed and their data stored field by field
+        in arrays, without creating objects. See :mod:`gitlab.columnar`.
+
+        Example::
+
+            mrs = gl.mergerequests.list(state="merged", as_list=False)
+            columns = mrs.to_columns(["iid", "created_at", "merged_at"])
+            cycle_times = columns.to_pandas().eval("merged_at - created_at")
+
+        Args:
+            fields (list or dict): The fields to keep (``author.id`` for
+                nested fields), or a dict of fields to column types (int,
+                float, bool, str, timestamp, object, or None to infer it)
+
+        Returns:
+            Columns: A mapping of field names to columns
+        """
+        builder = columnar.ColumnsBuilder(fields)
+        for data in self._list:
+            builder.add(data)
+        return builder.columns()
+
+    async def ato_columns(self, fields):
+        """Store the remaining items in columns instead of objects.
+
+        Asynchronous version of :meth:`to_columns`, for AsyncGitlab lists.
+        """
+        builder = columnar.ColumnsBuilder(fields)
+        async for data in self._list:
+            builder.add(data)
+        return builder.columns()
+
     @property
     def current_page(self):
         """The current page number."""
@@ -310,3 +521,24 @@ class RESTManager:
     @property
     def path(self):
         return self._computed_path
+
+    def map(self, func, items, **kwargs):
+        """Call a manager method (or any callable) on each item concurrently.
+
+        Example::
+
+            projects = await gl.projects.map("get", ids, limit=16)
+
+        Args:
+            func (str or callable): Name of the manager method to call, or a
+                callable taking an item
+            items (iterable): The items to process (e.g. object IDs)
+            **kwargs: Extra options for the client ``map()`` method (limit,
+                return_exceptions, cancel_on_error)
+
+        Returns:
+            list: The results (or exceptions), in the order of ``items``
+        """
+        if isinstance(func, str):
+            func = getattr(self, func)
+        return self.gitlab.map(func, items, **kwargs)
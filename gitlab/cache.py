@@ -0,0 +1,360 @@
+# -*- coding: utf-8 -*-
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU Lesser General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU Lesser General Public License for more details.
+#
+# You should have received a copy of the GNU Lesser General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+"""Caches of GET responses."""
+
+import collections
+import fnmatch
+import hashlib
+import json
+import os
+import re
+import sqlite3
+import threading
+import time
+
+import httpx
+
+#: A cached response. ``expires`` is the time until which the response is
+#: used without asking the server (0 to always revalidate it).
+CacheEntry = collections.namedtuple(
+    "CacheEntry", ["etag", "headers", "content", "expires"]
+)
+CacheEntry.__new__.__defaults__ = (0.0,)
+
+_API_PREFIX = re.compile(r"^.*?/api/v\d+")
+
+
+def default_cache_path():
+    """Return the default path of the on-disk cache.
+
+    The file is ``python-gitlab/http-cache.sqlite`` in ``$XDG_CACHE_HOME``
+    (``~/.cache`` by default).
+    """
+    root = os.environ.get("XDG_CACHE_HOME") or os.path.expanduser("~/.cache")
+    return os.path.join(root, "python-gitlab", "http-cache.sqlite")
+
+
+def cache_key(request):
+    """Return the cache key of a request.
+
+    The key depends on the URL (with the query string) and on the headers,
+    so that the responses are not shared between users (tokens, sudo).
+
+    Args:
+        request (httpx.Request): The request
+
+    Returns:
+        str: The key
+    """
+    digest = hashlib.sha256()
+    digest.update(("%s %s\n" % (request.method, request.url)).encode())
+    for name, value in sorted(request.headers.items()):
+        digest.update(("%s: %s\n" % (name, value)).encode())
+    return digest.hexdigest()
+
+
+class ResponseCache:
+    """In-memory LRU cache of GET responses, revalidated with their ETag.
+
+    When a cached response exists for a request, ``If-None-Match`` is sent
+    with its ETag, and a ``304 Not Modified`` answer is served from the
+    cache. The body is decoded again for each use, so that the callers never
+    share the same objects.
+
+    Responses can also be used without asking the server for some time,
+    according to ``ttl``: a list of ``(pattern, seconds)`` tuples (or a
+    dict), where the patterns are matched with ``fnmatch`` against the API
+    path of the request (e.g. ``/version`` or ``/templates/*``). The first
+    matching pattern is used.
+
+    Args:
+        max_size (int): Maximum total size of the cached bodies, in bytes
+        max_entries (int): Maximum number of cached responses
+        ttl (list or dict): Time to live of the responses, per path pattern
+
+    Attributes:
+        hits (int): Requests for which a cached response was found
+        misses (int): Requests without a cached response
+        not_modified (int): Responses served from the cache after a 304
+        fresh (int): Responses served from the cache without a request
+    """
+
+    def __init__(self, max_size=32 * 2 ** 20, max_entries=1024, ttl=None):
+        self.max_size = max_size
+        self.max_entries = max_entries
+        self.ttl = list(ttl.items() if isinstance(ttl, dict) else ttl or ())
+        self.hits = self.misses = self.not_modified = self.fresh = 0
+        self._size = 0
+        self._entries = collections.OrderedDict()
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        return len(self._entries)
+
+    def __getstate__(self):
+        state = self.__dict__.copy()
+        state.pop("_lock")
+        return state
+
+    def __setstate__(self, state):
+        self.__dict__.update(state)
+        self._lock = threading.Lock()
+
+    @property
+    def size(self):
+        """The total size of the cached bodies, in bytes."""
+        return self._size
+
+    @property
+    def stats(self):
+        """The counters, and the number and size of the cached responses."""
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "not_modified": self.not_modified,
+            "fresh": self.fresh,
+            "entries": len(self),
+            "size": self.size,
+        }
+
+    def get_ttl(self, url):
+        """Return the time to live of the responses for a URL, in seconds."""
+        path = _API_PREFIX.sub("", httpx.URL(url).path)
+        for pattern, seconds in self.ttl:
+            if fnmatch.fnmatchcase(path, pattern):
+                return seconds
+        return 0
+
+    def get(self, key):
+        """Return the cached response for a key (None if not cached)."""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self.misses += 1
+            else:
+                self.hits += 1
+                self._entries.move_to_end(key)
+            return entry
+
+    def set(self, key, entry):
+        """Store a response, evicting the least recently used ones."""
+        size = len(entry.content)
+        if size > self.max_size:
+            return
+        with self._lock:
+            old = self._entries.pop(key, None)
+            if old is not None:
+                self._size -= len(old.content)
+            self._entries[key] = entry
+            self._size += size
+            while self._size > self.max_size or len(self._entries) > self.max_entries:
+                _, old = self._entries.popitem(last=False)
+                self._size -= len(old.content)
+
+    def clear(self):
+        """Remove all the cached responses."""
+        with self._lock:
+            self._entries.clear()
+            self._size = 0
+
+    def _response(self, request, entry):
+        return httpx.Response(
+            200, headers=entry.headers, content=entry.content, request=request
+        )
+
+    def prepare(self, request):
+        """Look up the response cached for a request.
+
+        If the cached response can be used without asking the server, it is
+        returned. Otherwise ``If-None-Match`` is added to the request when
+        the cached response has an ETag.
+
+        Args:
+            request (httpx.Request): A GET request
+
+        Returns:
+            tuple: The cache key, the cached entry (or None) and the response
+            to use instead of sending the request (or None)
+        """
+        key = cache_key(request)
+        entry = self.get(key)
+        if entry is None:
+            return key, None, None
+        if entry.expires > time.time():
+            with self._lock:
+                self.fresh += 1
+            return key, entry, self._response(request, entry)
+        if entry.etag:
+            request.headers["If-None-Match"] = entry.etag
+        return key, entry, None
+
+    def process(self, request, response, key, entry):
+        """Store a response, or replace a 304 with the cached one.
+
+        Args:
+            request (httpx.Request): The request sent
+            response (httpx.Response): The response received
+            key (str): The key returned by :meth:`prepare`
+            entry (CacheEntry): The entry returned by :meth:`prepare`
+
+        Returns:
+            httpx.Response: The response to use
+        """
+        ttl = self.get_ttl(request.url)
+        expires = time.time() + ttl if ttl > 0 else 0.0
+        etag = response.headers.get("ETag")
+
+        if response.status_code == 304 and entry is not None:
+            with self._lock:
+                self.not_modified += 1
+            if expires:
+                self.set(key, entry._replace(etag=etag or entry.etag, expires=expires))
+            return self._response(request, entry)
+
+        if response.status_code == 200 and (etag or expires):
+            headers = [
+                (name, value)
+                for name, value in response.headers.items()
+                if name not in ("content-encoding", "content-length")
+            ]
+            self.set(key, CacheEntry(etag, headers, response.content, expires))
+        return response
+
+
+class DiskCache(ResponseCache):
+    """Cache of GET responses stored in a SQLite database.
+
+    The cache can be shared by several processes (e.g. CLI runs or cron
+    jobs). The least recently used responses are evicted when the size limit
+    is reached. The file is only readable by its owner, since it contains
+    server data.
+
+    Args:
+        path (str): Path of the database (see :func:`default_cache_path`)
+        max_size (int): Maximum total size of the cached bodies, in bytes
+        max_entries (int): Maximum number of cached responses
+        ttl (list or dict): Time to live of the responses, per path pattern
+    """
+
+    _SCHEMA = (
+        "CREATE TABLE IF NOT EXISTS responses ("
+        "key TEXT PRIMARY KEY, etag TEXT, headers TEXT, content BLOB, "
+        "expires REAL, accessed REAL)",
+        "CREATE INDEX IF NOT EXISTS responses_accessed ON responses (accessed)",
+    )
+
+    def __init__(self, path=None, max_size=256 * 2 ** 20, max_entries=65536, ttl=None):
+        super().__init__(max_size=max_size, max_entries=max_entries, ttl=ttl)
+        self.path = path or default_cache_path()
+        # sqlite3 connections can't be shared between threads
+        self._local = threading.local()
+
+    def __getstate__(self):
+        state = super().__getstate__()
+        state.pop("_local")
+        return state
+
+    def __setstate__(self, state):
+        super().__setstate__(state)
+        self._local = threading.local()
+
+    def _connect(self):
+        connection = getattr(self._local, "connection", None)
+        if connection is None:
+            directory = os.path.dirname(self.path)
+            if directory:
+                os.makedirs(directory, mode=0o700, exist_ok=True)
+            if not os.path.exists(self.path):
+                # Create the file with restricted permissions
+                os.close(os.open(self.path, os.O_CREAT | os.O_WRONLY, 0o600))
+            # Wait for the other processes instead of failing when the
+            # database is locked
+            connection = sqlite3.connect(self.path, timeout=30)
+            connection.execute("PRAGMA journal_mode=WAL")
+            with connection:
+                for statement in self._SCHEMA:
+                    connection.execute(statement)
+            self._local.connection = connection
+        return connection
+
+    def __len__(self):
+        (count,) = self._connect().execute("SELECT COUNT(*) FROM responses").fetchone()
+        return count
+
+    @property
+    def size(self):
+        (size,) = (
+            self._connect()
+            .execute("SELECT COALESCE(SUM(LENGTH(content)), 0) FROM responses")
+            .fetchone()
+        )
+        return size
+
+    def get(self, key):
+        connection = self._connect()
+        row = connection.execute(
+            "SELECT etag, headers, content, expires FROM responses WHERE key = ?",
+            (key,),
+        ).fetchone()
+        with self._lock:
+            if row is None:
+                self.misses += 1
+                return None
+            self.hits += 1
+        with connection:
+            connection.execute(
+                "UPDATE responses SET accessed = ? WHERE key = ?", (time.time(), key)
+            )
+        etag, headers, content, expires = row
+        return CacheEntry(etag, json.loads(headers), bytes(content), expires)
+
+    def set(self, key, entry):
+        if len(entry.content) > self.max_size:
+            return
+        connection = self._connect()
+        with connection:
+            connection.execute(
+                "INSERT OR REPLACE INTO responses VALUES (?, ?, ?, ?, ?, ?)",
+                (
+                    key,
+                    entry.etag,
+                    json.dumps(entry.headers),
+                    entry.content,
+                    entry.expires,
+                    time.time(),
+                ),
+            )
+            # Evict the least recently used responses
+            count, size = connection.execute(
+                "SELECT COUNT(*), COALESCE(SUM(LENGTH(content)), 0) FROM responses"
+            ).fetchone()
+            if size <= self.max_size and count <= self.max_entries:
+                return
+            rows = connection.execute(
+                "SELECT key, LENGTH(content) FROM responses ORDER BY accessed"
+            ).fetchall()
+            evicted = []
+            for old_key, length in rows:
+                if size <= self.max_size and count <= self.max_entries:
+                    break
+                evicted.append((old_key,))
+                size -= length
+                count -= 1
+            connection.executemany("DELETE FROM responses WHERE key = ?", evicted)
+
+    def clear(self):
+        connection = self._connect()
+        with connection:
+            connection.execute("DELETE FROM responses")
@@ -21,9 +21,11 @@ from __future__ import print_function
 import argparse
 import functools
 import importlib
+import os
 import re
 import sys
 
+import gitlab.cache
 import gitlab.config
 
 camel_re = re.compile("(.)([A-Z])")
@@ -127,6 +129,16 @@ def _get_base_parser(add_help=True):
         ),
         required=False,
     )
+    parser.add_argument(
+        "--no-cache",
+        help="Don't use the HTTP cache, even if it is enabled in the configuration",
+        action="store_true",
+    )
+    parser.add_argument(
+        "--purge-cache",
+        help="Remove all the responses from the on-disk HTTP cache",
+        action="store_true",
+    )
 
     return parser
 
@@ -150,6 +162,17 @@ def _parse_value(v):
     return v
 
 
+def _purge_cache(path):
+    """Clear the on-disk response cache, without creating it."""
+    path = path or gitlab.cache.default_cache_path()
+    if not os.path.exists(path):
+        print("No response cache to purge at %s" % path, file=sys.stderr)
+        return False
+    gitlab.cache.DiskCache(path).clear()
+    print("Purged the response cache at %s" % path, file=sys.stderr)
+    return True
+
+
 def main():
     if "--version" in sys.argv:
         print(gitlab.__version__)
@@ -168,6 +191,11 @@ def main():
             parser.print_help()
             sys.exit(0)
         sys.exit(e)
+    if options.purge_cache:
+        _purge_cache(config.cache_path)
+        if len(args) == 1:
+            # Nothing else to do
+            sys.exit(0)
     cli_module = importlib.import_module("gitlab.v%s.cli" % config.api_version)
 
     # Now we build the entire set of subcommands and do the complete parsing
@@ -188,6 +216,7 @@ def main():
     if args.fields:
         fields = [x.strip() for x in args.fields.split(",")]
     debug = args.debug
+    no_cache = args.no_cache
     action = args.whaction
     what = args.what
 
@@ -202,12 +231,16 @@ def main():
         "whaction",
         "version",
         "output",
+        "no_cache",
+        "purge_cache",
     ):
         args.pop(item)
     args = {k: _parse_value(v) for k, v in args.items() if v is not None}
 
     try:
         gl = gitlab.Gitlab.from_config(gitlab_id, config_files)
+        if no_cache:
+            gl.cache = None
         if gl.private_token or gl.oauth_token or gl.job_token:
             gl.auth()
     except Exception as e:
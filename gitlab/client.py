@@ -17,13 +17,25 @@
 """Wrapper for the GitLab API."""
 
 import asyncio
+import functools
 import importlib
+import inspect
+import threading
 import time
 from typing import Union
 
 import gitlab
+import gitlab.cache
 import gitlab.config
+import gitlab.connections
+import gitlab.events
+import gitlab.metrics
+import gitlab.profiling
+import gitlab.ratelimit
+import gitlab.retry
+import gitlab.slowlog
 import httpx
+from gitlab import codec, concurrency, hedging
 from gitlab import exceptions as exc
 from gitlab import utils
 from gitlab.exceptions import (
@@ -36,6 +48,14 @@ from gitlab.exceptions import (
 from gitlab.types import GitlabList
 from gitlab.utils import inherit_docstrings
 
+# httpx < 0.18 takes raw request bodies as ``data``
+_BODY_ARG = (
+    "content" if "content" in inspect.signature(httpx.Request).parameters else "data"
+)
+
+# httpx < 0.18 can't set the expiry of the keep-alive connections
+_LIMITS_ARGS = inspect.signature(httpx.Limits).parameters
+
 REDIRECT_MSG = (
     "python-gitlab detected an http to https redirection. You "
     "must update your GitLab URL to use https:// to avoid issues."
@@ -70,6 +90,52 @@ class BaseGitlab:
         per_page (int): Number of items to retrieve per request
         pagination (str): Can be set to 'keyset' to use keyset pagination
         order_by (str): Set order_by globally
+        max_concurrency (int or AdaptiveLimiter): Maximum number of requests
+            sent at the same time by this client (no limit if None), or a
+            :class:`~gitlab.concurrency.AdaptiveLimiter` adapting it to the
+            status and latency of the responses. AsyncGitlab admits the
+            requests by priority (see
+            :class:`~gitlab.concurrency.PriorityLimiter`), up to
+            ``max_connections`` at a time if None and a background priority
+            is used.
+        json_backend (str): JSON library used to encode and decode the
+            bodies: ``json`` (default) or ``orjson`` (falls back to ``json``
+            if not installed). An object with ``loads(bytes)`` and
+            ``dumps(obj)`` methods can also be used.
+        cache (bool or ResponseCache): Cache the GET responses with an ETag
+            and revalidate them with conditional requests. Use True for a
+            :class:`~gitlab.cache.ResponseCache` with the default limits, or
+            a :class:`~gitlab.cache.DiskCache` to keep them between runs.
+        rate_limit (bool or RateLimiter): Pace the requests to stay under the
+            rate limit reported by the server in the ``RateLimit-*`` headers.
+            Use True for a :class:`~gitlab.ratelimit.RateLimiter` with the
+            default settings.
+        singleflight (bool or SingleFlight): Share one request and response
+            between the identical GET requests (same URL, parameters and
+            headers, e.g. sudo) running at the same time. Use True for a
+            :class:`~gitlab.concurrency.SingleFlight`.
+        http2 (bool): Use HTTP/2 when the server supports it, to multiplex
+            the concurrent requests on a single connection (requires the
+            ``h2`` package)
+        max_connections (int): Maximum number of connections of the pool
+        max_keepalive_connections (int): Maximum number of idle connections
+            kept open for the next requests
+        keepalive_expiry (float): Time after which the idle connections are
+            closed, in seconds
+        hedging (bool or HedgePolicy): Send a second copy of the GET and HEAD
+            requests still waiting for a response after the usual latency,
+            and use the first response (AsyncGitlab only). Use True for a
+            :class:`~gitlab.hedging.HedgePolicy` with the default settings.
+        retry_policy (RetryPolicy): Backoff, network errors and circuit
+            breaking of the retries (see :class:`~gitlab.retry.RetryPolicy`)
+        metrics (bool or MetricsCollector): Count the requests and their
+            latency per endpoint, for Prometheus. Use True for a
+            :class:`~gitlab.metrics.MetricsCollector` with the default
+            settings.
+        slow_log (bool or SlowRequestLogger): Log the slow requests and the
+            large responses as JSON lines, without the tokens. Use True for a
+            :class:`~gitlab.slowlog.SlowRequestLogger` with the default
+            thresholds.
     """
 
     def __init__(
@@ -87,9 +153,27 @@ class BaseGitlab:
         per_page=None,
         pagination=None,
         order_by=None,
+        max_concurrency=None,
+        json_backend=None,
+        cache=None,
+        rate_limit=None,
+        singleflight=None,
+        http2=False,
+        max_connections=100,
+        max_keepalive_connections=20,
+        keepalive_expiry=5.0,
+        hedging=None,
+        retry_policy=None,
+        metrics=None,
+        slow_log=None,
     ):
         self._api_version = str(api_version)
         self._server_version = self._server_revision = None
+        # Guards the state shared by threads using the same client
+        self._lock = threading.RLock()
+        # Serializes the /version requests, without blocking the other users
+        # of _lock during the round trip
+        self._version_lock = threading.Lock()
         self._base_url = url.rstrip("/")
         self._url = "%s/api/v%s" % (self._base_url, api_version)
         #: Timeout to use for requests to gitlab server
@@ -107,12 +191,78 @@ class BaseGitlab:
         self.job_token = job_token
         self._set_auth_info()
 
+        self.http2 = http2
+        self.max_connections = max_connections
+        self.max_keepalive_connections = max_keepalive_connections
+        self.keepalive_expiry = keepalive_expiry
         self.client = client or self._get_client()
 
         self.per_page = per_page
         self.pagination = pagination
         self.order_by = order_by
 
+        #: Maximum number of requests in flight for this client
+        self.max_concurrency = max_concurrency
+        self._limiter = None
+
+        #: JSON codec used for the request and response bodies
+        self.codec = codec.get_codec(json_backend)
+
+        #: Cache of the GET responses (None if disabled)
+        self.cache = None
+        if cache is True:
+            self.cache = gitlab.cache.ResponseCache()
+        elif cache is not None and cache is not False:
+            self.cache = cache
+
+        #: Pacing of the requests under the server rate limit (None if disabled)
+        self.rate_limiter = None
+        if rate_limit is True:
+            self.rate_limiter = gitlab.ratelimit.RateLimiter()
+        elif rate_limit is not None and rate_limit is not False:
+            self.rate_limiter = rate_limit
+
+        #: Coalescing of the identical GET requests in flight (None if disabled)
+        self.singleflight = None
+        if singleflight is True:
+            self.singleflight = concurrency.SingleFlight()
+        elif singleflight is not None and singleflight is not False:
+            self.singleflight = singleflight
+
+        #: Hedging of the slow read requests (None if disabled)
+        self.hedging = None
+        if hedging is True:
+            self.hedging = gitlab.hedging.HedgePolicy()
+        elif hedging is not None and hedging is not False:
+            self.hedging = hedging
+
+        #: Retries of the failed requests
+        self.retry_policy = retry_policy or gitlab.retry.RetryPolicy()
+
+        #: Counters of the requests sent on new and reused connections
+        self.connections = gitlab.connections.ConnectionTracker()
+
+        # Replaced rather than modified, so that it can be iterated safely
+        self._request_hooks = ()
+
+        #: Per-endpoint metrics of the requests (None if disabled)
+        self.metrics = None
+        if metrics is True:
+            self.metrics = gitlab.metrics.MetricsCollector()
+        elif metrics is not None and metrics is not False:
+            self.metrics = metrics
+        if self.metrics is not None:
+            self.add_request_hook(self.metrics)
+
+        #: Logging of the slow and large requests (None if disabled)
+        self.slow_log = None
+        if slow_log is True:
+            self.slow_log = gitlab.slowlog.SlowRequestLogger()
+        elif slow_log is not None and slow_log is not False:
+            self.slow_log = slow_log
+        if self.slow_log is not None:
+            self.add_request_hook(self.slow_log)
+
         objects = importlib.import_module("gitlab.v%s.objects" % self._api_version)
         self._objects = objects
 
@@ -166,17 +316,43 @@ class BaseGitlab:
         if self.http_username:
             auth = httpx.BasicAuth(self.http_username, self.http_password)
 
+        if self.http2:
+            try:
+                import h2  # noqa
+            except ImportError:
+                raise ImportError(
+                    "h2 is not installed.\n"
+                    "Install it with `pip install python-gitlab[http2]` to use "
+                    "http2=True"
+                )
+
+        limits = {
+            "max_connections": self.max_connections,
+            "max_keepalive_connections": self.max_keepalive_connections,
+            "keepalive_expiry": self.keepalive_expiry,
+        }
+        limits = httpx.Limits(**{k: v for k, v in limits.items() if k in _LIMITS_ARGS})
+
         return self._httpx_client_class(
-            auth=auth, verify=self.ssl_verify, timeout=self.timeout,
+            auth=auth,
+            verify=self.ssl_verify,
+            timeout=self.timeout,
+            http2=self.http2,
+            limits=limits,
         )
 
     def __getstate__(self):
         state = self.__dict__.copy()
         state.pop("_objects")
+        state.pop("_lock")
+        state.pop("_version_lock")
+        state["_limiter"] = None
         return state
 
     def __setstate__(self, state):
         self.__dict__.update(state)
+        self._lock = threading.RLock()
+        self._version_lock = threading.Lock()
         objects = importlib.import_module("gitlab.v%s.objects" % self._api_version)
         self._objects = objects
 
@@ -212,6 +388,9 @@ class BaseGitlab:
         config = gitlab.config.GitlabConfigParser(
             gitlab_id=gitlab_id, config_files=config_files
         )
+        cache = None
+        if config.cache:
+            cache = gitlab.cache.DiskCache(config.cache_path, ttl=config.cache_ttl)
         return cls(
             config.url,
             private_token=config.private_token,
@@ -225,6 +404,13 @@ class BaseGitlab:
             per_page=config.per_page,
             pagination=config.pagination,
             order_by=config.order_by,
+            json_backend=config.json_backend,
+            cache=cache,
+            rate_limit=config.rate_limit,
+            http2=config.http2,
+            max_connections=config.max_connections,
+            max_keepalive_connections=config.max_keepalive_connections,
+            keepalive_expiry=config.keepalive_expiry,
         )
 
     def auth(self):
@@ -248,6 +434,27 @@ class BaseGitlab:
         """
         raise NotImplemented
 
+    def warmup(self, n=1):
+        """Open connections to the server before the first API calls.
+
+        ``n`` lightweight requests (``/version``) are sent at the same time,
+        so that the connections (DNS resolution, TCP and TLS handshakes) are
+        ready in the pool for the next requests. At most
+        ``max_keepalive_connections`` connections are kept.
+
+        Args:
+            n (int): Number of connections to open
+
+        Returns:
+            int: The number of connections opened
+        """
+        raise NotImplemented
+
+    def _warmup_request(self):
+        return httpx.Request(
+            "GET", self._build_url("/version"), headers=self._create_headers()
+        )
+
     def lint(self, content, **kwargs):
         """Validate a gitlab CI configuration.
 
@@ -355,20 +562,85 @@ class BaseGitlab:
                 "authentication should be defined"
             )
 
-        if self.private_token:
-            self.headers.pop("Authorization", None)
-            self.headers["PRIVATE-TOKEN"] = self.private_token
-            self.headers.pop("JOB-TOKEN", None)
+        # The headers are copied and replaced at once so that requests sent
+        # by other threads never see a partially updated dict
+        with self._lock:
+            headers = self.headers.copy()
+
+            if self.private_token:
+                headers.pop("Authorization", None)
+                headers["PRIVATE-TOKEN"] = self.private_token
+                headers.pop("JOB-TOKEN", None)
+
+            if self.oauth_token:
+                headers["Authorization"] = "Bearer %s" % self.oauth_token
+                headers.pop("PRIVATE-TOKEN", None)
+                headers.pop("JOB-TOKEN", None)
+
+            if self.job_token:
+                headers.pop("Authorization", None)
+                headers.pop("PRIVATE-TOKEN", None)
+                headers["JOB-TOKEN"] = self.job_token
+
+            self.headers = headers
+
+    def add_request_hook(self, hook):
+        """Call a function after each request.
+
+        The hook is called with a :class:`~gitlab.events.RequestEvent`
+        describing the request (method, URL template, status, sizes,
+        timings, retries and calling manager), once the response is received
+        or the request failed. It runs in the thread (or the event loop)
+        making the request, so it should be quick.
+
+        Args:
+            hook (callable): A function taking the event
+        """
+        with self._lock:
+            self._request_hooks = self._request_hooks + (hook,)
+
+    def remove_request_hook(self, hook):
+        """Stop calling a function added with :meth:`add_request_hook`.
+
+        Args:
+            hook (callable): The function
+
+        Raises:
+            ValueError: If the hook was not added
+        """
+        with self._lock:
+            hooks = list(self._request_hooks)
+            hooks.remove(hook)
+            self._request_hooks = tuple(hooks)
+
+    def profile(self, n_plus_one_threshold=5):
+        """Profile the API calls made in a block of code.
+
+        Example::
+
+            with gl.profile() as p:
+                for issue in project.issues.list(all=True):
+                    ...
+            print(p.report())
+
+        Use ``async with`` for AsyncGitlab.
+
+        Args:
+            n_plus_one_threshold (int): Number of objects fetched one by one
+                from the same endpoint reported as an N+1 pattern
 
-        if self.oauth_token:
-            self.headers["Authorization"] = "Bearer %s" % self.oauth_token
-            self.headers.pop("PRIVATE-TOKEN", None)
-            self.headers.pop("JOB-TOKEN", None)
+        Returns:
+            Profile: A :class:`~gitlab.profiling.Profile` context manager
+        """
+        return gitlab.profiling.Profile(self, n_plus_one_threshold)
 
-        if self.job_token:
-            self.headers.pop("Authorization", None)
-            self.headers.pop("PRIVATE-TOKEN", None)
-            self.headers["JOB-TOKEN"] = self.job_token
+    def _decode(self, content):
+        return gitlab.profiling.decode(self.codec.loads, content)
+
+    def _emit_event(self, event, response=None, error=None):
+        event.finish(response, error)
+        for hook in self._request_hooks:
+            hook(event)
 
     def enable_debug(self):
         import logging
@@ -444,7 +716,9 @@ class BaseGitlab:
                               json)
             streamed (bool): Whether the data should be streamed
             files (dict): The files to send to the server
-            **kwargs: Extra options to send to the server (e.g. sudo)
+            **kwargs: Extra options to send to the server (e.g. sudo). The
+                ``priority`` option sets the priority of the request
+                (AsyncGitlab only, see :mod:`gitlab.concurrency`)
 
         Returns:
             A requests result object.
@@ -483,6 +757,13 @@ class BaseGitlab:
             path (str): Path or full URL to query ('/projects' or
                         'http://whatever/v4/api/projecs')
             query_data (dict): Data to send as query parameters
+            concurrency (int): Maximum number of pages to fetch in parallel
+                               when the server returns the total number of
+                               pages (``all=True`` or generator mode)
+            prefetch (bool): In generator mode, request the next page in the
+                             background while the current one is consumed
+            streamed (bool): Read the pages as streams and decode their items
+                             one at a time while iterating
             **kwargs: Extra options to send to the server (e.g. sudo, page,
                       per_page)
 
@@ -558,6 +839,27 @@ class BaseGitlab:
         """
         return self.http_request("delete", path, **kwargs)
 
+    def map(
+        self, func, items, limit=None, return_exceptions=True, cancel_on_error=False
+    ):
+        """Call ``func`` on each item concurrently.
+
+        Args:
+            func (callable): Function making the API calls for one item
+            items (iterable): The items to process
+            limit (int): Maximum number of items processed at the same time,
+                or a :class:`~gitlab.concurrency.AdaptiveLimiter`
+            return_exceptions (bool): If True, exceptions are returned in
+                place of the results of the failed items. Otherwise the first
+                exception is raised.
+            cancel_on_error (bool): If True, the remaining items are not
+                processed after the first failure, which is raised
+
+        Returns:
+            list: The results (or exceptions), in the order of ``items``
+        """
+        raise NotImplemented
+
     @on_http_error(exc.GitlabSearchError)
     def search(self, scope, search, **kwargs):
         """Search GitLab resources matching the provided string.'
@@ -585,17 +887,108 @@ class Gitlab(BaseGitlab):
     def auth(self):
         self.user = self._objects.CurrentUserManager(self).get()
 
-    def version(self):
-        if self._server_version is None:
+    def executor(self, max_workers=None):
+        """Create a thread pool to run API calls concurrently.
+
+        The calls share this client and its connection pool. The results of
+        ``map()`` are returned in the order of the input items::
+
+            with gl.executor(max_workers=8) as executor:
+                branches = executor.map(lambda p: p.branches.list(), projects)
+
+        Args:
+            max_workers (int): Maximum number of threads (defaults to
+                ``max_concurrency`` if defined), or an
+                :class:`~gitlab.concurrency.AdaptiveLimiter` to adapt the
+                number of calls running at the same time
+
+        Returns:
+            gitlab.concurrency.BatchExecutor: The executor
+        """
+        limiter = None
+        if isinstance(max_workers, concurrency.AdaptiveLimiter):
+            limiter = max_workers
+            max_workers = limiter.max_limit
+        max_concurrency = self.max_concurrency
+        if isinstance(max_concurrency, concurrency.AdaptiveLimiter):
+            max_concurrency = max_concurrency.max_limit
+        return concurrency.BatchExecutor(
+            max_workers=max_workers or max_concurrency, limiter=limiter
+        )
+
+    def map(
+        self, func, items, limit=None, return_exceptions=True, cancel_on_error=False
+    ):
+        with self.executor(max_workers=limit) as executor:
+            return executor.map(
+                func,
+                items,
+                return_exceptions=return_exceptions,
+                cancel_on_error=cancel_on_error,
+            )
+
+    def _get_limiter(self):
+        if isinstance(self.max_concurrency, concurrency.AdaptiveLimiter):
+            return self.max_concurrency
+        if self._limiter is None and self.max_concurrency:
+            with self._lock:
+                if self._limiter is None:
+                    self._limiter = threading.BoundedSemaphore(self.max_concurrency)
+        return self._limiter
+
+    def _receive(self, req, streamed, timeout, event):
+        """Send a request and, for the hooks, read its body separately."""
+        if event is None:
+            return self.client.send(req, stream=streamed, timeout=timeout)
+        event.sending(req)
+        result = self.client.send(req, stream=True, timeout=timeout)
+        event.received(result)
+        if not streamed:
             try:
-                data = self.http_get("/version")
-                self._server_version = data["version"]
-                self._server_revision = data["revision"]
-            except Exception:
-                self._server_version = self._server_revision = "unknown"
+                result.read()
+            except BaseException:
+                result.close()
+                raise
+            event.read(result)
+        return result
+
+    def _send_measured(self, limiter, req, streamed, timeout, event):
+        start = time.monotonic()
+        try:
+            result = self._receive(req, streamed, timeout, event)
+        except httpx.TransportError:
+            limiter.record(None, time.monotonic() - start)
+            raise
+        limiter.record(result.status_code, time.monotonic() - start)
+        return result
+
+    def version(self):
+        with self._version_lock:
+            if self._server_version is None:
+                try:
+                    data = self.http_get("/version")
+                    self._server_version = data["version"]
+                    self._server_revision = data["revision"]
+                except Exception:
+                    self._server_version = self._server_revision = "unknown"
 
         return self._server_version, self._server_revision
 
+    def warmup(self, n=1):
+        n = min(n, self.max_keepalive_connections)
+        if n < 1:
+            return 0
+        # Send the requests together, so that they don't share connections
+        barrier = threading.Barrier(n)
+
+        def send(_):
+            barrier.wait()
+            return self.client.send(self._warmup_request())
+
+        with self.executor(max_workers=n) as executor:
+            responses = executor.map(send, range(n), return_exceptions=False)
+        return [self.connections.track(r) for r in responses].count(False)
+
     @on_http_error(exc.GitlabVerifyError)
     def lint(self, content, **kwargs):
         post_data = {"content": content}
@@ -622,6 +1015,8 @@ class Gitlab(BaseGitlab):
     ):
         query_data = query_data or {}
         url = self._build_url(path)
+        # Only used by AsyncGitlab
+        kwargs.pop("priority", None)
 
         params = {}
         utils.copy_dict(params, query_data)
@@ -647,48 +1042,123 @@ class Gitlab(BaseGitlab):
 
         # We need to deal with json vs. data when uploading files
         if files:
-            data = post_data
-            json = None
+            body = {"data": post_data}
             del opts["headers"]["Content-type"]
+        elif post_data is not None:
+            # The JSON body is encoded with the client codec, not by httpx
+            body = {_BODY_ARG: self.codec.dumps(post_data)}
         else:
-            json = post_data
-            data = None
-
-        req = httpx.Request(
-            verb, url, json=json, data=data, params=params, files=files, **opts
+            body = {}
+
+        req = httpx.Request(verb, url, params=params, files=files, **body, **opts)
+
+        event = None
+        if self._request_hooks:
+            caller = gitlab.events.caller.get()
+            event = gitlab.events.RequestEvent(verb, req.url, self._url, caller)
+
+        # Conditional requests for the responses in the cache
+        cache = self.cache if verb.lower() == "get" and not streamed else None
+        cache_key = cache_entry = None
+        if cache is not None:
+            cache_key, cache_entry, cached = cache.prepare(req)
+            if cached is not None:
+                if event is not None:
+                    event.cached = True
+                    self._emit_event(event, cached)
+                return cached
+
+        send = functools.partial(
+            self._send_request,
+            req,
+            streamed,
+            timeout,
+            cache,
+            cache_key,
+            cache_entry,
+            kwargs,
+            event,
         )
+        # Identical GET requests running at the same time share one response
+        if self.singleflight is not None and verb.lower() == "get" and not streamed:
+            send = functools.partial(
+                self.singleflight.run, gitlab.cache.cache_key(req), send
+            )
+        if event is None:
+            return send()
+        try:
+            result = send()
+        except Exception as e:
+            self._emit_event(event, error=e)
+            raise
+        self._emit_event(event, result)
+        return result
 
-        # obey the rate limit by default
-        obey_rate_limit = kwargs.get("obey_rate_limit", True)
-        # do not retry transient errors by default
-        retry_transient_errors = kwargs.get("retry_transient_errors", False)
+    def _send_request(
+        self, req, streamed, timeout, cache, cache_key, cache_entry, kwargs, event
+    ):
+        # The arguments of the call override the retry policy of the client
+        attempt = self.retry_policy.start(req.method, req.url, kwargs)
 
-        # set max_retries to 10 by default, disable by setting it to -1
-        max_retries = kwargs.get("max_retries", 10)
-        cur_retries = 0
+        limiter = self._get_limiter()
+        adaptive = isinstance(limiter, concurrency.AdaptiveLimiter)
+        rate_limiter = self.rate_limiter
+        # The body is read separately to time the first byte for the hooks
+        stream = streamed or event is not None
 
         while True:
-            result = self.client.send(req, stream=streamed, timeout=timeout)
+            if rate_limiter is not None:
+                rate_limiter.acquire()
+            try:
+                if limiter is None:
+                    result = self._receive(req, streamed, timeout, event)
+                elif adaptive:
+                    with limiter:
+                        result = self._send_measured(
+                            limiter, req, streamed, timeout, event
+                        )
+                else:
+                    with limiter:
+                        result = self._receive(req, streamed, timeout, event)
+            except httpx.TransportError as e:
+                wait_time = attempt.on_error(e)
+                if wait_time is None:
+                    raise
+                if event is not None:
+                    event.retrying(wait_time)
+                time.sleep(wait_time)
+                attempt.check()
+                continue
+            if rate_limiter is not None:
+                rate_limiter.update(result.headers)
+            reused = self.connections.track(result)
+            if event is not None:
+                event.reused_connection = reused
 
             self._check_redirects(result)
+            if cache is not None:
+                result = cache.process(req, result, cache_key, cache_entry)
 
+            wait_time = attempt.on_response(result)
             if 200 <= result.status_code < 300:
                 return result
 
-            if (429 == result.status_code and obey_rate_limit) or (
-                result.status_code in [500, 502, 503, 504] and retry_transient_errors
-            ):
-                if max_retries == -1 or cur_retries < max_retries:
-                    wait_time = 2 ** cur_retries * 0.1
-                    if "Retry-After" in result.headers:
-                        wait_time = int(result.headers["Retry-After"])
-                    cur_retries += 1
-                    time.sleep(wait_time)
-                    continue
-
+            if wait_time is not None:
+                # Release the connection of the unread body before retrying
+                if stream:
+                    result.close()
+                if event is not None:
+                    event.retrying(wait_time)
+                time.sleep(wait_time)
+                attempt.check()
+                continue
+
+            # The body of the streamed responses is needed for the error
+            if stream:
+                result.read()
             error_message = result.content
             try:
-                error_json = result.json()
+                error_json = self._decode(result.content)
                 for k in ("message", "error"):
                     if k in error_json:
                         error_message = error_json[k]
@@ -720,7 +1190,7 @@ class Gitlab(BaseGitlab):
             and not raw
         ):
             try:
-                return result.json()
+                return self._decode(result.content)
             except Exception:
                 raise GitlabParsingError(
                     error_message="Failed to parse the server message"
@@ -735,10 +1205,19 @@ class Gitlab(BaseGitlab):
         as_list = True if as_list is None else as_list
 
         get_all = kwargs.pop("all", False)
+        concurrency = kwargs.pop("concurrency", None)
+        prefetch = kwargs.pop("prefetch", False)
         url = self._build_url(path)
 
         if get_all is True and as_list is True:
-            gitlab_list = GitlabList.create(self, url, query_data, **kwargs)
+            gitlab_list = GitlabList.create(
+                self,
+                url,
+                query_data,
+                concurrency=concurrency,
+                prefetch=prefetch,
+                **kwargs
+            )
             return list(gitlab_list)
 
         if "page" in kwargs or as_list is True:
@@ -749,7 +1228,9 @@ class Gitlab(BaseGitlab):
             return list(gitlab_list)
 
         # No pagination, generator requested
-        return GitlabList.create(self, url, query_data, **kwargs)
+        return GitlabList.create(
+            self, url, query_data, concurrency=concurrency, prefetch=prefetch, **kwargs
+        )
 
     def http_post(self, path, query_data=None, post_data=None, files=None, **kwargs):
         query_data = query_data or {}
@@ -765,7 +1246,7 @@ class Gitlab(BaseGitlab):
         )
         try:
             if result.headers.get("Content-Type", None) == "application/json":
-                return result.json()
+                return self._decode(result.content)
         except Exception:
             raise GitlabParsingError(error_message="Failed to parse the server message")
         return result
@@ -783,7 +1264,7 @@ class Gitlab(BaseGitlab):
             **kwargs
         )
         try:
-            return result.json()
+            return self._decode(result.content)
         except Exception:
             raise GitlabParsingError(error_message="Failed to parse the server message")
 
@@ -795,6 +1276,97 @@ class AsyncGitlab(BaseGitlab):
     async def auth(self):
         self.user = await self._objects.CurrentUserManager(self).get()
 
+    def _get_limiter(self, priority=None):
+        if isinstance(
+            self.max_concurrency,
+            (concurrency.AdaptiveLimiter, concurrency.PriorityLimiter),
+        ):
+            return self.max_concurrency
+        # Created lazily so that the limiter is bound to the running loop, and
+        # only when needed: without max_concurrency, the requests go straight
+        # to the pool until a background request has to wait behind the
+        # interactive ones.
+        if self._limiter is None:
+            limit = self.max_concurrency
+            if not limit and priority not in (None, concurrency.INTERACTIVE):
+                limit = self.max_connections
+            if limit:
+                self._limiter = concurrency.PriorityLimiter(limit)
+        return self._limiter
+
+    def _send(self, req, streamed, timeout):
+        if self.hedging is not None and req.method in hedging.METHODS:
+            return hedging.send(
+                self.client, self.hedging, req, stream=streamed, timeout=timeout
+            )
+        return self.client.send(req, stream=streamed, timeout=timeout)
+
+    async def _receive(self, req, streamed, timeout, event):
+        """Send a request and, for the hooks, read its body separately."""
+        if event is None:
+            return await self._send(req, streamed, timeout)
+        event.sending(req)
+        result = await self._send(req, True, timeout)
+        event.received(result)
+        if not streamed:
+            try:
+                await result.aread()
+            except BaseException:
+                await result.aclose()
+                raise
+            event.read(result)
+        return result
+
+    async def _send_measured(self, limiter, req, streamed, timeout, event):
+        start = time.monotonic()
+        try:
+            result = await self._receive(req, streamed, timeout, event)
+        except httpx.TransportError:
+            limiter.record(None, time.monotonic() - start)
+            raise
+        limiter.record(result.status_code, time.monotonic() - start)
+        return result
+
+    async def gather(
+        self, aws, limit=None, return_exceptions=True, cancel_on_error=False
+    ):
+        """Run API calls concurrently.
+
+        All the requests still go through the client (and its
+        ``max_concurrency`` limit, if any), so they share the same
+        connection pool.
+
+        Args:
+            aws: Iterable of awaitables (e.g. ``gl.projects.get(id)``)
+            limit (int): Maximum number of awaitables running at the same
+                time (no limit if None), or a
+                :class:`~gitlab.concurrency.AdaptiveLimiter`
+            return_exceptions (bool): If True, exceptions are returned in
+                place of the results of the failed items. Otherwise the first
+                exception is raised.
+            cancel_on_error (bool): If True, cancel the remaining items as
+                soon as one fails and raise its exception
+
+        Returns:
+            list: The results (or exceptions), in the same order as ``aws``
+        """
+        return await concurrency.gather(
+            aws,
+            limit=limit,
+            return_exceptions=return_exceptions,
+            cancel_on_error=cancel_on_error,
+        )
+
+    async def map(
+        self, func, items, limit=None, return_exceptions=True, cancel_on_error=False
+    ):
+        return await self.gather(
+            (func(item) for item in items),
+            limit=limit,
+            return_exceptions=return_exceptions,
+            cancel_on_error=cancel_on_error,
+        )
+
     async def version(self):
         if self._server_version is None:
             try:
@@ -806,6 +1378,15 @@ class AsyncGitlab(BaseGitlab):
 
         return self._server_version, self._server_revision
 
+    async def warmup(self, n=1):
+        n = min(n, self.max_keepalive_connections)
+        if n < 1:
+            return 0
+        responses = await asyncio.gather(
+            *(self.client.send(self._warmup_request()) for _ in range(n))
+        )
+        return [self.connections.track(r) for r in responses].count(False)
+
     @on_http_error(exc.GitlabVerifyError)
     async def lint(self, content, **kwargs):
         post_data = {"content": content}
@@ -832,6 +1413,9 @@ class AsyncGitlab(BaseGitlab):
     ):
         query_data = query_data or {}
         url = self._build_url(path)
+        priority = kwargs.pop("priority", None)
+        if priority is None:
+            priority = concurrency.get_priority()
 
         params = {}
         utils.copy_dict(params, query_data)
@@ -857,48 +1441,136 @@ class AsyncGitlab(BaseGitlab):
 
         # We need to deal with json vs. data when uploading files
         if files:
-            data = post_data
-            json = None
+            body = {"data": post_data}
             del opts["headers"]["Content-type"]
+        elif post_data is not None:
+            # The JSON body is encoded with the client codec, not by httpx
+            body = {_BODY_ARG: self.codec.dumps(post_data)}
         else:
-            json = post_data
-            data = None
-
-        req = httpx.Request(
-            verb, url, json=json, data=data, params=params, files=files, **opts
+            body = {}
+
+        req = httpx.Request(verb, url, params=params, files=files, **body, **opts)
+
+        event = None
+        if self._request_hooks:
+            caller = gitlab.events.caller.get()
+            event = gitlab.events.RequestEvent(verb, req.url, self._url, caller)
+
+        # Conditional requests for the responses in the cache
+        cache = self.cache if verb.lower() == "get" and not streamed else None
+        cache_key = cache_entry = None
+        if cache is not None:
+            cache_key, cache_entry, cached = cache.prepare(req)
+            if cached is not None:
+                if event is not None:
+                    event.cached = True
+                    self._emit_event(event, cached)
+                return cached
+
+        send = functools.partial(
+            self._send_request,
+            req,
+            streamed,
+            timeout,
+            cache,
+            cache_key,
+            cache_entry,
+            kwargs,
+            priority,
+            event,
         )
+        # Identical GET requests running at the same time share one response
+        if self.singleflight is not None and verb.lower() == "get" and not streamed:
+            send = functools.partial(
+                self.singleflight.arun, gitlab.cache.cache_key(req), send
+            )
+        if event is None:
+            return await send()
+        try:
+            result = await send()
+        except Exception as e:
+            self._emit_event(event, error=e)
+            raise
+        self._emit_event(event, result)
+        return result
 
-        # obey the rate limit by default
-        obey_rate_limit = kwargs.get("obey_rate_limit", True)
-        # do not retry transient errors by default
-        retry_transient_errors = kwargs.get("retry_transient_errors", False)
+    async def _send_request(
+        self,
+        req,
+        streamed,
+        timeout,
+        cache,
+        cache_key,
+        cache_entry,
+        kwargs,
+        priority,
+        event,
+    ):
+        # The arguments of the call override the retry policy of the client
+        attempt = self.retry_policy.start(req.method, req.url, kwargs)
 
-        # set max_retries to 10 by default, disable by setting it to -1
-        max_retries = kwargs.get("max_retries", 10)
-        cur_retries = 0
+        limiter = self._get_limiter(priority)
+        adaptive = isinstance(limiter, concurrency.AdaptiveLimiter)
+        rate_limiter = self.rate_limiter
+        # The body is read separately to time the first byte for the hooks
+        stream = streamed or event is not None
 
         while True:
-            result = await self.client.send(req, stream=streamed, timeout=timeout)
+            if rate_limiter is not None:
+                await rate_limiter.aacquire()
+            try:
+                if limiter is None:
+                    result = await self._receive(req, streamed, timeout, event)
+                elif adaptive:
+                    async with limiter:
+                        result = await self._send_measured(
+                            limiter, req, streamed, timeout, event
+                        )
+                else:
+                    await limiter.acquire(priority)
+                    try:
+                        result = await self._receive(req, streamed, timeout, event)
+                    finally:
+                        limiter.release()
+            except httpx.TransportError as e:
+                wait_time = attempt.on_error(e)
+                if wait_time is None:
+                    raise
+                if event is not None:
+                    event.retrying(wait_time)
+                await asyncio.sleep(wait_time)
+                attempt.check()
+                continue
+            if rate_limiter is not None:
+                rate_limiter.update(result.headers)
+            reused = self.connections.track(result)
+            if event is not None:
+                event.reused_connection = reused
 
             self._check_redirects(result)
+            if cache is not None:
+                result = cache.process(req, result, cache_key, cache_entry)
 
+            wait_time = attempt.on_response(result)
             if 200 <= result.status_code < 300:
                 return result
 
-            if (429 == result.status_code and obey_rate_limit) or (
-                result.status_code in [500, 502, 503, 504] and retry_transient_errors
-            ):
-                if max_retries == -1 or cur_retries < max_retries:
-                    wait_time = 2 ** cur_retries * 0.1
-                    if "Retry-After" in result.headers:
-                        wait_time = int(result.headers["Retry-After"])
-                    cur_retries += 1
-                    await asyncio.sleep(wait_time)
-                    continue
-
+            if wait_time is not None:
+                # Release the connection of the unread body before retrying
+                if stream:
+                    await result.aclose()
+                if event is not None:
+                    event.retrying(wait_time)
+                await asyncio.sleep(wait_time)
+                attempt.check()
+                continue
+
+            # The body of the streamed responses is needed for the error
+            if stream:
+                await result.aread()
             error_message = result.content
             try:
-                error_json = result.json()
+                error_json = self._decode(result.content)
                 for k in ("message", "error"):
                     if k in error_json:
                         error_message = error_json[k]
@@ -932,7 +1604,7 @@ class AsyncGitlab(BaseGitlab):
             and not raw
         ):
             try:
-                return result.json()
+                return self._decode(result.content)
             except Exception:
                 raise GitlabParsingError(
                     error_message="Failed to parse the server message"
@@ -947,10 +1619,19 @@ class AsyncGitlab(BaseGitlab):
         as_list = True if as_list is None else as_list
 
         get_all = kwargs.pop("all", False)
+        concurrency = kwargs.pop("concurrency", None)
+        prefetch = kwargs.pop("prefetch", False)
         url = self._build_url(path)
 
         if get_all is True and as_list is True:
-            gitlab_list = await GitlabList.acreate(self, url, query_data, **kwargs)
+            gitlab_list = await GitlabList.acreate(
+                self,
+                url,
+                query_data,
+                concurrency=concurrency,
+                prefetch=prefetch,
+                **kwargs
+            )
             return await gitlab_list.as_list()
 
         if "page" in kwargs or as_list is True:
@@ -961,7 +1642,9 @@ class AsyncGitlab(BaseGitlab):
             return await gitlab_list.as_list()
 
         # No pagination, generator requested
-        return await GitlabList.acreate(self, url, query_data, **kwargs)
+        return await GitlabList.acreate(
+            self, url, query_data, concurrency=concurrency, prefetch=prefetch, **kwargs
+        )
 
     async def http_post(
         self, path, query_data=None, post_data=None, files=None, **kwargs
@@ -979,7 +1662,7 @@ class AsyncGitlab(BaseGitlab):
         )
         try:
             if result.headers.get("Content-Type", None) == "application/json":
-                return result.json()
+                return self._decode(result.content)
         except Exception:
             raise GitlabParsingError(error_message="Failed to parse the server message")
         return result
@@ -999,6 +1682,6 @@ class AsyncGitlab(BaseGitlab):
             **kwargs
         )
         try:
-            return result.json()
+            return self._decode(result.content)
         except Exception:
             raise GitlabParsingError(error_message="Failed to parse the server message")
@@ -0,0 +1,210 @@
+# -*- coding: utf-8 -*-
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU Lesser General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU Lesser General Public License for more details.
+#
+# You should have received a copy of the GNU Lesser General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+"""JSON codecs used to encode request bodies and decode responses."""
+
+import codecs
+import json
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+BACKENDS = ("json", "orjson")
+
+_WHITESPACE = " \t\n\r"
+
+
+class JSONCodec:
+    """Codec using the standard library ``json`` module."""
+
+    name = "json"
+
+    def loads(self, data):
+        """Decode a JSON document.
+
+        Args:
+            data (bytes): The response body
+
+        Returns:
+            The decoded data
+        """
+        return json.loads(data)
+
+    def dumps(self, obj):
+        """Encode data to JSON.
+
+        Args:
+            obj: The data to send
+
+        Returns:
+            bytes: The request body
+        """
+        return json.dumps(obj).encode("utf-8")
+
+
+class OrjsonCodec(JSONCodec):
+    """Codec using ``orjson``, which decodes and encodes bytes directly."""
+
+    name = "orjson"
+
+    def loads(self, data):
+        return orjson.loads(data)
+
+    def dumps(self, obj):
+        try:
+            return orjson.dumps(obj)
+        except TypeError:
+            # orjson is stricter (e.g. integers over 64 bits, non-str keys)
+            return super().dumps(obj)
+
+
+def get_codec(backend=None):
+    """Return the codec for a JSON backend.
+
+    If the library of the backend is not installed, the standard library
+    codec is returned instead.
+
+    Args:
+        backend (str): ``json`` (default) or ``orjson``, or an object with
+            ``loads(bytes)`` and ``dumps(obj)`` methods
+
+    Returns:
+        The codec
+
+    Raises:
+        ValueError: If the backend is unknown
+    """
+    if backend is None or backend == "json":
+        return JSONCodec()
+    if not isinstance(backend, str):
+        return backend
+    if backend == "orjson":
+        return JSONCodec() if orjson is None else OrjsonCodec()
+    raise ValueError(
+        "Unknown JSON backend: %s (expected one of %s)" % (backend, ", ".join(BACKENDS))
+    )
+
+
+class JSONArrayDecoder:
+    """Decode the items of a JSON array while its bytes are received.
+
+    The chunks of the body are given to :meth:`feed`, which returns the
+    items completed so far, so that only the item being received is kept in
+    memory. The items are decoded with the standard library ``json`` module.
+
+    Example::
+
+        decoder = JSONArrayDecoder()
+        for chunk in response.iter_bytes():
+            for item in decoder.feed(chunk):
+                process(item)
+        decoder.close()
+    """
+
+    def __init__(self):
+        self._decoder = json.JSONDecoder()
+        self._text = codecs.getincrementaldecoder("utf-8")()
+        self._buffer = ""
+        self._pos = 0
+        # start -> first (after "[") -> value/separator ... -> end
+        self._state = "start"
+        # Don't try to decode an incomplete item again until the buffer has
+        # grown enough, to avoid parsing large items over and over
+        self._retry_size = 0
+
+    def feed(self, data):
+        """Add a chunk of the body.
+
+        Args:
+            data (bytes): The next bytes of the body
+
+        Returns:
+            list: The items completed by this chunk
+
+        Raises:
+            ValueError: If the body is not a JSON array
+        """
+        self._buffer = self._buffer[self._pos :] + self._text.decode(data)
+        self._retry_size -= self._pos
+        self._pos = 0
+        return self._decode(final=False)
+
+    def close(self):
+        """Signal the end of the body.
+
+        Returns:
+            list: The last items
+
+        Raises:
+            ValueError: If the body is not a complete JSON array
+        """
+        self._buffer = self._buffer[self._pos :] + self._text.decode(b"", final=True)
+        self._pos = 0
+        self._retry_size = 0
+        items = self._decode(final=True)
+        if self._state != "end":
+            raise ValueError("Incomplete JSON array")
+        return items
+
+    def _decode(self, final):
+        items = []
+        buffer = self._buffer
+        size = len(buffer)
+        while True:
+            pos = self._pos
+            while pos < size and buffer[pos] in _WHITESPACE:
+                pos += 1
+            self._pos = pos
+            if pos == size:
+                return items
+            char = buffer[pos]
+
+            if self._state == "end":
+                raise ValueError("Extra data after the JSON array")
+            if self._state == "start":
+                if char != "[":
+                    raise ValueError("Expected a JSON array")
+                self._state = "first"
+                self._pos += 1
+                continue
+            if char == "]" and self._state in ("first", "separator"):
+                self._state = "end"
+                self._pos += 1
+                continue
+            if self._state == "separator":
+                if char != ",":
+                    raise ValueError("Expected ',' or ']' at position %d" % pos)
+                self._state = "value"
+                self._pos += 1
+                continue
+
+            if size < self._retry_size:
+                return items
+            try:
+                item, end = self._decoder.raw_decode(buffer, pos)
+            except ValueError:
+                if final:
+                    raise
+                self._retry_size = pos + 2 * (size - pos)
+                return items
+            # A number at the end of the buffer could be incomplete
+            if end == size and not final and char not in '{["':
+                self._retry_size = size + 1
+                return items
+            items.append(item)
+            self._pos = end
+            self._state = "separator"
+            self._retry_size = 0
@@ -0,0 +1,293 @@
+# -*- coding: utf-8 -*-
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU Lesser General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU Lesser General Public License for more details.
+#
+# You should have received a copy of the GNU Lesser General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+"""Column-oriented storage of listings, for analytics on large result sets.
+
+The server data is stored field by field as it is received, without creating
+RESTObjects:
+
+* ``int`` columns are ``array('q')``, ``bool`` columns ``array('b')``
+* ``float`` columns are ``array('d')``; ``int`` and ``bool`` columns become
+  ``float`` columns with NaN values when a value is missing
+* ``timestamp`` columns (ISO 8601 dates and datetimes) are ``array('d')`` of
+  POSIX timestamps, with NaN for missing values
+* ``str`` columns are lists of interned strings, ``object`` columns lists of
+  the values as decoded from JSON (e.g. labels)
+"""
+
+import array
+import calendar
+import collections.abc
+import re
+import sys
+
+KINDS = ("int", "float", "bool", "str", "timestamp", "object")
+
+NAN = float("nan")
+
+_TIMESTAMP_RE = re.compile(
+    r"(\d{4})-(\d\d)-(\d\d)"
+    r"(?:[T ](\d\d):(\d\d):(\d\d)(\.\d+)?)?"
+    r"(Z|[+-]\d\d:?\d\d)?$"
+)
+
+
+def parse_timestamp(value):
+    """Convert an ISO 8601 date or datetime string to a POSIX timestamp.
+
+    Args:
+        value (str): The date as returned by GitLab (e.g.
+            ``2020-01-01T10:00:00.000Z`` or ``2020-01-01``)
+
+    Returns:
+        float: The timestamp, or None if ``value`` is not a date
+    """
+    match = _TIMESTAMP_RE.match(value)
+    if match is None:
+        return None
+    year, month, day, hour, minute, second, fraction, tz = match.groups()
+    timestamp = calendar.timegm(
+        (
+            int(year),
+            int(month),
+            int(day),
+            int(hour or 0),
+            int(minute or 0),
+            int(second or 0),
+        )
+    )
+    if fraction:
+        timestamp += float(fraction)
+    if tz and tz != "Z":
+        offset = int(tz[1:3]) * 3600 + int(tz[-2:]) * 60
+        timestamp += -offset if tz[0] == "+" else offset
+    return float(timestamp)
+
+
+def _infer_kind(value):
+    if value.__class__ is bool:
+        return "bool"
+    if value.__class__ is int:
+        return "int"
+    if value.__class__ is float:
+        return "float"
+    if value.__class__ is str:
+        return "timestamp" if parse_timestamp(value) is not None else "str"
+    return "object"
+
+
+class _Column:
+    __slots__ = ("name", "path", "kind", "data", "_missing")
+
+    def __init__(self, name, kind=None):
+        if kind is not None and kind not in KINDS:
+            raise ValueError("Unknown column type for %s: %r" % (name, kind))
+        self.name = name
+        self.path = tuple(name.split("."))
+        self.kind = None
+        self.data = None
+        # Number of missing values before the type could be inferred
+        self._missing = 0
+        if kind is not None:
+            self._set_kind(kind)
+
+    def _set_kind(self, kind):
+        self.kind = kind
+        if kind == "int":
+            self.data = array.array("q")
+        elif kind == "bool":
+            self.data = array.array("b")
+        elif kind in ("float", "timestamp"):
+            self.data = array.array("d")
+        else:
+            self.data = []
+        for _ in range(self._missing):
+            self.append(None)
+        self._missing = 0
+
+    def _to_float(self):
+        self.data = array.array("d", self.data)
+
+    def _error(self, value):
+        return ValueError(
+            "Field %s: cannot store %r in a %s column (set the column type "
+            "in the fields argument)" % (self.name, value, self.kind)
+        )
+
+    def append(self, value):
+        kind = self.kind
+        if kind is None:
+            if value is None:
+                self._missing += 1
+                return
+            self._set_kind(_infer_kind(value))
+            kind = self.kind
+
+        if kind == "str":
+            if value is not None and value.__class__ is not str:
+                raise self._error(value)
+            self.data.append(value if value is None else sys.intern(value))
+        elif kind == "timestamp":
+            if value is None:
+                self.data.append(NAN)
+                return
+            timestamp = parse_timestamp(value) if value.__class__ is str else None
+            if timestamp is None:
+                raise self._error(value)
+            self.data.append(timestamp)
+        elif kind == "object":
+            self.data.append(value)
+        else:
+            # Numbers: missing values and floats turn the column into floats
+            if value is None:
+                value = NAN
+            elif kind == "bool" and value.__class__ is not bool:
+                raise self._error(value)
+            elif value.__class__ not in (int, float, bool):
+                raise self._error(value)
+            if value.__class__ is float and self.data.typecode != "d":
+                self._to_float()
+            self.data.append(value)
+
+
+class Columns(collections.abc.Mapping):
+    """Result of :meth:`gitlab.base.RESTObjectList.to_columns`.
+
+    A mapping of field names to columns (``array.array`` or ``list``), all
+    with one value per listed item.
+
+    Attributes:
+        kinds (dict): The type of each column (int, float, bool, str,
+            timestamp or object)
+        rows (int): The number of items
+    """
+
+    def __init__(self, columns, rows):
+        self._columns = {column.name: column.data for column in columns}
+        self.kinds = {column.name: column.kind for column in columns}
+        self.rows = rows
+
+    def __getitem__(self, name):
+        return self._columns[name]
+
+    def __iter__(self):
+        return iter(self._columns)
+
+    def __len__(self):
+        return len(self._columns)
+
+    def __repr__(self):
+        return "<Columns %s, %d rows>" % (list(self._columns), self.rows)
+
+    def to_numpy(self):
+        """Convert the columns to NumPy arrays.
+
+        Numeric columns share their memory with the arrays, timestamp
+        columns become ``datetime64[us]`` arrays (NaT for missing values)
+        and the other columns object arrays.
+
+        Returns:
+            dict: A mapping of field names to NumPy arrays
+
+        Raises:
+            ImportError: If NumPy is not installed
+        """
+        try:
+            import numpy
+        except ImportError:
+            raise ImportError(
+                "NumPy is not installed.\n"
+                "Install it with `pip install numpy` to use to_numpy()"
+            )
+
+        arrays = {}
+        for name, data in self._columns.items():
+            kind = self.kinds[name]
+            if kind == "timestamp":
+                values = numpy.frombuffer(data, dtype=numpy.float64)
+                missing = numpy.isnan(values)
+                micros = numpy.where(missing, 0, values * 1e6).astype(numpy.int64)
+                result = micros.view("datetime64[us]")
+                result[missing] = numpy.datetime64("NaT")
+            elif isinstance(data, array.array):
+                dtype = {"q": numpy.int64, "b": numpy.int8, "d": numpy.float64}
+                result = numpy.frombuffer(data, dtype=dtype[data.typecode])
+                if data.typecode == "b":
+                    result = result.astype(bool)
+            else:
+                result = numpy.empty(len(data), dtype=object)
+                result[:] = data
+            arrays[name] = result
+        return arrays
+
+    def to_pandas(self):
+        """Convert the columns to a pandas DataFrame.
+
+        Timestamp columns become timezone-aware (UTC) datetime columns.
+
+        Returns:
+            pandas.DataFrame: One row per item, one column per field
+
+        Raises:
+            ImportError: If pandas is not installed
+        """
+        try:
+            import pandas
+        except ImportError:
+            raise ImportError(
+                "pandas is not installed.\n"
+                "Install it with `pip install pandas` to use to_pandas()"
+            )
+
+        arrays = self.to_numpy()
+        for name, kind in self.kinds.items():
+            if kind == "timestamp":
+                arrays[name] = pandas.to_datetime(arrays[name], utc=True)
+        return pandas.DataFrame(arrays, columns=list(self._columns))
+
+
+class ColumnsBuilder:
+    """Store the items of a listing in columns, one item at a time.
+
+    Args:
+        fields (list or dict): The fields to keep. Nested fields are
+            separated with a dot (e.g. ``author.username``). Use a dict to
+            set the type of some columns (e.g. ``{"due_date": "timestamp"}``,
+            ``None`` to infer it from the first value)
+    """
+
+    def __init__(self, fields):
+        if isinstance(fields, str):
+            raise TypeError("fields must be a list or dict of field names")
+        if not isinstance(fields, dict):
+            fields = dict.fromkeys(fields)
+        self._columns = [_Column(name, kind) for name, kind in fields.items()]
+        self._rows = 0
+
+    def add(self, item):
+        """Add the values of a server item (a dict) to the columns."""
+        for column in self._columns:
+            path = column.path
+            value = item.get(path[0])
+            for key in path[1:]:
+                value = value.get(key) if isinstance(value, dict) else None
+            column.append(value)
+        self._rows += 1
+
+    def columns(self):
+        """Return the :class:`Columns` built so far."""
+        for column in self._columns:
+            if column.kind is None:
+                column._set_kind("object")
+        return Columns(self._columns, self._rows)
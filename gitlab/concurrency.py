@@ -0,0 +1,634 @@
+# -*- coding: utf-8 -*-
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU Lesser General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU Lesser General Public License for more details.
+#
+# You should have received a copy of the GNU Lesser General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+"""Helpers to run several API calls concurrently."""
+
+import asyncio
+import collections
+import concurrent.futures
+import contextlib
+import contextvars
+import functools
+import heapq
+import itertools
+import threading
+import time
+
+import httpx
+from gitlab import exceptions as exc
+
+#: Priority of the requests answering a user (served first)
+INTERACTIVE = 0
+#: Priority of the batch jobs (crawls, exports, ...)
+BACKGROUND = 10
+
+_priority = contextvars.ContextVar("gitlab_priority", default=INTERACTIVE)
+
+
+def get_priority():
+    """Return the priority of the requests of the current context."""
+    return _priority.get()
+
+
+@contextlib.contextmanager
+def priority(level):
+    """Set the priority of the requests made in a ``with`` block.
+
+    The tasks created in the block (e.g. by :func:`gather`) inherit the
+    priority::
+
+        with gitlab.concurrency.priority(gitlab.concurrency.BACKGROUND):
+            await gl.projects.list(all=True)
+
+    Args:
+        level (int): The priority (lower is served first)
+    """
+    token = _priority.set(level)
+    try:
+        yield
+    finally:
+        _priority.reset(token)
+
+
+async def gather(aws, limit=None, return_exceptions=True, cancel_on_error=False):
+    """Run awaitables concurrently, with at most ``limit`` of them running.
+
+    Args:
+        aws: Iterable of awaitables (usually API calls on an AsyncGitlab)
+        limit (int): Maximum number of awaitables running at the same time
+            (no limit if None), or an :class:`AdaptiveLimiter`
+        return_exceptions (bool): If True, exceptions are returned in place
+            of the results of the failed items. Otherwise the first exception
+            is raised.
+        cancel_on_error (bool): If True, cancel the remaining items as soon
+            as one fails and raise its exception
+
+    Returns:
+        list: The results (or exceptions), in the same order as ``aws``
+    """
+    aws = list(aws)
+    if isinstance(limit, AdaptiveLimiter):
+        semaphore = limit
+    else:
+        semaphore = asyncio.Semaphore(limit) if limit else None
+
+    async def run(aw):
+        if semaphore is None:
+            return await aw
+        async with semaphore:
+            if semaphore is limit:
+                with limit.measure():
+                    return await aw
+            return await aw
+
+    tasks = [asyncio.ensure_future(run(aw)) for aw in aws]
+    if not cancel_on_error:
+        return await asyncio.gather(*tasks, return_exceptions=return_exceptions)
+
+    try:
+        return await asyncio.gather(*tasks)
+    except BaseException:
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+        # coroutines cancelled before being scheduled were never started
+        for aw in aws:
+            if asyncio.iscoroutine(aw):
+                aw.close()
+        raise
+
+
+class BatchExecutor:
+    """Run API calls of a synchronous client in a thread pool.
+
+    The calls share the client and its ``httpx.Client`` connection pool. Use
+    :meth:`gitlab.Gitlab.executor` to create one::
+
+        with gl.executor(max_workers=8) as executor:
+            branches = executor.map(lambda p: p.branches.list(), projects)
+
+    Args:
+        max_workers (int): Maximum number of threads
+        limiter (AdaptiveLimiter): Adapt the number of calls running at the
+            same time to the outcome of the calls (at most ``max_workers``)
+    """
+
+    def __init__(self, max_workers=None, limiter=None):
+        self._pool = concurrent.futures.ThreadPoolExecutor(
+            max_workers=max_workers, thread_name_prefix="python-gitlab"
+        )
+        self._limiter = limiter
+
+    def _run(self, func, *args, **kwargs):
+        with self._limiter, self._limiter.measure():
+            return func(*args, **kwargs)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        self.shutdown()
+
+    def submit(self, func, *args, **kwargs):
+        """Schedule ``func(*args, **kwargs)`` and return its future.
+
+        The function runs in a copy of the context of the caller, like the
+        tasks of an event loop.
+        """
+        run = contextvars.copy_context().run
+        if self._limiter is not None:
+            return self._pool.submit(run, self._run, func, *args, **kwargs)
+        return self._pool.submit(run, func, *args, **kwargs)
+
+    def map(self, func, items, return_exceptions=True, cancel_on_error=False):
+        """Call ``func`` on each item in the thread pool.
+
+        Args:
+            func (callable): Function making the API calls for one item
+            items (iterable): The items to process
+            return_exceptions (bool): If True, exceptions are returned in
+                place of the results of the failed items. Otherwise the first
+                exception is raised.
+            cancel_on_error (bool): If True, the items not started yet are
+                cancelled as soon as one fails, and its exception is raised
+
+        Returns:
+            list: The results (or exceptions), in the order of ``items``
+        """
+        futures = [self.submit(func, item) for item in items]
+
+        if cancel_on_error:
+            done, not_done = concurrent.futures.wait(
+                futures, return_when=concurrent.futures.FIRST_EXCEPTION
+            )
+            failed = [f for f in futures if f in done and f.exception()]
+            if failed:
+                for future in not_done:
+                    future.cancel()
+                raise failed[0].exception()
+
+        results = []
+        for future in futures:
+            try:
+                results.append(future.result())
+            except Exception as e:
+                if not return_exceptions:
+                    raise
+                results.append(e)
+        return results
+
+    def shutdown(self, wait=True):
+        """Release the threads once the pending calls are done."""
+        self._pool.shutdown(wait=wait)
+
+
+class SingleFlight:
+    """Share the result of identical calls running at the same time.
+
+    The first call for a key runs, and the calls made with the same key
+    until it completes wait for it and get its result (or exception). Use
+    :meth:`run` from threads and :meth:`arun` from the tasks of an event
+    loop. For :meth:`arun`, the shared call runs in its own task, so that
+    cancelling one caller doesn't cancel the call for the others.
+
+    Attributes:
+        shared (int): Number of calls that got the result of another one
+    """
+
+    def __init__(self):
+        self.shared = 0
+        self._calls = {}
+        self._lock = threading.Lock()
+
+    def __getstate__(self):
+        return {"shared": self.shared}
+
+    def __setstate__(self, state):
+        self.__init__()
+        self.__dict__.update(state)
+
+    def __len__(self):
+        return len(self._calls)
+
+    def run(self, key, func):
+        """Call ``func()``, or wait for the running call with the same key.
+
+        Args:
+            key: Hashable key identifying identical calls
+            func (callable): The call
+
+        Returns:
+            The result of the call
+        """
+        with self._lock:
+            future = self._calls.get(key)
+            leader = future is None
+            if leader:
+                future = self._calls[key] = concurrent.futures.Future()
+            else:
+                self.shared += 1
+        if not leader:
+            return future.result()
+
+        try:
+            result = func()
+        except BaseException as e:
+            self._forget(key)
+            future.set_exception(e)
+            raise
+        self._forget(key)
+        future.set_result(result)
+        return result
+
+    async def arun(self, key, func):
+        """Await ``func()``, or the running call with the same key.
+
+        Args:
+            key: Hashable key identifying identical calls
+            func (callable): Function returning the awaitable call
+
+        Returns:
+            The result of the call
+        """
+        with self._lock:
+            task = self._calls.get(key)
+            if task is None:
+                task = self._calls[key] = asyncio.ensure_future(func())
+                task.add_done_callback(functools.partial(self._done, key))
+            else:
+                self.shared += 1
+        return await asyncio.shield(task)
+
+    def _forget(self, key):
+        with self._lock:
+            del self._calls[key]
+
+    def _done(self, key, task):
+        self._forget(key)
+        # Avoid a warning if all the callers were cancelled
+        if not task.cancelled():
+            task.exception()
+
+
+class PriorityLimiter:
+    """Limit of the requests in flight, admitting the urgent ones first.
+
+    When all the slots are taken, the waiting requests get the freed slots
+    by priority (lower first), then by arrival. To avoid starving the low
+    priorities, a request waiting for more than ``max_wait`` seconds is
+    served before the others. The limiter must be used from a single event
+    loop.
+
+    Args:
+        limit (int): Maximum number of requests in flight
+        max_wait (float): Waiting time after which a request is served
+            regardless of its priority, in seconds
+
+    Attributes:
+        promoted (int): Number of requests served because of ``max_wait``
+    """
+
+    def __init__(self, limit, max_wait=2.0):
+        if limit < 1:
+            raise ValueError("limit must be at least 1")
+        self.limit = limit
+        self.max_wait = max_wait
+        self.promoted = 0
+        self._in_flight = 0
+        self._waiting = 0
+        # Entries are [priority, sequence, enqueue time, future], in a heap by
+        # priority and in a deque by arrival
+        self._heap = []
+        self._arrivals = collections.deque()
+        self._sequence = itertools.count()
+
+    @property
+    def in_flight(self):
+        """The number of requests running."""
+        return self._in_flight
+
+    @property
+    def waiting(self):
+        """The number of requests waiting for a slot."""
+        return self._waiting
+
+    @property
+    def stats(self):
+        """The limit, the requests in flight and waiting, by priority."""
+        waiting = collections.Counter(
+            entry[0] for entry in self._arrivals if not entry[3].done()
+        )
+        return {
+            "limit": self.limit,
+            "in_flight": self._in_flight,
+            "waiting": dict(waiting),
+            "promoted": self.promoted,
+        }
+
+    async def acquire(self, priority=INTERACTIVE):
+        """Wait for a slot.
+
+        Args:
+            priority (int): The priority of the request (lower first)
+        """
+        if self._in_flight < self.limit and not self._waiting:
+            self._in_flight += 1
+            return
+        future = asyncio.get_event_loop().create_future()
+        entry = [priority, next(self._sequence), time.monotonic(), future]
+        heapq.heappush(self._heap, entry)
+        self._arrivals.append(entry)
+        self._waiting += 1
+        try:
+            await future
+        except asyncio.CancelledError:
+            if future.cancelled():
+                self._waiting -= 1
+            else:
+                # The slot was handed over at the same time
+                self.release()
+            raise
+
+    def _next_waiter(self):
+        # Drop the entries already served or cancelled
+        while self._arrivals and self._arrivals[0][3].done():
+            self._arrivals.popleft()
+        while self._heap and self._heap[0][3].done():
+            heapq.heappop(self._heap)
+        if not self._arrivals:
+            return None
+        oldest = self._arrivals[0]
+        if (
+            time.monotonic() - oldest[2] >= self.max_wait
+            and oldest is not self._heap[0]
+        ):
+            self.promoted += 1
+            return self._arrivals.popleft()
+        return heapq.heappop(self._heap)
+
+    def release(self):
+        """Give a slot back, handing it over to the next waiting request."""
+        waiter = self._next_waiter()
+        if waiter is None:
+            self._in_flight -= 1
+        else:
+            self._waiting -= 1
+            waiter[3].set_result(None)
+
+    async def __aenter__(self):
+        await self.acquire(get_priority())
+        return self
+
+    async def __aexit__(self, *args):
+        self.release()
+
+
+class _Measure:
+    # Record the outcome of a call made under an AdaptiveLimiter
+    def __init__(self, limiter):
+        self._limiter = limiter
+
+    def __enter__(self):
+        self._start = time.monotonic()
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        elapsed = time.monotonic() - self._start
+        if exc_type is None:
+            self._limiter.record(200, elapsed)
+        elif getattr(exc_value, "response_code", None):
+            self._limiter.record(exc_value.response_code, elapsed)
+        elif isinstance(exc_value, (httpx.TransportError, exc.GitlabConnectionError)):
+            # Network error
+            self._limiter.record(None, elapsed)
+
+
+class AdaptiveLimiter:
+    """Concurrency limit adapted to the health of the server (AIMD).
+
+    The limit grows additively (by ``increase`` every ``limit`` successful
+    requests, i.e. about once per round trip) while the server answers
+    quickly, and is cut multiplicatively on 429 and 5xx responses, network
+    errors, or when the 95th percentile of the latency exceeds
+    ``latency_factor`` times the lowest one seen. Only one cut is made for
+    the requests that were in flight at the same time.
+
+    Use it in place of a fixed limit: as ``max_concurrency`` of a client,
+    to limit the requests in flight, or as the ``limit`` of
+    :func:`gather`, :meth:`gitlab.AsyncGitlab.gather` and the ``map()``
+    helpers, to limit the calls running at the same time (their outcome is
+    used instead of the HTTP responses). Don't use the same limiter for both,
+    since a call would then wait for a slot held by itself. A limiter can be
+    shared between threads, or between the tasks of an event loop::
+
+        limiter = AdaptiveLimiter(initial=4, max_limit=32)
+        gl = gitlab.AsyncGitlab(url, token, max_concurrency=limiter)
+
+    Args:
+        initial (int): Initial limit
+        min_limit (int): Lowest limit
+        max_limit (int): Highest limit
+        increase (float): Increase of the limit per round trip
+        decrease (float): Factor applied to the limit on errors
+        latency_factor (float): Increase of the latency considered a spike
+        window (int): Number of latencies used to compute the percentile
+
+    Attributes:
+        increases (int): Number of times the limit was raised
+        decreases (int): Number of times the limit was cut
+    """
+
+    def __init__(
+        self,
+        initial=4,
+        min_limit=1,
+        max_limit=64,
+        increase=1.0,
+        decrease=0.5,
+        latency_factor=2.0,
+        window=50,
+    ):
+        if not 1 <= min_limit <= initial <= max_limit:
+            raise ValueError("Expected 1 <= min_limit <= initial <= max_limit")
+        self.min_limit = min_limit
+        self.max_limit = max_limit
+        self.increase = increase
+        self.decrease = decrease
+        self.latency_factor = latency_factor
+        self.window = window
+        self.increases = self.decreases = 0
+        self._limit = float(initial)
+        self._in_flight = 0
+        self._latencies = collections.deque(maxlen=window)
+        self._baseline = None
+        self._last_cut = 0.0
+        self._init_sync()
+
+    def _init_sync(self):
+        self._lock = threading.Lock()
+        self._condition = threading.Condition(self._lock)
+        self._waiters = collections.deque()
+
+    def __getstate__(self):
+        state = self.__dict__.copy()
+        for name in ("_lock", "_condition", "_waiters"):
+            state.pop(name)
+        state["_in_flight"] = 0
+        return state
+
+    def __setstate__(self, state):
+        self.__dict__.update(state)
+        self._init_sync()
+
+    @property
+    def limit(self):
+        """The current number of requests allowed at the same time."""
+        return int(self._limit)
+
+    @property
+    def in_flight(self):
+        """The number of requests running."""
+        return self._in_flight
+
+    @property
+    def stats(self):
+        """The current limit, the requests in flight and the latencies."""
+        with self._lock:
+            return {
+                "limit": self.limit,
+                "in_flight": self._in_flight,
+                "p95": self._percentile(),
+                "baseline": self._baseline,
+                "increases": self.increases,
+                "decreases": self.decreases,
+            }
+
+    def _percentile(self, fraction=0.95):
+        if not self._latencies:
+            return None
+        latencies = sorted(self._latencies)
+        return latencies[min(int(len(latencies) * fraction), len(latencies) - 1)]
+
+    def _try_acquire(self):
+        if self._in_flight < int(self._limit):
+            self._in_flight += 1
+            return True
+        return False
+
+    def _wake(self):
+        # Called with the lock held, when slots may be available
+        available = max(int(self._limit) - self._in_flight, 0)
+        self._condition.notify(available)
+        for _ in range(min(len(self._waiters), available)):
+            loop, future = self._waiters.popleft()
+            loop.call_soon_threadsafe(_set_done, future)
+
+    def acquire(self):
+        """Wait for a slot (threads)."""
+        with self._condition:
+            while not self._try_acquire():
+                self._condition.wait()
+
+    async def aacquire(self):
+        """Wait for a slot (tasks)."""
+        loop = asyncio.get_event_loop()
+        while True:
+            with self._lock:
+                if self._try_acquire():
+                    return
+                future = loop.create_future()
+                self._waiters.append((loop, future))
+            try:
+                await future
+            except asyncio.CancelledError:
+                with self._lock:
+                    if (loop, future) in self._waiters:
+                        self._waiters.remove((loop, future))
+                    else:
+                        # Pass the wake-up on to another waiter
+                        self._wake()
+                raise
+
+    def release(self):
+        """Give a slot back."""
+        with self._lock:
+            self._in_flight -= 1
+            self._wake()
+
+    def __enter__(self):
+        self.acquire()
+        return self
+
+    def __exit__(self, *args):
+        self.release()
+
+    async def __aenter__(self):
+        await self.aacquire()
+        return self
+
+    async def __aexit__(self, *args):
+        self.release()
+
+    def measure(self):
+        """Context manager recording the outcome of a call.
+
+        Successful calls count as 200 responses, and exceptions with a
+        ``response_code`` (e.g. :class:`~gitlab.exceptions.GitlabHttpError`)
+        with their status code.
+        """
+        return _Measure(self)
+
+    def record(self, status_code, elapsed):
+        """Adapt the limit to the outcome of a request.
+
+        Args:
+            status_code (int): The response status, or None for a network
+                error or a timeout
+            elapsed (float): Duration of the request, in seconds
+        """
+        with self._lock:
+            now = time.monotonic()
+            overloaded = status_code is None or status_code == 429
+            overloaded = overloaded or status_code >= 500
+            if not overloaded:
+                self._latencies.append(elapsed)
+                p95 = self._percentile()
+                if len(self._latencies) == self.window:
+                    if self._baseline is None or p95 < self._baseline:
+                        self._baseline = p95
+                    elif p95 > self._baseline * self.latency_factor:
+                        overloaded = True
+            if overloaded:
+                # The requests started before the last cut were sent with
+                # the previous limit
+                if now - elapsed >= self._last_cut:
+                    self._limit = max(self._limit * self.decrease, self.min_limit)
+                    self._last_cut = now
+                    self.decreases += 1
+                    # Measure the latency again at the new limit
+                    self._latencies.clear()
+                return
+            if self._limit < self.max_limit:
+                before = int(self._limit)
+                self._limit = min(
+                    self._limit + self.increase / self._limit, self.max_limit
+                )
+                if int(self._limit) > before:
+                    self.increases += 1
+                    self._wake()
+
+
+def _set_done(future):
+    if not future.done():
+        future.set_result(None)
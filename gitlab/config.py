@@ -175,3 +175,77 @@ class GitlabConfigParser(object):
             self.order_by = self._config.get(self.gitlab_id, "order_by")
         except Exception:
             pass
+
+        self.json_backend = None
+        for section in ["global", self.gitlab_id]:
+            try:
+                self.json_backend = self._config.get(section, "json_backend")
+            except Exception:
+                pass
+
+        self.cache = False
+        self.cache_path = None
+        self.cache_ttl = []
+        for section in ["global", self.gitlab_id]:
+            try:
+                self.cache = self._config.getboolean(section, "cache")
+            except Exception:
+                pass
+            try:
+                self.cache_path = os.path.expanduser(
+                    self._config.get(section, "cache_path")
+                )
+            except Exception:
+                pass
+            try:
+                ttl = self._config.get(section, "cache_ttl")
+            except Exception:
+                continue
+            self.cache_ttl = self._parse_cache_ttl(ttl)
+
+        self.rate_limit = False
+        for section in ["global", self.gitlab_id]:
+            try:
+                self.rate_limit = self._config.getboolean(section, "rate_limit")
+            except Exception:
+                pass
+
+        self.http2 = False
+        self.max_connections = 100
+        self.max_keepalive_connections = 20
+        self.keepalive_expiry = 5.0
+        for section in ["global", self.gitlab_id]:
+            try:
+                self.http2 = self._config.getboolean(section, "http2")
+            except Exception:
+                pass
+            try:
+                self.max_connections = self._config.getint(section, "max_connections")
+            except Exception:
+                pass
+            try:
+                self.max_keepalive_connections = self._config.getint(
+                    section, "max_keepalive_connections"
+                )
+            except Exception:
+                pass
+            try:
+                self.keepalive_expiry = self._config.getfloat(
+                    section, "keepalive_expiry"
+                )
+            except Exception:
+                pass
+
+    @staticmethod
+    def _parse_cache_ttl(value):
+        # One "<path pattern> = <seconds>" per line
+        ttl = []
+        for line in value.splitlines():
+            if not line.strip():
+                continue
+            try:
+                pattern, seconds = line.rsplit("=", 1)
+                ttl.append((pattern.strip(), int(seconds)))
+            except ValueError:
+                raise GitlabDataError("Invalid cache_ttl line: %s" % line.strip())
+        return ttl
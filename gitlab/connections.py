@@ -0,0 +1,95 @@
+# -*- coding: utf-8 -*-
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU Lesser General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU Lesser General Public License for more details.
+#
+# You should have received a copy of the GNU Lesser General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+"""Tracking of the connections used by the requests."""
+
+import threading
+import weakref
+
+# Attributes leading from an httpx response to the httpcore connection that
+# received it (httpx 0.18, httpx 0.14)
+_CONNECTION_PATHS = (
+    ("stream", "_stream", "_httpcore_stream", "connection"),
+    ("_raw_stream", "connection"),
+)
+
+
+def get_connection(response):
+    """Return the connection of the pool that received a response.
+
+    Args:
+        response (httpx.Response): The response
+
+    Returns:
+        The connection object, or None if it can't be found (e.g. mocked
+        responses, or an unsupported version of httpx)
+    """
+    for path in _CONNECTION_PATHS:
+        obj = response
+        for name in path:
+            obj = getattr(obj, name, None)
+            if obj is None:
+                break
+        else:
+            return obj
+    return None
+
+
+class ConnectionTracker:
+    """Count the requests sent on new and on reused connections.
+
+    Attributes:
+        opened (int): Requests that opened a new connection
+        reused (int): Requests sent on a connection kept in the pool
+        unknown (int): Requests whose connection couldn't be found
+    """
+
+    def __init__(self):
+        self.opened = self.reused = self.unknown = 0
+        self._seen = weakref.WeakSet()
+        self._lock = threading.Lock()
+
+    def __getstate__(self):
+        return self.stats
+
+    def __setstate__(self, state):
+        self.__init__()
+        self.__dict__.update(state)
+
+    @property
+    def stats(self):
+        """The counters, as a dict."""
+        return {"opened": self.opened, "reused": self.reused, "unknown": self.unknown}
+
+    def track(self, response):
+        """Record the connection of a response.
+
+        Args:
+            response (httpx.Response): The response
+
+        Returns:
+            bool: Whether the request reused a pooled connection, or None if
+            unknown
+        """
+        connection = get_connection(response)
+        with self._lock:
+            if connection is None:
+                self.unknown += 1
+                return None
+            if connection in self._seen:
+                self.reused += 1
+                return True
+            self._seen.add(connection)
+            self.opened += 1
+            return False
@@ -0,0 +1,188 @@
+# -*- coding: utf-8 -*-
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU Lesser General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU Lesser General Public License for more details.
+#
+# You should have received a copy of the GNU Lesser General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+"""Events reported to the request hooks of a client."""
+
+import contextvars
+import re
+import time
+
+import httpx
+from gitlab.base import RESTManager, RESTObject
+
+# Path segments replaced by ":id" in the URL templates: numeric IDs, URL
+# encoded paths (group%2Fproject) and commit SHAs
+_ID_SEGMENT = re.compile(r"^(\d+|.*%2[fF].*|[0-9a-f]{7,40})$")
+
+# The attributes of the parents in the manager paths
+_PARENT_ATTR = re.compile(r"%\(\w+\)s")
+
+#: The manager or object whose method is running (set by on_http_error)
+caller = contextvars.ContextVar("gitlab_caller", default=None)
+
+
+def _generic_template(path):
+    return "/".join(
+        ":id" if _ID_SEGMENT.match(segment) else segment for segment in path.split("/")
+    )
+
+
+def _manager_of(obj):
+    if isinstance(obj, RESTObject):
+        obj = obj.manager
+    return obj if isinstance(obj, RESTManager) else None
+
+
+def url_template(path, caller=None):
+    """Return a path with the IDs replaced by ``:id``.
+
+    If the request is made by a manager (or an object), its ``_path`` is used
+    for the beginning of the path, e.g. ``/projects/%(project_id)s/jobs``
+    gives ``/projects/:id/jobs``, and the ID of the object follows. In the
+    rest of the path, the numbers, URL encoded paths and commit SHAs are
+    replaced::
+
+        >>> url_template("/projects/group%2Fproject/issues/12")
+        '/projects/:id/issues/:id'
+
+    Args:
+        path (str): The path of a request, relative to the API URL
+        caller (RESTManager or RESTObject): The manager or object making the
+            request
+    """
+    manager = _manager_of(caller)
+    if manager is None or manager._path is None:
+        return _generic_template(path)
+    prefix = manager.path
+    if not path.startswith(prefix) or path[len(prefix) : len(prefix) + 1] not in (
+        "",
+        "/",
+    ):
+        return _generic_template(path)
+    segments = path[len(prefix) :].split("/")
+    if isinstance(caller, RESTObject) and len(segments) > 1:
+        segments[1] = ":id"
+    return _PARENT_ATTR.sub(":id", manager._path) + _generic_template(
+        "/".join(segments)
+    )
+
+
+class RequestEvent:
+    """What happened during an API request.
+
+    Attributes:
+        method (str): The HTTP method
+        url (str): The URL, with the query string
+        url_template (str): The path relative to the API URL, with the IDs
+            replaced by ``:id`` (e.g. ``/projects/:id/issues``)
+        manager (type): The class of the manager making the request, or
+            None for the direct calls to the client
+        status_code (int): The status of the last response, or None if no
+            response was received
+        bytes_sent (int): Size of the request body
+        bytes_received (int): Size of the response body, or None if unknown
+            (streamed responses without ``Content-Length``)
+        ttfb (float): Time between sending the last attempt and receiving the
+            headers of its response, in seconds
+        start (float): Value of ``time.monotonic()`` when the request
+            started
+        elapsed (float): Total time of the request, including the retries,
+            in seconds
+        retries (int): Number of times the request was sent again
+        sleep_time (float): Time spent waiting between the retries, in
+            seconds
+        reused_connection (bool): Whether the last response came on a
+            connection kept in the pool (None if unknown)
+        cached (bool): Whether the response was served by the cache of the
+            client without a request
+        error (Exception): The exception raised by the request, if any
+    """
+
+    def __init__(self, method, url, api_url, caller=None):
+        """Start the event of a request.
+
+        Args:
+            method (str): The HTTP method
+            url (httpx.URL): The URL of the request
+            api_url (str): The URL of the API
+            caller (RESTManager or RESTObject): The manager or object making
+                the request
+        """
+        self.method = method.upper()
+        self.url = str(url)
+        path = url.path
+        api_path = httpx.URL(api_url).path.rstrip("/")
+        if path.startswith(api_path):
+            path = path[len(api_path) :]
+        self.url_template = url_template(path, caller)
+        manager = _manager_of(caller)
+        self.manager = None if manager is None else type(manager)
+        self.status_code = None
+        self.bytes_sent = 0
+        self.bytes_received = None
+        self.ttfb = None
+        self.elapsed = None
+        self.retries = 0
+        self.sleep_time = 0.0
+        self.reused_connection = None
+        self.cached = False
+        self.error = None
+        self.start = time.monotonic()
+        self._attempt_start = None
+
+    def __repr__(self):
+        return "<RequestEvent %s %s %s in %.3fs>" % (
+            self.method,
+            self.url_template,
+            self.status_code,
+            self.elapsed or 0,
+        )
+
+    def sending(self, request):
+        """Record the start of an attempt."""
+        self.bytes_sent = int(request.headers.get("Content-Length", 0))
+        self._attempt_start = time.monotonic()
+
+    def received(self, response):
+        """Record the headers of a response."""
+        self.ttfb = time.monotonic() - self._attempt_start
+        self.status_code = response.status_code
+        self.bytes_received = None
+        if "Content-Length" in response.headers:
+            self.bytes_received = int(response.headers["Content-Length"])
+
+    def read(self, response):
+        """Record the body of a response."""
+        self.bytes_received = getattr(
+            response, "num_bytes_downloaded", len(response.content)
+        )
+
+    def retrying(self, wait_time):
+        """Record a retry."""
+        self.retries += 1
+        self.sleep_time += wait_time
+
+    def finish(self, response=None, error=None):
+        """Record the end of the request.
+
+        Args:
+            response (httpx.Response): The response returned, if not sent by
+                this request (served by the cache, or by an identical
+                request in flight)
+            error (Exception): The exception raised, if any
+        """
+        self.elapsed = time.monotonic() - self.start
+        self.error = error
+        if response is not None and self.status_code is None:
+            self.status_code = response.status_code
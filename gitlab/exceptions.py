@@ -18,6 +18,8 @@
 import asyncio
 import functools
 
+from gitlab import events
+
 
 class GitlabError(Exception):
     def __init__(self, error_message="", response_code=None, response_body=None):
@@ -58,6 +60,10 @@ class GitlabConnectionError(GitlabError):
     pass
 
 
+class GitlabCircuitOpenError(GitlabConnectionError):
+    pass
+
+
 class GitlabOperationError(GitlabError):
     pass
 
@@ -264,21 +270,35 @@ def on_http_error(error):
     def wrap(f):
         @functools.wraps(f)
         def wrapped_f(*args, **kwargs):
+            # Tell the request hooks which manager (or object) is calling.
+            # The outermost one is kept, e.g. the object whose delete() calls
+            # the delete() of its manager.
+            token = None
+            if args and events.caller.get() is None:
+                token = events.caller.set(args[0])
             try:
                 result = f(*args, **kwargs)
             except GitlabHttpError as e:
                 raise error(e.error_message, e.response_code, e.response_body)
-            else:
-                if not asyncio.iscoroutine(result):
-                    return result
-
-                async def awaiter(result):
-                    try:
-                        return await result
-                    except GitlabHttpError as e:
-                        raise error(e.error_message, e.response_code, e.response_body)
-
-                return awaiter(result)
+            finally:
+                if token is not None:
+                    events.caller.reset(token)
+            if not asyncio.iscoroutine(result):
+                return result
+
+            async def awaiter(result):
+                token = None
+                if args and events.caller.get() is None:
+                    token = events.caller.set(args[0])
+                try:
+                    return await result
+                except GitlabHttpError as e:
+                    raise error(e.error_message, e.response_code, e.response_body)
+                finally:
+                    if token is not None:
+                        events.caller.reset(token)
+
+            return awaiter(result)
 
         return wrapped_f
 
@@ -0,0 +1,770 @@
+# -*- coding: utf-8 -*-
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU Lesser General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU Lesser General Public License for more details.
+#
+# You should have received a copy of the GNU Lesser General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+"""In-process stand-in for the GitLab API, for tests and benchmarks."""
+
+import asyncio
+import bisect
+import collections
+import datetime
+import email.utils
+import hashlib
+import http
+import http.server
+import json
+import math
+import random
+import threading
+import time
+from urllib.parse import parse_qsl, unquote, urlencode, urlsplit
+
+import httpx
+
+import gitlab
+
+_START = datetime.datetime(2020, 1, 1, tzinfo=datetime.timezone.utc)
+_CHUNK_SIZE = 64 * 1024
+_JSON = ("Content-Type", "application/json")
+_WORDS = (
+    "add",
+    "api",
+    "build",
+    "cache",
+    "ci",
+    "crash",
+    "docs",
+    "error",
+    "fix",
+    "login",
+    "merge",
+    "page",
+    "pipeline",
+    "refactor",
+    "release",
+    "runner",
+    "slow",
+    "test",
+    "update",
+    "user",
+)
+
+
+class _Response:
+    def __init__(self, status, body=b"", headers=None):
+        self.status = status
+        self.body = body
+        self.headers = headers or []
+
+
+def _json_response(status, data, headers=None):
+    body = json.dumps(data).encode()
+    headers = [_JSON] + (headers or [])
+    return _Response(status, body, headers)
+
+
+def _error(status, message=None):
+    if message is None:
+        message = "%d %s" % (status, http.HTTPStatus(status).phrase)
+    return _json_response(status, {"message": message})
+
+
+def _with_statistics(project):
+    project_id = project["id"]
+    return dict(
+        project,
+        statistics={
+            "commit_count": project_id * 3,
+            "storage_size": project_id * 1024,
+            "repository_size": project_id * 512,
+            "wiki_size": 0,
+            "lfs_objects_size": 0,
+            "job_artifacts_size": project_id * 256,
+            "packages_size": 0,
+        },
+    )
+
+
+def _timestamp(seconds):
+    moment = _START + datetime.timedelta(seconds=seconds)
+    return moment.strftime("%Y-%m-%dT%H:%M:%S.000Z")
+
+
+class FakeGitlab:
+    """A fake GitLab API served in process, without network.
+
+    The server holds generated projects, with their issues, merge requests
+    and jobs (with artifacts and traces), and serves them as GitLab does:
+    offset pagination (``Link`` and ``X-Total*`` headers), keyset pagination
+    (``pagination=keyset``), ETags and ``304 Not Modified`` responses, and
+    the ``RateLimit-*`` headers. The latency of the requests, the rate limit
+    and the errors can be configured, to test the behavior of the clients
+    under load. It only serves GET (and HEAD) requests.
+
+    :meth:`gitlab` and :meth:`async_gitlab` return clients using it. It can
+    also be used as a WSGI (:meth:`wsgi_app`) or ASGI (:meth:`asgi_app`)
+    application.
+
+    Args:
+        url (str): The URL of the fake server
+        private_token (str): The token required by the server (None to
+            accept the requests without a token)
+        projects (int): Number of projects
+        issues (int): Number of issues per project
+        merge_requests (int): Number of merge requests per project
+        jobs (int): Number of jobs per project
+        artifact_size (int): Size of the artifacts archives, in bytes
+        latency (float): Time to answer a request, in seconds
+        jitter (float): Maximum random time added to the latency, in seconds
+        error_rate (float): Fraction of the requests answered with an error
+        error_statuses (tuple): Statuses of these errors, picked at random
+        rate_limit (int): Number of requests allowed per ``rate_limit_period``
+            before answering ``429 Too Many Requests`` (None for no limit)
+        rate_limit_period (float): Period of the rate limit, in seconds
+        seed (int): Seed of the generated data and of the random errors
+
+    Attributes:
+        request_count (int): Number of requests received
+        statuses (collections.Counter): Number of responses by status
+        in_flight (int): Requests being answered
+        max_in_flight (int): Highest number of requests answered at the same
+            time
+    """
+
+    def __init__(
+        self,
+        url="http://gitlab.example.com",
+        private_token=None,
+        projects=3,
+        issues=50,
+        merge_requests=20,
+        jobs=20,
+        artifact_size=64 * 1024,
+        latency=0.0,
+        jitter=0.0,
+        error_rate=0.0,
+        error_statuses=(500, 502, 503),
+        rate_limit=None,
+        rate_limit_period=60.0,
+        seed=0,
+    ):
+        self.url = url.rstrip("/")
+        self.private_token = private_token
+        self.latency = latency
+        self.jitter = jitter
+        self.error_rate = error_rate
+        self.error_statuses = tuple(error_statuses)
+        self.rate_limit = rate_limit
+        self.rate_limit_period = rate_limit_period
+        url = urlsplit(self.url)
+        self._root = "%s://%s" % (url.scheme, url.netloc)
+        self._api_path = url.path + "/api/v4"
+        self._random = random.Random(seed)
+        self._lock = threading.Lock()
+        self._failures = collections.deque()
+        self._views = {}
+        self._window_reset = 0.0
+        self._window_count = 0
+        self.reset_stats()
+        self._generate(projects, issues, merge_requests, jobs, artifact_size)
+
+    # Data
+
+    def _user(self, user_id):
+        return {
+            "id": user_id,
+            "username": "user%d" % user_id,
+            "name": "User %d" % user_id,
+            "state": "active",
+            "avatar_url": None,
+            "web_url": "%s/user%d" % (self.url, user_id),
+        }
+
+    def _text(self, words):
+        return " ".join(self._random.choice(_WORDS) for _ in range(words))
+
+    def _generate(self, projects, issues, merge_requests, jobs, artifact_size):
+        self.projects = []
+        self.issues = {}
+        self.merge_requests = {}
+        self.jobs = {}
+        self._projects_by_path = {}
+        self._artifact = (bytes(range(256)) * (artifact_size // 256 + 1))[
+            :artifact_size
+        ]
+        self._trace = "".join(
+            "[%d] %s\n" % (line, self._text(8)) for line in range(200)
+        ).encode()
+        ids = collections.Counter()
+
+        def next_id(kind):
+            ids[kind] += 1
+            return ids[kind]
+
+        for _ in range(projects):
+            project_id = next_id("project")
+            path = "group/project-%d" % project_id
+            web_url = "%s/%s" % (self.url, path)
+            project = {
+                "id": project_id,
+                "name": "project-%d" % project_id,
+                "path": "project-%d" % project_id,
+                "path_with_namespace": path,
+                "description": self._text(12),
+                "default_branch": "master",
+                "visibility": "private",
+                "web_url": web_url,
+                "namespace": {"id": 1, "name": "group", "path": "group"},
+                "created_at": _timestamp(project_id * 3600),
+                "last_activity_at": _timestamp(project_id * 3600 + 60),
+                "star_count": project_id % 7,
+                "forks_count": project_id % 3,
+            }
+            self.projects.append(project)
+            self._projects_by_path[path] = project
+
+            self.issues[project_id] = []
+            for iid in range(1, issues + 1):
+                issue_id = next_id("issue")
+                self.issues[project_id].append(
+                    {
+                        "id": issue_id,
+                        "iid": iid,
+                        "project_id": project_id,
+                        "title": self._text(5),
+                        "description": self._text(60),
+                        "state": "closed" if iid % 3 == 0 else "opened",
+                        "labels": [self._random.choice(_WORDS)],
+                        "author": self._user(iid % 5 + 1),
+                        "assignees": [self._user(iid % 3 + 1)],
+                        "created_at": _timestamp(issue_id * 60),
+                        "updated_at": _timestamp(issue_id * 60 + 30),
+                        "web_url": "%s/-/issues/%d" % (web_url, iid),
+                    }
+                )
+
+            self.merge_requests[project_id] = []
+            for iid in range(1, merge_requests + 1):
+                mr_id = next_id("merge_request")
+                self.merge_requests[project_id].append(
+                    {
+                        "id": mr_id,
+                        "iid": iid,
+                        "project_id": project_id,
+                        "title": self._text(5),
+                        "description": self._text(40),
+                        "state": "merged" if iid % 4 == 0 else "opened",
+                        "source_branch": "feature-%d" % iid,
+                        "target_branch": "master",
+                        "sha": hashlib.sha1(b"mr%d" % mr_id).hexdigest(),
+                        "author": self._user(iid % 5 + 1),
+                        "merge_status": "can_be_merged",
+                        "created_at": _timestamp(mr_id * 120),
+                        "updated_at": _timestamp(mr_id * 120 + 60),
+                        "web_url": "%s/-/merge_requests/%d" % (web_url, iid),
+                    }
+                )
+
+            self.jobs[project_id] = []
+            for index in range(jobs):
+                job_id = next_id("job")
+                self.jobs[project_id].append(
+                    {
+                        "id": job_id,
+                        "name": ("build", "test", "deploy")[index % 3],
+                        "stage": ("build", "test", "deploy")[index % 3],
+                        "status": "failed" if index % 5 == 4 else "success",
+                        "ref": "master",
+                        "duration": 30.0 + index % 60,
+                        "pipeline": {"id": index // 3 + 1, "ref": "master"},
+                        "artifacts_file": {
+                            "filename": "artifacts.zip",
+                            "size": artifact_size,
+                        },
+                        "created_at": _timestamp(job_id * 30),
+                        "web_url": "%s/-/jobs/%d" % (web_url, job_id),
+                    }
+                )
+
+    # Configuration and statistics
+
+    def reset_stats(self):
+        """Reset the counters of the requests."""
+        with self._lock:
+            self.request_count = 0
+            self.statuses = collections.Counter()
+            self.in_flight = 0
+            self.max_in_flight = 0
+
+    def fail_next(self, status=503, count=1, retry_after=None):
+        """Answer the next requests with an error.
+
+        Args:
+            status (int): The status of the error
+            count (int): Number of requests to fail
+            retry_after (int): Value of the ``Retry-After`` header, if any
+        """
+        with self._lock:
+            for _ in range(count):
+                self._failures.append((status, retry_after))
+
+    def _enter(self):
+        with self._lock:
+            self.request_count += 1
+            self.in_flight += 1
+            self.max_in_flight = max(self.max_in_flight, self.in_flight)
+            delay = self.latency
+            if self.jitter:
+                delay += self._random.uniform(0, self.jitter)
+            return delay
+
+    def _exit(self, status):
+        with self._lock:
+            self.in_flight -= 1
+            self.statuses[status] += 1
+
+    # Requests
+
+    def _rate_limit_headers(self):
+        """Count a request in the rate limit window, return its headers and
+        whether it is over the limit."""
+        now = time.time()
+        with self._lock:
+            if now >= self._window_reset:
+                self._window_reset = now + self.rate_limit_period
+                self._window_count = 0
+            self._window_count += 1
+            count = self._window_count
+            reset = self._window_reset
+        headers = [
+            ("RateLimit-Limit", str(self.rate_limit)),
+            ("RateLimit-Observed", str(count)),
+            ("RateLimit-Remaining", str(max(self.rate_limit - count, 0))),
+            ("RateLimit-Reset", str(int(reset))),
+            ("RateLimit-ResetTime", email.utils.formatdate(reset, usegmt=True)),
+        ]
+        over = count > self.rate_limit
+        if over:
+            headers.append(("Retry-After", str(max(math.ceil(reset - now), 1))))
+        return headers, over
+
+    def _injected_error(self):
+        with self._lock:
+            if self._failures:
+                return self._failures.popleft()
+            if self.error_rate and self._random.random() < self.error_rate:
+                return self._random.choice(self.error_statuses), None
+        return None
+
+    def _authorized(self, headers):
+        if self.private_token is None:
+            return True
+        return self.private_token in (
+            headers.get("private-token"),
+            headers.get("job-token"),
+            headers.get("authorization", "")[len("Bearer ") :],
+        )
+
+    def handle(self, method, path, query, headers):
+        """Answer a request.
+
+        Args:
+            method (str): The HTTP method
+            path (str): The path, URL encoded
+            query (str): The query string
+            headers (dict): The request headers, with lower case names
+
+        Returns:
+            tuple: The status, the headers (list of ``(name, value)``) and
+            the body (bytes)
+        """
+        response = self._handle(method.upper(), path, query, headers)
+        if method.upper() == "HEAD":
+            response.body = b""
+        return response.status, response.headers, response.body
+
+    def _handle(self, method, path, query, headers):
+        extra_headers = []
+        if self.rate_limit is not None:
+            extra_headers, over = self._rate_limit_headers()
+            if over:
+                return _Response(
+                    429,
+                    b"Retry later\n",
+                    [("Content-Type", "text/plain")] + extra_headers,
+                )
+
+        failure = self._injected_error()
+        if failure is not None:
+            status, retry_after = failure
+            response = _error(status)
+            if retry_after is not None:
+                response.headers.append(("Retry-After", str(retry_after)))
+            response.headers.extend(extra_headers)
+            return response
+
+        if not self._authorized(headers):
+            response = _error(401)
+        elif method not in ("GET", "HEAD"):
+            response = _error(405)
+        elif not path.startswith(self._api_path + "/"):
+            response = _error(404)
+        else:
+            params = dict(parse_qsl(query, keep_blank_values=True))
+            response = self._get(path[len(self._api_path) :], query, params)
+            if response.status == 200 and _JSON in response.headers:
+                etag = 'W/"%s"' % hashlib.md5(response.body).hexdigest()
+                if etag in headers.get("if-none-match", "").split(", "):
+                    response = _Response(304)
+                response.headers.append(("ETag", etag))
+                response.headers.append(
+                    ("Cache-Control", "max-age=0, private, must-revalidate")
+                )
+        response.headers.extend(extra_headers)
+        return response
+
+    def _project(self, segments):
+        """Return the project of a path and the rest of the path."""
+        ref = unquote(segments[0])
+        if ref.isdigit():
+            index = int(ref) - 1
+            if 0 <= index < len(self.projects):
+                return self.projects[index], segments[1:]
+            return None, None
+        # The path of the project, URL encoded or not
+        if ref in self._projects_by_path:
+            return self._projects_by_path[ref], segments[1:]
+        if len(segments) > 1:
+            ref = "%s/%s" % (ref, segments[1])
+            if ref in self._projects_by_path:
+                return self._projects_by_path[ref], segments[2:]
+        return None, None
+
+    def _get(self, path, query, params):
+        segments = path.strip("/").split("/")
+        if segments == ["version"]:
+            return _json_response(200, {"version": "13.12.0", "revision": "fake"})
+        if segments == ["user"]:
+            return _json_response(200, self._user(1))
+        if segments[0] != "projects":
+            return _error(404)
+        with_statistics = None
+        if params.get("statistics", "").lower() in ("true", "1"):
+            with_statistics = _with_statistics
+        if len(segments) == 1:
+            return self._list(path, query, params, self.projects, with_statistics)
+
+        project, rest = self._project(segments[1:])
+        if project is None:
+            return _error(404, "404 Project Not Found")
+        if not rest:
+            if with_statistics is not None:
+                project = with_statistics(project)
+            return _json_response(200, project)
+
+        children = {
+            "issues": (self.issues, "iid"),
+            "merge_requests": (self.merge_requests, "iid"),
+            "jobs": (self.jobs, "id"),
+        }
+        if rest[0] not in children:
+            return _error(404)
+        items, key = children[rest[0]]
+        items = items[project["id"]]
+        if len(rest) == 1:
+            return self._list(path, query, params, items)
+
+        item = None
+        if rest[1].isdigit():
+            item = next((i for i in items if i[key] == int(rest[1])), None)
+        if item is None:
+            return _error(404)
+        if len(rest) == 2:
+            return _json_response(200, item)
+        if rest[0] == "jobs" and rest[2:] == ["artifacts"]:
+            return _Response(
+                200,
+                self._artifact,
+                [
+                    ("Content-Type", "application/octet-stream"),
+                    ("Content-Disposition", 'attachment; filename="artifacts.zip"'),
+                ],
+            )
+        if rest[0] == "jobs" and rest[2:] == ["trace"]:
+            return _Response(200, self._trace, [("Content-Type", "text/plain")])
+        return _error(404)
+
+    def _link(self, path, query, **changes):
+        params = [
+            (k, v)
+            for k, v in parse_qsl(query, keep_blank_values=True)
+            if k not in changes
+        ]
+        params.extend((k, str(v)) for k, v in changes.items())
+        return "<%s%s%s?%s>" % (self._root, self._api_path, path, urlencode(params))
+
+    def _view(self, items, state, descending):
+        """Return the filtered and sorted items, and their sort keys.
+
+        The generated data doesn't change, so the views are computed once,
+        keeping the requests of large lists cheap.
+        """
+        key = (id(items), state, descending)
+        view = self._views.get(key)
+        if view is None:
+            if state not in (None, "", "all"):
+                items = [i for i in items if i.get("state") == state]
+            items = sorted(items, key=lambda item: item["id"], reverse=descending)
+            # Increasing keys, for bisect
+            keys = [-i["id"] if descending else i["id"] for i in items]
+            view = self._views[key] = (items, keys)
+        return view
+
+    def _list(self, path, query, params, items, transform=None):
+        try:
+            per_page = min(max(int(params.get("per_page", 20)), 1), 100)
+            page = max(int(params.get("page", 1)), 1)
+        except ValueError:
+            return _json_response(400, {"error": "page is invalid"})
+        descending = params.get("sort", "desc") != "asc"
+        items, keys = self._view(items, params.get("state"), descending)
+
+        if params.get("pagination") == "keyset":
+            if params.get("order_by", "id") != "id":
+                return _error(
+                    405,
+                    "Keyset pagination is not yet available for this type of request",
+                )
+            start = 0
+            if descending and params.get("id_before"):
+                start = bisect.bisect_right(keys, -int(params["id_before"]))
+            elif not descending and params.get("id_after"):
+                start = bisect.bisect_right(keys, int(params["id_after"]))
+            page_items = items[start : start + per_page]
+            if transform is not None:
+                page_items = [transform(item) for item in page_items]
+            headers = []
+            if len(items) > start + per_page:
+                cursor = page_items[-1]["id"]
+                if descending:
+                    link = self._link(path, query, id_before=cursor)
+                else:
+                    link = self._link(path, query, id_after=cursor)
+                headers.append(("Link", '%s; rel="next"' % link))
+            return _json_response(200, page_items, headers)
+
+        total = len(items)
+        total_pages = max(math.ceil(total / per_page), 1)
+        page_items = items[(page - 1) * per_page : page * per_page]
+        if transform is not None:
+            page_items = [transform(item) for item in page_items]
+        next_page = page + 1 if page < total_pages else ""
+        prev_page = page - 1 if page > 1 else ""
+        links = []
+        if prev_page:
+            links.append('%s; rel="prev"' % self._link(path, query, page=prev_page))
+        if next_page:
+            links.append('%s; rel="next"' % self._link(path, query, page=next_page))
+        links.append('%s; rel="first"' % self._link(path, query, page=1))
+        links.append('%s; rel="last"' % self._link(path, query, page=total_pages))
+        headers = [
+            ("Link", ", ".join(links)),
+            ("X-Page", str(page)),
+            ("X-Per-Page", str(per_page)),
+            ("X-Total", str(total)),
+            ("X-Total-Pages", str(total_pages)),
+            ("X-Next-Page", str(next_page)),
+            ("X-Prev-Page", str(prev_page)),
+        ]
+        return _json_response(200, page_items, headers)
+
+    # Applications and clients
+
+    def wsgi_app(self, environ, start_response):
+        """Serve a request as a WSGI application."""
+        headers = {
+            key[5:].replace("_", "-").lower(): value
+            for key, value in environ.items()
+            if key.startswith("HTTP_")
+        }
+        delay = self._enter()
+        status = None
+        try:
+            if delay:
+                time.sleep(delay)
+            status, response_headers, body = self.handle(
+                environ["REQUEST_METHOD"],
+                environ.get("PATH_INFO", "/"),
+                environ.get("QUERY_STRING", ""),
+                headers,
+            )
+        finally:
+            self._exit(status)
+        response_headers.append(("Content-Length", str(len(body))))
+        start_response(
+            "%d %s" % (status, http.HTTPStatus(status).phrase), response_headers
+        )
+        return [
+            body[start : start + _CHUNK_SIZE]
+            for start in range(0, len(body), _CHUNK_SIZE)
+        ]
+
+    async def asgi_app(self, scope, receive, send):
+        """Serve a request as an ASGI application."""
+        if scope["type"] != "http":
+            return
+        more_body = True
+        while more_body:
+            message = await receive()
+            more_body = message.get("more_body", False)
+        path = scope.get("raw_path")
+        path = path.decode("ascii") if path else scope["path"]
+        headers = {
+            name.decode("latin-1").lower(): value.decode("latin-1")
+            for name, value in scope["headers"]
+        }
+        delay = self._enter()
+        status = None
+        try:
+            if delay:
+                await asyncio.sleep(delay)
+            status, response_headers, body = self.handle(
+                scope["method"], path, scope["query_string"].decode("ascii"), headers
+            )
+        finally:
+            self._exit(status)
+        response_headers.append(("Content-Length", str(len(body))))
+        await send(
+            {
+                "type": "http.response.start",
+                "status": status,
+                "headers": [
+                    (name.lower().encode("latin-1"), value.encode("latin-1"))
+                    for name, value in response_headers
+                ],
+            }
+        )
+        for start in range(0, max(len(body), 1), _CHUNK_SIZE):
+            end = start + _CHUNK_SIZE
+            await send(
+                {
+                    "type": "http.response.body",
+                    "body": body[start:end],
+                    "more_body": end < len(body),
+                }
+            )
+
+    def serve(self, port=0, addr="127.0.0.1", handshake=0.0):
+        """Serve the API over HTTP/1.1, in a background thread.
+
+        Unlike with the in-process transports, the clients open real
+        connections, e.g. to compare the settings of the connection pool.
+        The URL of the fake server (:attr:`url`) becomes the address of the
+        HTTP server, so that the pagination links point to it.
+
+        Args:
+            port (int): The port (0 to pick a free one)
+            addr (str): The address to listen on
+            handshake (float): Delay of the first response of each
+                connection, standing in for the TLS handshake, in seconds
+
+        Returns:
+            http.server.ThreadingHTTPServer: The server, whose
+            ``connections`` attribute counts the connections opened, and
+            ``shutdown()`` method stops it
+        """
+        fake = self
+
+        class Handler(http.server.BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+            # The headers and the body are written separately
+            disable_nagle_algorithm = True
+
+            def setup(self):
+                super().setup()
+                with server.lock:
+                    server.connections += 1
+                self.handshake = handshake
+
+            def _serve(self):
+                length = int(self.headers.get("Content-Length") or 0)
+                if length:
+                    self.rfile.read(length)
+                if self.handshake:
+                    time.sleep(self.handshake)
+                    self.handshake = 0.0
+                path, _, query = self.path.partition("?")
+                headers = {name.lower(): value for name, value in self.headers.items()}
+                delay = fake._enter()
+                status = None
+                try:
+                    if delay:
+                        time.sleep(delay)
+                    status, response_headers, body = fake.handle(
+                        self.command, path, query, headers
+                    )
+                finally:
+                    fake._exit(status)
+                self.send_response(status)
+                for name, value in response_headers:
+                    self.send_header(name, value)
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            do_GET = do_HEAD = do_POST = do_PUT = do_DELETE = _serve
+
+            def log_message(self, *args):
+                pass
+
+        server = http.server.ThreadingHTTPServer((addr, port), Handler)
+        server.daemon_threads = True
+        server.lock = threading.Lock()
+        server.connections = 0
+        self._root = "http://%s:%d" % server.server_address[:2]
+        self.url = self._root + urlsplit(self.url).path
+        thread = threading.Thread(target=server.serve_forever, daemon=True)
+        thread.start()
+        return server
+
+    def transport(self):
+        """Return an httpx transport for ``httpx.Client``."""
+        return httpx.WSGITransport(app=self.wsgi_app)
+
+    def async_transport(self):
+        """Return an httpx transport for ``httpx.AsyncClient``."""
+        return httpx.ASGITransport(app=self.asgi_app)
+
+    def gitlab(self, **kwargs):
+        """Return a :class:`~gitlab.Gitlab` client of the fake server.
+
+        Args:
+            **kwargs: Extra arguments of the client
+        """
+        kwargs.setdefault("private_token", self.private_token)
+        return gitlab.Gitlab(
+            self.url, client=httpx.Client(transport=self.transport()), **kwargs
+        )
+
+    def async_gitlab(self, **kwargs):
+        """Return an :class:`~gitlab.AsyncGitlab` client of the fake server.
+
+        Args:
+            **kwargs: Extra arguments of the client
+        """
+        kwargs.setdefault("private_token", self.private_token)
+        return gitlab.AsyncGitlab(
+            self.url,
+            client=httpx.AsyncClient(transport=self.async_transport()),
+            **kwargs
+        )
@@ -0,0 +1,188 @@
+# -*- coding: utf-8 -*-
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU Lesser General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU Lesser General Public License for more details.
+#
+# You should have received a copy of the GNU Lesser General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+"""Hedged requests, to cut the tail latency of the read requests."""
+
+import asyncio
+import collections
+import threading
+import time
+
+import httpx
+
+#: The methods that can be hedged
+METHODS = ("GET", "HEAD")
+
+
+class HedgePolicy:
+    """When to send a second copy of a slow read request.
+
+    If a GET or HEAD request gets no response after the ``percentile`` of
+    the recent latencies, the same request is sent again, and the first
+    response received is used. The other request is cancelled. The number of
+    hedged requests is capped by a token bucket, so that hedging doesn't
+    add much load when the server is slow for all the requests.
+
+    Args:
+        percentile (float): Percentile of the latencies after which a
+            request is hedged
+        initial_delay (float): Delay used until ``min_samples`` latencies
+            are known, in seconds
+        min_delay (float): Lowest delay, in seconds
+        max_per_second (float): Maximum number of hedged requests per second
+        window (int): Number of latencies used to compute the percentile
+        min_samples (int): Number of latencies needed to use the percentile
+
+    Attributes:
+        requests (int): Requests sent under the policy
+        hedged (int): Requests for which a second copy was sent
+        wins (int): Hedged requests answered first by the second copy
+        throttled (int): Requests that were not hedged because of the cap
+    """
+
+    def __init__(
+        self,
+        percentile=95,
+        initial_delay=1.0,
+        min_delay=0.01,
+        max_per_second=10,
+        window=200,
+        min_samples=20,
+    ):
+        if not 0 < percentile < 100:
+            raise ValueError("percentile must be between 0 and 100")
+        self.percentile = percentile
+        self.initial_delay = initial_delay
+        self.min_delay = min_delay
+        self.max_per_second = max_per_second
+        self.min_samples = min_samples
+        self.requests = self.hedged = self.wins = self.throttled = 0
+        self._latencies = collections.deque(maxlen=window)
+        self._tokens = float(max_per_second)
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def __getstate__(self):
+        state = self.__dict__.copy()
+        state.pop("_lock")
+        return state
+
+    def __setstate__(self, state):
+        self.__dict__.update(state)
+        self._lock = threading.Lock()
+
+    @property
+    def stats(self):
+        """The counters, the hedge rate and the current delay."""
+        with self._lock:
+            return {
+                "requests": self.requests,
+                "hedged": self.hedged,
+                "wins": self.wins,
+                "throttled": self.throttled,
+                "hedge_rate": self.hedged / self.requests if self.requests else 0.0,
+                "delay": self._delay(),
+            }
+
+    def _delay(self):
+        if len(self._latencies) < self.min_samples:
+            return self.initial_delay
+        latencies = sorted(self._latencies)
+        index = min(int(len(latencies) * self.percentile / 100), len(latencies) - 1)
+        return max(latencies[index], self.min_delay)
+
+    def delay(self):
+        """Return the time to wait for a response before hedging, in seconds."""
+        with self._lock:
+            return self._delay()
+
+    def record(self, elapsed):
+        """Add the latency of a response."""
+        with self._lock:
+            self._latencies.append(elapsed)
+
+    def allow(self):
+        """Take a token to hedge a request.
+
+        Returns:
+            bool: Whether the request can be hedged
+        """
+        with self._lock:
+            now = time.monotonic()
+            self._tokens = min(
+                self._tokens + (now - self._updated) * self.max_per_second,
+                self.max_per_second,
+            )
+            self._updated = now
+            if self._tokens < 1:
+                self.throttled += 1
+                return False
+            self._tokens -= 1
+            self.hedged += 1
+            return True
+
+
+async def send(client, policy, request, **kwargs):
+    """Send a request with an ``httpx.AsyncClient``, hedging it if slow.
+
+    Args:
+        client (httpx.AsyncClient): The client
+        policy (HedgePolicy): The hedging policy
+        request (httpx.Request): A GET or HEAD request
+        **kwargs: Arguments of ``client.send()``
+
+    Returns:
+        httpx.Response: The first response received
+    """
+    with policy._lock:
+        policy.requests += 1
+    start = hedge_start = time.monotonic()
+    first = asyncio.ensure_future(client.send(request, **kwargs))
+    tasks = [first]
+    winner = None
+    try:
+        done, _ = await asyncio.wait(tasks, timeout=policy.delay())
+        if not done and policy.allow():
+            copy = httpx.Request(request.method, request.url, headers=request.headers)
+            tasks.append(asyncio.ensure_future(client.send(copy, **kwargs)))
+            hedge_start = time.monotonic()
+
+        # Wait for the first successful response (or for all the errors)
+        pending = set(tasks)
+        while pending:
+            done, pending = await asyncio.wait(
+                pending, return_when=asyncio.FIRST_COMPLETED
+            )
+            winners = [t for t in tasks if t in done and t.exception() is None]
+            if winners:
+                winner = winners[0]
+                break
+        response = (winner or first).result()
+    finally:
+        for task in tasks:
+            if not task.done():
+                task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+        for task in tasks:
+            if task is not winner and not task.cancelled() and not task.exception():
+                # Both responses arrived: release the connection of the other
+                await task.result().aclose()
+
+    if winner is first:
+        policy.record(time.monotonic() - start)
+    else:
+        policy.record(time.monotonic() - hedge_start)
+        with policy._lock:
+            policy.wins += 1
+    return response
@@ -0,0 +1,331 @@
+# -*- coding: utf-8 -*-
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU Lesser General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU Lesser General Public License for more details.
+#
+# You should have received a copy of the GNU Lesser General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+"""Per-endpoint metrics of the requests, in the Prometheus text format."""
+
+import bisect
+import collections
+import http.server
+import math
+import os
+import threading
+
+#: Upper bounds of the exported latency buckets, in seconds
+DEFAULT_BUCKETS = (
+    0.005,
+    0.01,
+    0.025,
+    0.05,
+    0.1,
+    0.25,
+    0.5,
+    1.0,
+    2.5,
+    5.0,
+    10.0,
+    30.0,
+    60.0,
+)
+
+
+class LatencyHistogram:
+    """Histogram of latencies with a bounded relative error (HDR-style).
+
+    The values are counted in logarithmic buckets, each power of 2 being
+    split in ``sub_buckets`` linear ones, so that the percentiles are known
+    within ``1 / sub_buckets`` of their value, whatever the range of the
+    latencies. The counts of the fixed ``buckets`` exported to Prometheus
+    are kept as well.
+
+    Args:
+        buckets (tuple): Upper bounds of the exported buckets, in seconds
+        sub_buckets (int): Linear buckets per power of 2
+    """
+
+    def __init__(self, buckets=DEFAULT_BUCKETS, sub_buckets=64):
+        self.buckets = tuple(buckets)
+        self.sub_buckets = sub_buckets
+        self.bucket_counts = [0] * (len(self.buckets) + 1)
+        self.count = 0
+        self.sum = 0.0
+        self.max = 0.0
+        self._zeros = 0
+        self._counts = collections.Counter()
+
+    def record(self, value):
+        """Add a latency, in seconds."""
+        self.count += 1
+        self.sum += value
+        self.max = max(self.max, value)
+        self.bucket_counts[bisect.bisect_left(self.buckets, value)] += 1
+        if value > 0:
+            mantissa, exponent = math.frexp(value)
+            sub = int((mantissa - 0.5) * 2 * self.sub_buckets)
+            self._counts[(exponent, sub)] += 1
+        else:
+            self._zeros += 1
+
+    def _value(self, key):
+        exponent, sub = key
+        # The middle of the bucket
+        return math.ldexp(0.5 + (sub + 0.5) / (2 * self.sub_buckets), exponent)
+
+    def percentile(self, percentile):
+        """Return a percentile of the latencies, or None if there is none.
+
+        Args:
+            percentile (float): The percentile, between 0 and 100
+        """
+        if not self.count:
+            return None
+        rank = max(math.ceil(self.count * percentile / 100), 1)
+        if rank >= self.count:
+            return self.max
+        seen = self._zeros
+        if seen >= rank:
+            return 0.0
+        for key in sorted(self._counts):
+            seen += self._counts[key]
+            if seen >= rank:
+                return min(self._value(key), self.max)
+
+    def cumulative_buckets(self):
+        """Return the (upper bound, cumulative count) of the exported buckets.
+
+        The last bound is ``inf``.
+        """
+        total = 0
+        result = []
+        for bound, count in zip(self.buckets + (math.inf,), self.bucket_counts):
+            total += count
+            result.append((bound, total))
+        return result
+
+
+class _Endpoint:
+    def __init__(self, buckets):
+        self.statuses = collections.Counter()
+        self.latency = LatencyHistogram(buckets)
+        self.ttfb = LatencyHistogram(buckets)
+        self.bytes_sent = 0
+        self.bytes_received = 0
+        self.retries = 0
+
+
+def _escape(value):
+    return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _labels(**labels):
+    return "{%s}" % ",".join(
+        '%s="%s"' % (name, _escape(value)) for name, value in labels.items()
+    )
+
+
+def _number(value):
+    if value == math.inf:
+        return "+Inf"
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+
+class MetricsCollector:
+    """Per-endpoint counters and latency histograms of the requests.
+
+    The collector is a request hook (see
+    :meth:`gitlab.Gitlab.add_request_hook`): the requests are grouped by
+    method and URL template (e.g. ``GET /projects/:id/jobs/:id/trace``), and
+    their status, sizes, retries, latency and time to first byte are
+    counted. It can be shared by several clients, threads and event loops.
+
+    Args:
+        namespace (str): Prefix of the metric names
+        buckets (tuple): Upper bounds of the latency buckets, in seconds
+    """
+
+    def __init__(self, namespace="gitlab_client", buckets=DEFAULT_BUCKETS):
+        self.namespace = namespace
+        self.buckets = tuple(buckets)
+        self._endpoints = {}
+        self._lock = threading.Lock()
+
+    def __getstate__(self):
+        state = self.__dict__.copy()
+        state.pop("_lock")
+        return state
+
+    def __setstate__(self, state):
+        self.__dict__.update(state)
+        self._lock = threading.Lock()
+
+    def __call__(self, event):
+        """Record a :class:`~gitlab.events.RequestEvent`."""
+        if event.cached:
+            status = "cached"
+        elif event.status_code is None:
+            status = "error"
+        else:
+            status = str(event.status_code)
+        with self._lock:
+            key = (event.method, event.url_template)
+            endpoint = self._endpoints.get(key)
+            if endpoint is None:
+                endpoint = self._endpoints[key] = _Endpoint(self.buckets)
+            endpoint.statuses[status] += 1
+            endpoint.latency.record(event.elapsed)
+            if event.ttfb is not None:
+                endpoint.ttfb.record(event.ttfb)
+            endpoint.bytes_sent += event.bytes_sent
+            endpoint.bytes_received += event.bytes_received or 0
+            endpoint.retries += event.retries
+
+    def reset(self):
+        """Forget the recorded requests."""
+        with self._lock:
+            self._endpoints = {}
+
+    def summary(self):
+        """Return the metrics of each endpoint.
+
+        Returns:
+            dict: ``(method, url template)`` mapped to a dict with the
+            ``count``, ``statuses``, ``p50``, ``p95``, ``p99`` and ``max``
+            latencies (in seconds), ``bytes_sent``, ``bytes_received`` and
+            ``retries``
+        """
+        with self._lock:
+            return {
+                key: {
+                    "count": endpoint.latency.count,
+                    "statuses": dict(endpoint.statuses),
+                    "p50": endpoint.latency.percentile(50),
+                    "p95": endpoint.latency.percentile(95),
+                    "p99": endpoint.latency.percentile(99),
+                    "max": endpoint.latency.max,
+                    "bytes_sent": endpoint.bytes_sent,
+                    "bytes_received": endpoint.bytes_received,
+                    "retries": endpoint.retries,
+                }
+                for key, endpoint in self._endpoints.items()
+            }
+
+    def render(self):
+        """Return the metrics in the Prometheus text format."""
+        lines = []
+        with self._lock:
+            endpoints = sorted(self._endpoints.items())
+
+            def family(name, kind, help_text):
+                lines.append("# HELP %s_%s %s" % (self.namespace, name, help_text))
+                lines.append("# TYPE %s_%s %s" % (self.namespace, name, kind))
+
+            def sample(name, value, **labels):
+                lines.append(
+                    "%s_%s%s %s"
+                    % (self.namespace, name, _labels(**labels), _number(value))
+                )
+
+            family("requests_total", "counter", "Requests sent to the GitLab API.")
+            for (method, path), endpoint in endpoints:
+                for status, count in sorted(endpoint.statuses.items()):
+                    sample(
+                        "requests_total", count, method=method, path=path, status=status
+                    )
+
+            for name, attr, help_text in (
+                (
+                    "request_duration_seconds",
+                    "latency",
+                    "Duration of the requests, including the retries.",
+                ),
+                (
+                    "time_to_first_byte_seconds",
+                    "ttfb",
+                    "Time to receive the response headers.",
+                ),
+            ):
+                family(name, "histogram", help_text)
+                for (method, path), endpoint in endpoints:
+                    histogram = getattr(endpoint, attr)
+                    if not histogram.count:
+                        continue
+                    for bound, count in histogram.cumulative_buckets():
+                        sample(
+                            name + "_bucket",
+                            count,
+                            method=method,
+                            path=path,
+                            le=_number(bound),
+                        )
+                    sample(name + "_sum", histogram.sum, method=method, path=path)
+                    sample(name + "_count", histogram.count, method=method, path=path)
+
+            for name, attr, help_text in (
+                ("request_bytes_total", "bytes_sent", "Size of the request bodies."),
+                (
+                    "response_bytes_total",
+                    "bytes_received",
+                    "Size of the response bodies.",
+                ),
+                ("retries_total", "retries", "Requests sent again."),
+            ):
+                family(name, "counter", help_text)
+                for (method, path), endpoint in endpoints:
+                    sample(name, getattr(endpoint, attr), method=method, path=path)
+        return "\n".join(lines) + "\n"
+
+    def write(self, path):
+        """Write the metrics to a file, e.g. for the textfile collector of
+        the Prometheus node exporter.
+
+        The file is replaced atomically.
+
+        Args:
+            path (str): Path of the file
+        """
+        tmp_path = "%s.%d.tmp" % (path, os.getpid())
+        with open(tmp_path, "w") as f:
+            f.write(self.render())
+        os.replace(tmp_path, path)
+
+    def serve(self, port=9100, addr="127.0.0.1"):
+        """Serve the metrics over HTTP, in a background thread.
+
+        Args:
+            port (int): The port (0 to pick a free one)
+            addr (str): The address to listen on
+
+        Returns:
+            http.server.ThreadingHTTPServer: The server, whose
+            ``server_address`` gives the port, and ``shutdown()`` method
+            stops it
+        """
+        collector = self
+
+        class Handler(http.server.BaseHTTPRequestHandler):
+            def do_GET(self):
+                body = collector.render().encode()
+                self.send_response(200)
+                self.send_header("Content-Type", "text/plain; version=0.0.4")
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, *args):
+                pass
+
+        server = http.server.ThreadingHTTPServer((addr, port), Handler)
+        server.daemon_threads = True
+        thread = threading.Thread(target=server.serve_forever, daemon=True)
+        thread.start()
+        return server
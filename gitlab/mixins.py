@@ -98,17 +98,30 @@ class RefreshMixin:
 
 
 class ListMixin:
-    def _list_or_object_list(self, server_data):
+    def _list_or_object_list(self, server_data, compact=False):
         if asyncio.iscoroutine(server_data):
-            return self._alist_or_object_list(server_data)
-        elif isinstance(server_data, list):
-            return [self._obj_cls(self, item) for item in server_data]
+            return self._alist_or_object_list(server_data, compact)
+
+        obj_cls = self._obj_cls
+        if compact:
+            obj_cls = obj_cls._get_record_class()
+        if isinstance(server_data, list):
+            return [obj_cls(self, item) for item in server_data]
         else:
-            return base.RESTObjectList(self, self._obj_cls, server_data)
+            return base.RESTObjectList(self, obj_cls, server_data)
 
-    async def _alist_or_object_list(self, server_data):
+    async def _alist_or_object_list(self, server_data, compact=False):
         server_data = await server_data
-        return self._list_or_object_list(server_data)
+        return self._list_or_object_list(server_data, compact)
+
+    def _list_records(self, server_data):
+        if asyncio.iscoroutine(server_data):
+            return self._alist_records(server_data)
+        return list(self._list_or_object_list(server_data, compact=True))
+
+    async def _alist_records(self, server_data):
+        records = await self._alist_or_object_list(server_data, compact=True)
+        return [record async for record in records]
 
     @exc.on_http_error(exc.GitlabListError)
     def list(self, **kwargs):
@@ -120,6 +133,15 @@ class ListMixin:
             page (int): ID of the page to return (starts with page 1)
             as_list (bool): If set to False and no pagination option is
                 defined, return a generator instead of a list
+            concurrency (int): Number of pages to fetch in parallel when
+                iterating over all the items
+            prefetch (bool): If set to True with a generator, request the
+                next page in the background while the current one is used
+            streamed (bool): If set to True, decode the items of each page
+                one at a time while iterating, instead of the whole page
+            compact (bool): If set to True, return read-only records using
+                less memory instead of RESTObjects (see
+                :class:`~gitlab.base.RESTRecord`)
             **kwargs: Extra options to send to the server (e.g. sudo)
 
         Returns:
@@ -132,6 +154,7 @@ class ListMixin:
 
         # Duplicate data to avoid messing with what the user sent us
         data = kwargs.copy()
+        compact = data.pop("compact", False)
         if self.gitlab.per_page:
             data.setdefault("per_page", self.gitlab.per_page)
 
@@ -153,8 +176,22 @@ class ListMixin:
         # Allow to overwrite the path, handy for custom listings
         path = data.pop("path", self.path)
 
+        if (
+            compact
+            and data.get("all") is True
+            and data.get("as_list", True)
+            and "page" not in data
+        ):
+            # Build the records page by page, so that the server data of all
+            # the pages is never held in memory at once (a generator would
+            # stop at the requested page)
+            del data["all"]
+            data["as_list"] = False
+            server_data = self.gitlab.http_list(path, **data)
+            return self._list_records(server_data)
+
         server_data = self.gitlab.http_list(path, **data)
-        return self._list_or_object_list(server_data)
+        return self._list_or_object_list(server_data, compact)
 
 
 class RetrieveMixin(ListMixin, GetMixin):
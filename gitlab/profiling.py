@@ -0,0 +1,238 @@
+# -*- coding: utf-8 -*-
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU Lesser General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU Lesser General Public License for more details.
+#
+# You should have received a copy of the GNU Lesser General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+"""Profiling of the API calls made by a block of code."""
+
+import collections
+import contextvars
+import threading
+import time
+from urllib.parse import urlsplit
+
+# The profiles of the running block of code (and of the tasks it started)
+_active = contextvars.ContextVar("gitlab_profiles", default=())
+
+
+def active():
+    """Return the profiles recording the current context."""
+    return _active.get()
+
+
+def decode(loads, *args):
+    """Call ``loads(*args)``, adding its duration to the active profiles."""
+    profiles = _active.get()
+    if not profiles:
+        return loads(*args)
+    start = time.perf_counter()
+    try:
+        return loads(*args)
+    finally:
+        elapsed = time.perf_counter() - start
+        for profile in profiles:
+            profile._add_decode_time(elapsed)
+
+
+class Profile:
+    """Summary of the API calls made in a block of code.
+
+    Created by :meth:`gitlab.Gitlab.profile`, and used as a context manager
+    (``with`` or ``async with``). The requests made by the block, by the
+    tasks it starts and by the thread pools of the client are recorded;
+    the ones made by other threads or tasks at the same time are not.
+
+    Args:
+        gl (Gitlab): The client
+        n_plus_one_threshold (int): Number of objects fetched one by one from
+            the same endpoint reported as an N+1 pattern
+
+    Attributes:
+        wall_time (float): Duration of the block, in seconds
+        decode_time (float): Time spent decoding JSON, in seconds
+        objects (collections.Counter): Number of objects created, by class
+            name
+    """
+
+    def __init__(self, gl, n_plus_one_threshold=5):
+        self.gl = gl
+        self.n_plus_one_threshold = n_plus_one_threshold
+        self.wall_time = None
+        self.decode_time = 0.0
+        self.objects = collections.Counter()
+        # (method, URL template, URL, manager, status, start, elapsed, retries)
+        self._requests = []
+        self._start = None
+        self._token = None
+        self._lock = threading.Lock()
+
+    def __enter__(self):
+        self._start = time.monotonic()
+        self._token = _active.set(_active.get() + (self,))
+        self.gl.add_request_hook(self._record_request)
+        return self
+
+    def __exit__(self, *args):
+        self.gl.remove_request_hook(self._record_request)
+        _active.reset(self._token)
+        self.wall_time = time.monotonic() - self._start
+
+    async def __aenter__(self):
+        return self.__enter__()
+
+    async def __aexit__(self, *args):
+        self.__exit__(*args)
+
+    def _record_request(self, event):
+        if self not in _active.get():
+            return
+        manager = event.manager.__name__ if event.manager is not None else None
+        url = urlsplit(event.url)
+        with self._lock:
+            self._requests.append(
+                (
+                    event.method,
+                    event.url_template,
+                    url.path,
+                    manager,
+                    event.status_code,
+                    event.start,
+                    event.elapsed,
+                    event.retries,
+                )
+            )
+
+    def _add_decode_time(self, elapsed):
+        with self._lock:
+            self.decode_time += elapsed
+
+    def object_created(self, cls):
+        """Count an object (called by :class:`~gitlab.base.RESTObject`)."""
+        with self._lock:
+            self.objects[cls.__name__] += 1
+
+    def _http_time(self):
+        # Time during which at least one request was in flight
+        total = 0.0
+        end = None
+        for start, elapsed in sorted((r[5], r[6]) for r in self._requests):
+            stop = start + elapsed
+            if end is None or start > end:
+                total += elapsed
+                end = stop
+            elif stop > end:
+                total += stop - end
+                end = stop
+        return total
+
+    def _n_plus_one(self):
+        # GET requests of single objects, by endpoint
+        fetches = collections.defaultdict(list)
+        for method, template, path, manager, *_ in self._requests:
+            if method == "GET" and template.endswith("/:id"):
+                fetches[(template, manager)].append(path)
+        suspects = []
+        for (template, manager), paths in sorted(
+            fetches.items(), key=lambda item: (item[0][0], item[0][1] or "")
+        ):
+            distinct = len(set(paths))
+            if distinct >= self.n_plus_one_threshold:
+                suspects.append(
+                    {
+                        "endpoint": "GET %s" % template,
+                        "manager": manager,
+                        "requests": len(paths),
+                        "objects": distinct,
+                    }
+                )
+        return suspects
+
+    def summary(self):
+        """Return the profile as a dict.
+
+        Returns:
+            dict: With the ``wall_time``, ``http_time`` (time with at least
+            one request in flight), ``python_time`` (the rest of the wall
+            time), ``request_time`` (sum of the request durations),
+            ``decode_time``, ``requests``, ``errors`` and ``retries``
+            counts, the ``endpoints`` (``(method, URL template)`` mapped to
+            their ``count`` and ``time``), the ``objects`` created by class,
+            and the ``n_plus_one`` suspects
+        """
+        with self._lock:
+            wall_time = self.wall_time
+            if wall_time is None:
+                wall_time = time.monotonic() - self._start
+            endpoints = collections.defaultdict(lambda: {"count": 0, "time": 0.0})
+            for method, template, _, _, _, _, elapsed, _ in self._requests:
+                endpoint = endpoints[(method, template)]
+                endpoint["count"] += 1
+                endpoint["time"] += elapsed
+            http_time = self._http_time()
+            return {
+                "wall_time": wall_time,
+                "http_time": http_time,
+                "python_time": max(wall_time - http_time, 0.0),
+                "request_time": sum(r[6] for r in self._requests),
+                "decode_time": self.decode_time,
+                "requests": len(self._requests),
+                "errors": sum(1 for r in self._requests if r[4] is None or r[4] >= 400),
+                "retries": sum(r[7] for r in self._requests),
+                "endpoints": dict(endpoints),
+                "objects": dict(self.objects),
+                "n_plus_one": self._n_plus_one(),
+            }
+
+    def report(self):
+        """Return a human readable report of the profile."""
+        summary = self.summary()
+        wall_time = summary["wall_time"] or 1e-9
+        lines = [
+            "Wall time: %.3fs, HTTP: %.3fs (%.0f%%), Python: %.3fs, "
+            "JSON decoding: %.3fs"
+            % (
+                summary["wall_time"],
+                summary["http_time"],
+                100 * summary["http_time"] / wall_time,
+                summary["python_time"],
+                summary["decode_time"],
+            ),
+            "Requests: %d (%d errors, %d retries)"
+            % (summary["requests"], summary["errors"], summary["retries"]),
+        ]
+        if summary["endpoints"]:
+            lines.append("%8s %10s  %s" % ("count", "time (s)", "endpoint"))
+            endpoints = sorted(
+                summary["endpoints"].items(), key=lambda item: -item[1]["time"]
+            )
+            for (method, template), endpoint in endpoints:
+                lines.append(
+                    "%8d %10.3f  %s %s"
+                    % (endpoint["count"], endpoint["time"], method, template)
+                )
+        if summary["objects"]:
+            lines.append("Objects created: %d" % sum(summary["objects"].values()))
+            for name, count in sorted(
+                summary["objects"].items(), key=lambda item: -item[1]
+            ):
+                lines.append("%8d  %s" % (count, name))
+        for suspect in summary["n_plus_one"]:
+            lines.append(
+                "N+1: %s called %d times for %d objects%s, list them instead"
+                % (
+                    suspect["endpoint"],
+                    suspect["requests"],
+                    suspect["objects"],
+                    " by %s" % suspect["manager"] if suspect["manager"] else "",
+                )
+            )
+        return "\n".join(lines)
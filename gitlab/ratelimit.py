@@ -0,0 +1,177 @@
+# -*- coding: utf-8 -*-
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU Lesser General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU Lesser General Public License for more details.
+#
+# You should have received a copy of the GNU Lesser General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+"""Client-side pacing of the requests, from the rate limit headers."""
+
+import asyncio
+import threading
+import time
+
+# RateLimit-Reset values below this are a number of seconds, not a timestamp
+_MAX_DELTA = 10 ** 9
+
+
+def _parse_int(value):
+    try:
+        return int(float(value))
+    except (TypeError, ValueError):
+        return None
+
+
+class RateLimiter:
+    """Token bucket pacing the requests of a client under its rate limit.
+
+    GitLab sends ``RateLimit-Limit``, ``RateLimit-Remaining`` and
+    ``RateLimit-Reset`` headers with its responses. After each response, the
+    bucket is refilled at the rate that spends the remaining requests evenly
+    until the reset time, so that the client slows down before being
+    throttled instead of sleeping after a 429 response. Requests are not
+    delayed until the server has sent these headers.
+
+    The limiter is safe to share between threads (:meth:`acquire`) and
+    between the tasks of an event loop (:meth:`aacquire`).
+
+    Args:
+        burst (int): Maximum number of requests sent without pacing
+        margin (int): Number of requests of the budget left unused, e.g. for
+            other clients sharing the same token
+
+    Attributes:
+        waits (int): Number of requests that were delayed
+        waited (float): Total time the requests were delayed, in seconds
+    """
+
+    def __init__(self, burst=10, margin=0):
+        self.burst = burst
+        self.margin = margin
+        self.limit = self.remaining = None
+        self.waits = 0
+        self.waited = 0.0
+        # Refill rate in requests per second (None when not paced)
+        self._rate = None
+        self._tokens = float(burst)
+        # Reset time, on the monotonic clock
+        self._reset = None
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def __getstate__(self):
+        state = self.__dict__.copy()
+        state.pop("_lock")
+        return state
+
+    def __setstate__(self, state):
+        self.__dict__.update(state)
+        self._lock = threading.Lock()
+
+    @property
+    def budget(self):
+        """The rate limit state, as known from the last responses.
+
+        A dict with the ``limit`` and ``remaining`` requests reported by the
+        server, the seconds until the ``reset``, the current pacing ``rate``
+        (requests per second, None if not paced), the ``tokens`` left in the
+        bucket and the ``waits`` and ``waited`` counters.
+        """
+        with self._lock:
+            now = time.monotonic()
+            self._refill(now)
+            return {
+                "limit": self.limit,
+                "remaining": self.remaining,
+                "reset": None if self._reset is None else max(self._reset - now, 0),
+                "rate": self._rate,
+                "tokens": self._tokens,
+                "waits": self.waits,
+                "waited": self.waited,
+            }
+
+    def _refill(self, now):
+        if self._reset is not None and now >= self._reset:
+            # A new window started: the budget is unknown until the next
+            # response
+            self._reset = self._rate = None
+            self.remaining = self.limit
+            self._tokens = float(self.burst)
+        if self._rate is not None:
+            self._tokens = min(
+                self._tokens + (now - self._updated) * self._rate, self.burst
+            )
+        self._updated = now
+
+    def reserve(self):
+        """Take a token for a request.
+
+        Returns:
+            float: The time to wait before sending the request, in seconds
+        """
+        with self._lock:
+            now = time.monotonic()
+            self._refill(now)
+            if self._rate is None:
+                return 0.0
+            self._tokens -= 1
+            if self._tokens >= 0:
+                return 0.0
+            # The budget is back after the reset at the latest
+            delay = self._reset - now
+            if self._rate > 0:
+                delay = min(-self._tokens / self._rate, delay)
+            delay = max(delay, 0.0)
+            self.waits += 1
+            self.waited += delay
+            return delay
+
+    def acquire(self):
+        """Wait until a request can be sent (synchronous clients)."""
+        delay = self.reserve()
+        if delay:
+            time.sleep(delay)
+
+    async def aacquire(self):
+        """Wait until a request can be sent (asynchronous clients)."""
+        delay = self.reserve()
+        if delay:
+            await asyncio.sleep(delay)
+
+    def update(self, headers):
+        """Update the budget from the headers of a response.
+
+        Args:
+            headers (httpx.Headers): The response headers
+        """
+        remaining = _parse_int(headers.get("RateLimit-Remaining"))
+        reset = _parse_int(headers.get("RateLimit-Reset"))
+        if remaining is None or reset is None:
+            return
+        limit = _parse_int(headers.get("RateLimit-Limit"))
+        wall = time.time()
+        delta = reset - wall if reset > _MAX_DELTA else reset
+
+        with self._lock:
+            now = time.monotonic()
+            self._refill(now)
+            reset_at = now + max(delta, 0)
+            # Responses of concurrent requests can arrive out of order: keep
+            # the lowest budget seen for the current window
+            same_window = self._reset is not None and abs(reset_at - self._reset) < 1
+            if same_window and self.remaining is not None:
+                if remaining >= self.remaining:
+                    return
+            self.limit = limit if limit is not None else self.limit
+            self.remaining = remaining
+            self._reset = reset_at
+            usable = max(remaining - self.margin, 0)
+            self._rate = usable / max(delta, 1.0)
+            self._tokens = min(self._tokens, usable)
@@ -0,0 +1,294 @@
+# -*- coding: utf-8 -*-
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU Lesser General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU Lesser General Public License for more details.
+#
+# You should have received a copy of the GNU Lesser General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+"""Retries of the failed requests, and circuit breaking."""
+
+import email.utils
+import random
+import threading
+import time
+
+import httpx
+
+from gitlab.exceptions import GitlabCircuitOpenError
+
+#: Methods that can be sent again after a network error
+IDEMPOTENT_METHODS = ("GET", "HEAD", "OPTIONS", "PUT", "DELETE")
+
+#: Status codes of the transient server errors
+TRANSIENT_STATUSES = (500, 502, 503, 504)
+
+#: Network errors after which a request is retried
+NETWORK_ERRORS = (
+    httpx.ConnectError,
+    httpx.ReadTimeout,
+    httpx.RemoteProtocolError,
+    getattr(httpx, "ReadError", httpx.NetworkError),
+)
+
+
+def parse_retry_after(value):
+    """Return the delay of a ``Retry-After`` header, in seconds.
+
+    Args:
+        value (str): A number of seconds or an HTTP date
+
+    Returns:
+        float: The delay (0 for past dates), or None if the value is invalid
+    """
+    try:
+        return max(float(value), 0.0)
+    except (TypeError, ValueError):
+        pass
+    try:
+        date = email.utils.parsedate_to_datetime(value)
+    except (TypeError, ValueError, IndexError):
+        return None
+    if date is None:
+        return None
+    return max(date.timestamp() - time.time(), 0.0)
+
+
+class CircuitBreaker:
+    """Fail fast while a server is known to be down.
+
+    After ``failure_threshold`` consecutive failures (network errors or
+    transient server errors) for a host, the circuit opens: the requests to
+    this host raise :class:`~gitlab.exceptions.GitlabCircuitOpenError`
+    without being sent. Every ``reset_timeout`` seconds, one request is let
+    through to probe the host: the circuit closes if it succeeds, and stays
+    open otherwise.
+
+    Args:
+        failure_threshold (int): Consecutive failures opening the circuit
+        reset_timeout (float): Time between two probes, in seconds
+    """
+
+    def __init__(self, failure_threshold=5, reset_timeout=30.0):
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        # host -> [consecutive failures, time of the last opening or probe]
+        self._hosts = {}
+        self._lock = threading.Lock()
+
+    def __getstate__(self):
+        state = self.__dict__.copy()
+        state.pop("_lock")
+        return state
+
+    def __setstate__(self, state):
+        self.__dict__.update(state)
+        self._lock = threading.Lock()
+
+    def state(self, host):
+        """Return the state of the circuit of a host.
+
+        Returns:
+            str: ``closed``, ``open``, or ``half-open`` if the next request
+            will probe the host
+        """
+        with self._lock:
+            failures, opened = self._hosts.get(host, (0, None))
+            if opened is None:
+                return "closed"
+            if time.monotonic() - opened < self.reset_timeout:
+                return "open"
+            return "half-open"
+
+    def before_request(self, host):
+        """Check that a request can be sent to a host.
+
+        Raises:
+            GitlabCircuitOpenError: If the circuit of the host is open
+        """
+        with self._lock:
+            failures, opened = self._hosts.get(host, (0, None))
+            if opened is None:
+                return
+            now = time.monotonic()
+            remaining = self.reset_timeout - (now - opened)
+            if remaining > 0:
+                raise GitlabCircuitOpenError(
+                    "Circuit open for %s after %d failures, retry in %.1fs"
+                    % (host, failures, remaining)
+                )
+            # Let this request probe the host, and the next ones wait again
+            self._hosts[host][1] = now
+
+    def record_success(self, host):
+        """Close the circuit of a host."""
+        with self._lock:
+            self._hosts.pop(host, None)
+
+    def record_failure(self, host):
+        """Count a failure, opening the circuit of a host if needed."""
+        with self._lock:
+            entry = self._hosts.setdefault(host, [0, None])
+            entry[0] += 1
+            if entry[0] >= self.failure_threshold:
+                entry[1] = time.monotonic()
+
+
+class RetryPolicy:
+    """How the failed requests are retried.
+
+    Requests answered with 429 (if ``obey_rate_limit``) or with a transient
+    server error (if ``retry_transient_errors``) are sent again after the
+    ``Retry-After`` delay of the response (a number of seconds or an HTTP
+    date) or an exponential backoff with full jitter: a random delay between
+    0 and ``backoff_factor * 2 ** retry``, at most ``max_backoff``. If
+    ``retry_transient_errors`` is set, the requests with an idempotent method
+    failing with a network error (connection error, read timeout, closed
+    connection) are retried as well.
+
+    The ``obey_rate_limit``, ``retry_transient_errors`` and ``max_retries``
+    arguments of the API calls override the ones of the policy.
+
+    Args:
+        max_retries (int): Maximum number of retries (-1 for no limit)
+        backoff_factor (float): Delay of the first retry, in seconds
+        max_backoff (float): Maximum delay between two retries, in seconds
+        obey_rate_limit (bool): Retry the requests throttled by the server
+        retry_transient_errors (bool): Retry the transient errors
+        circuit_breaker (CircuitBreaker): Fail fast while the server is down
+
+    Attributes:
+        retries (int): Number of requests sent again
+    """
+
+    def __init__(
+        self,
+        max_retries=10,
+        backoff_factor=0.1,
+        max_backoff=60.0,
+        obey_rate_limit=True,
+        retry_transient_errors=False,
+        circuit_breaker=None,
+    ):
+        self.max_retries = max_retries
+        self.backoff_factor = backoff_factor
+        self.max_backoff = max_backoff
+        self.obey_rate_limit = obey_rate_limit
+        self.retry_transient_errors = retry_transient_errors
+        self.circuit_breaker = circuit_breaker
+        self.retries = 0
+
+    def backoff(self, retry):
+        """Return the delay before a retry, in seconds.
+
+        Args:
+            retry (int): Number of retries already made
+        """
+        return random.uniform(
+            0, min(self.backoff_factor * 2 ** retry, self.max_backoff)
+        )
+
+    def get_delay(self, retry, response=None):
+        """Return the delay before a retry, honouring ``Retry-After``."""
+        if response is not None and "Retry-After" in response.headers:
+            delay = parse_retry_after(response.headers["Retry-After"])
+            if delay is not None:
+                return delay
+        return self.backoff(retry)
+
+    def start(self, method, url, kwargs):
+        """Create the state of the retries of a request.
+
+        Args:
+            method (str): The HTTP method
+            url (httpx.URL): The URL
+            kwargs (dict): The arguments of the API call
+
+        Returns:
+            Attempt: The state
+
+        Raises:
+            GitlabCircuitOpenError: If the circuit of the host is open
+        """
+        attempt = Attempt(self, method, url, kwargs)
+        if self.circuit_breaker is not None:
+            self.circuit_breaker.before_request(attempt.host)
+        return attempt
+
+
+class Attempt:
+    """State of the retries of one request, see :meth:`RetryPolicy.start`."""
+
+    def __init__(self, policy, method, url, kwargs):
+        self.policy = policy
+        self.method = method.upper()
+        self.host = url.host if url.port is None else "%s:%s" % (url.host, url.port)
+        self.obey_rate_limit = kwargs.get("obey_rate_limit", policy.obey_rate_limit)
+        self.retry_transient_errors = kwargs.get(
+            "retry_transient_errors", policy.retry_transient_errors
+        )
+        self.max_retries = kwargs.get("max_retries", policy.max_retries)
+        self.retries = 0
+
+    def _next(self, response=None):
+        if self.max_retries != -1 and self.retries >= self.max_retries:
+            return None
+        delay = self.policy.get_delay(self.retries, response)
+        self.retries += 1
+        self.policy.retries += 1
+        return delay
+
+    def _record(self, failed):
+        breaker = self.policy.circuit_breaker
+        if breaker is None:
+            return
+        if failed:
+            breaker.record_failure(self.host)
+        else:
+            breaker.record_success(self.host)
+
+    def on_response(self, response):
+        """Return the delay before retrying a request, or None to stop.
+
+        Args:
+            response (httpx.Response): The response received
+        """
+        status = response.status_code
+        transient = status in TRANSIENT_STATUSES
+        self._record(transient)
+        if (status == 429 and self.obey_rate_limit) or (
+            transient and self.retry_transient_errors
+        ):
+            return self._next(response)
+        return None
+
+    def on_error(self, error):
+        """Return the delay before retrying after a network error.
+
+        Args:
+            error (Exception): The exception raised by httpx
+
+        Returns:
+            float: The delay, or None if the error must be raised
+        """
+        if not isinstance(error, NETWORK_ERRORS):
+            return None
+        self._record(True)
+        if self.retry_transient_errors and self.method in IDEMPOTENT_METHODS:
+            return self._next()
+        return None
+
+    def check(self):
+        """Check the circuit before sending the request again.
+
+        Raises:
+            GitlabCircuitOpenError: If the circuit of the host is open
+        """
+        if self.policy.circuit_breaker is not None:
+            self.policy.circuit_breaker.before_request(self.host)
@@ -0,0 +1,119 @@
+# -*- coding: utf-8 -*-
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU Lesser General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU Lesser General Public License for more details.
+#
+# You should have received a copy of the GNU Lesser General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+"""Structured logging of the slow, large and sampled requests."""
+
+import json
+import logging
+import random
+from urllib.parse import parse_qsl, urlsplit
+
+#: Logger of the requests, one JSON object per message
+logger = logging.getLogger("gitlab.slowlog")
+
+
+def query_keys(url):
+    """Return the sorted names of the query parameters of a URL.
+
+    The values are left out: they may hold tokens (e.g. ``private_token``)
+    or personal data.
+    """
+    query = urlsplit(url).query
+    if not query:
+        return []
+    return sorted({key for key, _ in parse_qsl(query, keep_blank_values=True)})
+
+
+class SlowRequestLogger:
+    """Log the slow requests, the large responses and a sample of the others.
+
+    The logger is a request hook (see :meth:`gitlab.Gitlab.add_request_hook`).
+    Each logged request gives one JSON line with the ``reason`` it was logged
+    (``slow``, ``large`` or ``sampled``), the ``method``, the ``endpoint``
+    (URL template, e.g. ``/projects/:id/jobs/:id``), the ``manager``, the
+    names of the ``query`` parameters, the ``status`` (None for network
+    errors), the ``duration`` and ``ttfb`` in seconds, the ``bytes_sent``
+    and ``bytes_received``, the ``retries`` and the ``error`` type.
+
+    Neither the headers (``PRIVATE-TOKEN``, ``JOB-TOKEN``, ``Authorization``)
+    nor the query values, the IDs in the path or the bodies are logged. The
+    other requests only cost a few comparisons.
+
+    Args:
+        latency_threshold (float): Duration above which a request is logged,
+            in seconds (None to disable)
+        size_threshold (int): Size of the response body above which a
+            request is logged, in bytes (None to disable)
+        sample_rate (float): Fraction of the other requests logged, between
+            0 and 1
+        logger (logging.Logger): The logger, ``gitlab.slowlog`` by default
+        level (int): The level of the messages
+    """
+
+    def __init__(
+        self,
+        latency_threshold=1.0,
+        size_threshold=10 * 1024 * 1024,
+        sample_rate=0.0,
+        logger=None,
+        level=logging.WARNING,
+    ):
+        self.latency_threshold = latency_threshold
+        self.size_threshold = size_threshold
+        self.sample_rate = sample_rate
+        self.logger = logger
+        self.level = level
+
+    def _reason(self, event):
+        if self.latency_threshold is not None and (
+            event.elapsed >= self.latency_threshold
+        ):
+            return "slow"
+        if self.size_threshold is not None and (
+            (event.bytes_received or 0) >= self.size_threshold
+        ):
+            return "large"
+        if self.sample_rate and random.random() < self.sample_rate:
+            return "sampled"
+        return None
+
+    def __call__(self, event):
+        """Log a :class:`~gitlab.events.RequestEvent` if it is slow, large or
+        sampled."""
+        reason = self._reason(event)
+        if reason is None:
+            return
+        log = self.logger or logger
+        if not log.isEnabledFor(self.level):
+            return
+        log.log(self.level, json.dumps(self.record(event, reason), sort_keys=True))
+
+    @staticmethod
+    def record(event, reason):
+        """Return the logged fields of a request, as a dict."""
+        return {
+            "reason": reason,
+            "method": event.method,
+            "endpoint": event.url_template,
+            "manager": event.manager.__name__ if event.manager else None,
+            "query": query_keys(event.url),
+            "status": event.status_code,
+            "cached": event.cached,
+            "duration": round(event.elapsed, 6),
+            "ttfb": None if event.ttfb is None else round(event.ttfb, 6),
+            "bytes_sent": event.bytes_sent,
+            "bytes_received": event.bytes_received,
+            "retries": event.retries,
+            "error": type(event.error).__name__ if event.error else None,
+        }
@@ -1,4 +1,5 @@
 import asyncio
+import time
 
 import pytest
 
@@ -55,3 +56,25 @@ def is_gl_sync(gl):
         return True
     else:
         return False
+
+
+class FakeClock:
+    """Clock advanced by the tests, replacing ``time.monotonic`` and
+    ``time.time``."""
+
+    def __init__(self):
+        self.now = 1000.0
+
+    def monotonic(self):
+        return self.now
+
+    def time(self):
+        return 1600000000.0 + self.now
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    clock = FakeClock()
+    monkeypatch.setattr(time, "monotonic", clock.monotonic)
+    monkeypatch.setattr(time, "time", clock.time)
+    return clock
@@ -1,7 +1,7 @@
 import pytest
 import respx
 from gitlab import AsyncGitlab
-from gitlab.base import RESTObject, RESTObjectList
+from gitlab.base import RESTObject, RESTObjectList, RESTRecord
 from gitlab.mixins import (
     CreateMixin,
     DeleteMixin,
@@ -108,6 +108,32 @@ class TestMixinMethods:
         assert isinstance(obj_list[0], FakeObject)
         assert len(obj_list) == 2
 
+    @respx.mock
+    @pytest.mark.asyncio
+    async def test_list_mixin_compact(self, gl):
+        class M(ListMixin, FakeManager):
+            pass
+
+        request = respx.get(
+            "http://localhost/api/v4/tests",
+            headers={"Content-Type": "application/json"},
+            content='[{"id": 42, "foo": "bar"},{"id": 43, "foo": "baz"}]',
+            status_code=codes.OK,
+        )
+
+        mgr = M(gl)
+        obj_list = await mgr.list(all=True, compact=True)
+        assert [obj.foo for obj in obj_list] == ["bar", "baz"]
+        assert isinstance(obj_list[0], RESTRecord)
+        assert isinstance(obj_list[0].to_object(), FakeObject)
+        assert "compact" not in str(request.calls[0][0].url)
+
+        obj_list = await mgr.list(as_list=False, compact=True)
+        assert isinstance(obj_list, RESTObjectList)
+        obj = await obj_list.anext()
+        assert isinstance(obj, RESTRecord)
+        assert obj.id == 42
+
     @respx.mock
     @pytest.mark.asyncio
     async def test_list_other_url(self, gl):
@@ -16,6 +16,7 @@
 # along with this program.  If not, see <http://www.gnu.org/licenses/>.
 
 import pickle
+import sys
 import unittest
 
 from gitlab import base
@@ -34,6 +35,10 @@ class FakeManager(base.RESTManager):
     _path = "/tests"
 
 
+class FakeObjectWithManager(FakeObject):
+    _managers = (("fakes", "FakeManager"),)
+
+
 class TestRESTManager(unittest.TestCase):
     def test_computed_path_simple(self):
         class MGR(base.RESTManager):
@@ -88,6 +93,27 @@ class TestRESTObject(unittest.TestCase):
         self.assertEqual(unpickled._module, original_obj_module)
         pickled2 = pickle.dumps(unpickled)
 
+    def test_unpickle_previous_format(self):
+        # Objects pickled by older versions store the module in the instance
+        obj = FakeObjectWithManager.__new__(FakeObjectWithManager)
+        state = {
+            "manager": self.manager,
+            "_attrs": {"id": 42},
+            "_updated_attrs": {},
+            "_parent_attrs": {},
+            "_module_name": __name__,
+        }
+        obj.__setstate__(state)
+        self.assertNotIn("_module", obj.__dict__)
+        self.assertEqual(obj._module, sys.modules[__name__])
+        self.assertIsInstance(obj.fakes, FakeManager)
+        self.assertEqual(42, obj.get_id())
+
+    def test_module_cached_on_class(self):
+        obj = FakeObject(self.manager, {"foo": "bar"})
+        self.assertNotIn("_module", obj.__dict__)
+        self.assertIs(FakeObject._module, sys.modules[__name__])
+
     def test_attrs(self):
         obj = FakeObject(self.manager, {"foo": "bar"})
 
@@ -131,6 +157,18 @@ class TestRESTObject(unittest.TestCase):
         self.assertEqual(obj.fakes.gitlab, self.gitlab)
         self.assertEqual(obj.fakes._parent, obj)
 
+    def test_lazy_managers(self):
+        obj = FakeObjectWithManager(self.manager, {"id": 42})
+        self.assertNotIn("fakes", obj.__dict__)
+        manager = obj.fakes
+        self.assertIsInstance(manager, FakeManager)
+        self.assertIs(obj.__dict__["fakes"], manager)
+        self.assertIs(obj.fakes, manager)
+
+        unpickled = pickle.loads(pickle.dumps(obj))
+        self.assertIsInstance(unpickled.fakes, FakeManager)
+        self.assertEqual(unpickled.fakes._parent, unpickled)
+
     def test_equality(self):
         obj1 = FakeObject(self.manager, {"id": "foo"})
         obj2 = FakeObject(self.manager, {"id": "foo", "other_attr": "bar"})
@@ -153,3 +191,59 @@ class TestRESTObject(unittest.TestCase):
         obj1 = FakeObject(self.manager, {"attr1": "foo"})
         obj2 = FakeObject(self.manager, {"attr1": "bar"})
         self.assertNotEqual(obj1, obj2)
+
+
+class TestRESTRecord(unittest.TestCase):
+    def setUp(self):
+        self.gitlab = FakeGitlab()
+        self.manager = FakeManager(self.gitlab)
+        self.record_cls = FakeObjectWithManager._get_record_class()
+
+    def test_record_class(self):
+        self.assertIs(self.record_cls, FakeObjectWithManager._get_record_class())
+        self.assertIsNot(self.record_cls, FakeObject._get_record_class())
+        self.assertTrue(issubclass(self.record_cls, base.RESTRecord))
+        self.assertEqual("FakeObjectWithManagerRecord", self.record_cls.__name__)
+
+    def test_attrs(self):
+        record = self.record_cls(self.manager, {"id": 42, "foo": "bar"})
+
+        self.assertEqual(42, record.get_id())
+        self.assertEqual("bar", record.foo)
+        self.assertEqual({"id": 42, "foo": "bar"}, record.attributes)
+        self.assertFalse(hasattr(record, "__dict__"))
+        self.assertRaises(AttributeError, getattr, record, "fakes")
+        self.assertRaises(AttributeError, getattr, record, "missing")
+
+    def test_read_only(self):
+        record = self.record_cls(self.manager, {"id": 42})
+
+        with self.assertRaises(AttributeError):
+            record.foo = "bar"
+
+    def test_shared_schema(self):
+        r1 = self.record_cls(self.manager, {"id": 1, "foo": "bar"})
+        r2 = self.record_cls(self.manager, {"id": 2, "foo": "baz"})
+        r3 = self.record_cls(self.manager, {"id": 3})
+
+        self.assertIs(r1._schema, r2._schema)
+        self.assertIsNot(r1._schema, r3._schema)
+        self.assertRaises(AttributeError, getattr, r3, "foo")
+
+    def test_to_object(self):
+        record = self.record_cls(self.manager, {"id": 42, "foo": "bar"})
+        obj = record.to_object()
+
+        self.assertIsInstance(obj, FakeObjectWithManager)
+        self.assertEqual({"id": 42, "foo": "bar"}, obj._attrs)
+        self.assertIs(self.manager, obj.manager)
+        self.assertIsInstance(obj.fakes, FakeManager)
+        self.assertEqual(obj, record)
+
+    def test_pickability(self):
+        record = self.record_cls(self.manager, {"id": 42, "foo": "bar"})
+        unpickled = pickle.loads(pickle.dumps(record))
+
+        self.assertIsInstance(unpickled, self.record_cls)
+        self.assertEqual("bar", unpickled.foo)
+        self.assertEqual(record, unpickled)
@@ -0,0 +1,231 @@
+import os
+import pickle
+
+import httpx
+import pytest
+import respx
+from gitlab import cache as gl_cache
+from gitlab import exceptions as exc
+from httpx import codes
+
+
+@pytest.fixture
+def gl(gitlab_class):
+    return gitlab_class(
+        "http://localhost", private_token="private_token", api_version=4, cache=True
+    )
+
+
+def mock_etag_server(calls, etag='"v1"', content='{"version": "13.0.0"}'):
+    def handler(request, response):
+        calls.append(request)
+        if request.headers.get("If-None-Match") == etag:
+            response.status_code = codes.NOT_MODIFIED
+            return response
+        response.status_code = codes.OK
+        response.headers.update({"Content-Type": "application/json", "ETag": etag})
+        response.content = content
+        return response
+
+    respx.add(handler)
+
+
+def entry(content):
+    return gl_cache.CacheEntry('"x"', [], content)
+
+
+class TestResponseCache:
+    def test_lru_eviction_by_entries(self):
+        cache = gl_cache.ResponseCache(max_entries=2)
+        cache.set("a", entry(b"a"))
+        cache.set("b", entry(b"b"))
+        cache.get("a")
+        cache.set("c", entry(b"c"))
+
+        assert cache.get("b") is None
+        assert cache.get("a").content == b"a"
+        assert len(cache) == 2
+
+    def test_lru_eviction_by_size(self):
+        cache = gl_cache.ResponseCache(max_size=10)
+        cache.set("a", entry(b"12345"))
+        cache.set("b", entry(b"12345"))
+        cache.set("c", entry(b"123"))
+        cache.set("d", entry(b"x" * 11))
+
+        assert cache.get("a") is None
+        assert cache.get("d") is None
+        assert cache.size == 8
+
+    def test_key(self):
+        def request(**headers):
+            return httpx.Request("GET", "http://localhost/api/v4/user", headers=headers)
+
+        key = gl_cache.cache_key(request(Sudo="alice"))
+
+        assert key == gl_cache.cache_key(request(Sudo="alice"))
+        assert key != gl_cache.cache_key(request(Sudo="bob"))
+
+    def test_pickability(self):
+        cache = gl_cache.ResponseCache()
+        cache.set("a", entry(b"a"))
+
+        unpickled = pickle.loads(pickle.dumps(cache))
+        assert unpickled.get("a").content == b"a"
+
+
+class TestCachedRequests:
+    @respx.mock
+    @pytest.mark.asyncio
+    async def test_not_modified(self, gl, gl_get_value):
+        calls = []
+        mock_etag_server(calls)
+
+        first = await gl_get_value(gl.http_get("/version"))
+        first["version"] = "modified"
+        second = await gl_get_value(gl.http_get("/version"))
+
+        assert second == {"version": "13.0.0"}
+        assert "If-None-Match" not in calls[0].headers
+        assert calls[1].headers["If-None-Match"] == '"v1"'
+        assert gl.cache.stats == {
+            "hits": 1,
+            "misses": 1,
+            "not_modified": 1,
+            "fresh": 0,
+            "entries": 1,
+            "size": 21,
+        }
+
+    @respx.mock
+    @pytest.mark.asyncio
+    async def test_modified(self, gl, gl_get_value):
+        calls = []
+        mock_etag_server(calls)
+        await gl_get_value(gl.http_get("/version"))
+        gl.cache._entries[next(iter(gl.cache._entries))] = gl_cache.CacheEntry(
+            '"v0"', [], b"{}"
+        )
+
+        result = await gl_get_value(gl.http_get("/version"))
+
+        assert result == {"version": "13.0.0"}
+        assert gl.cache.not_modified == 0
+        assert next(iter(gl.cache._entries.values())).etag == '"v1"'
+
+    @respx.mock
+    @pytest.mark.asyncio
+    async def test_list_pages(self, gl, gl_get_value):
+        calls = []
+        mock_etag_server(calls, content='[{"id": 1}, {"id": 2}]')
+
+        await gl_get_value(gl.http_list("/projects"))
+        result = await gl_get_value(gl.http_list("/projects"))
+
+        assert result == [{"id": 1}, {"id": 2}]
+        assert gl.cache.not_modified == 1
+
+    @respx.mock
+    @pytest.mark.asyncio
+    async def test_unconditional_304(self, gitlab_class, gl_get_value):
+        gl = gitlab_class("http://localhost", private_token="private_token")
+        respx.get("http://localhost/api/v4/version", status_code=codes.NOT_MODIFIED)
+
+        with pytest.raises(exc.GitlabHttpError):
+            await gl_get_value(gl.http_get("/version"))
+        assert gl.cache is None
+
+
+class TestDiskCache:
+    @pytest.fixture
+    def cache(self, tmp_path):
+        return gl_cache.DiskCache(str(tmp_path / "sub" / "cache.sqlite"))
+
+    def test_store(self, cache):
+        cache.set("a", gl_cache.CacheEntry('"x"', [["etag", '"x"']], b"a", 12.5))
+
+        assert cache.get("a") == ('"x"', [["etag", '"x"']], b"a", 12.5)
+        assert cache.get("b") is None
+        assert (cache.hits, cache.misses) == (1, 1)
+        assert len(cache) == 1
+        assert os.stat(cache.path).st_mode & 0o777 == 0o600
+
+    def test_shared_between_instances(self, cache):
+        cache.set("a", entry(b"a"))
+        other = gl_cache.DiskCache(cache.path)
+
+        assert other.get("a").content == b"a"
+        other.clear()
+        assert cache.get("a") is None
+
+    def test_lru_eviction(self, tmp_path):
+        cache = gl_cache.DiskCache(str(tmp_path / "cache.sqlite"), max_size=10)
+        cache.set("a", entry(b"12345"))
+        cache.set("b", entry(b"12345"))
+        cache.get("a")
+        cache.set("c", entry(b"123"))
+
+        assert cache.get("b") is None
+        assert cache.get("a") is not None
+        assert cache.size == 8
+
+    def test_pickability(self, cache):
+        cache.set("a", entry(b"a"))
+
+        unpickled = pickle.loads(pickle.dumps(cache))
+        assert unpickled.get("a").content == b"a"
+
+
+class TestTTL:
+    def test_get_ttl(self):
+        cache = gl_cache.ResponseCache(
+            ttl=[("/version", 60), ("/templates/*", 3600), ("/projects/*", 5)]
+        )
+
+        assert cache.get_ttl("http://localhost/api/v4/version") == 60
+        assert cache.get_ttl("http://localhost/api/v4/templates/licenses") == 3600
+        assert cache.get_ttl("http://localhost/api/v4/projects?page=2") == 0
+        assert cache.get_ttl("http://localhost/gitlab/api/v4/projects/1") == 5
+
+    @respx.mock
+    @pytest.mark.asyncio
+    async def test_fresh_response(self, gitlab_class, gl_get_value, tmp_path):
+        cache = gl_cache.DiskCache(str(tmp_path / "cache.sqlite"), ttl={"/version": 60})
+        gl = gitlab_class(
+            "http://localhost", private_token="private_token", cache=cache
+        )
+        request = respx.get(
+            "http://localhost/api/v4/version",
+            headers={"content-type": "application/json"},
+            content={"version": "13.0.0"},
+            status_code=codes.OK,
+        )
+
+        await gl_get_value(gl.http_get("/version"))
+        # A new process would use the same file
+        gl.cache = gl_cache.DiskCache(cache.path, ttl={"/version": 60})
+        result = await gl_get_value(gl.http_get("/version"))
+
+        assert result == {"version": "13.0.0"}
+        assert request.call_count == 1
+        assert gl.cache.fresh == 1
+
+    @respx.mock
+    @pytest.mark.asyncio
+    async def test_expired_response(self, gitlab_class, gl_get_value):
+        cache = gl_cache.ResponseCache(ttl={"/version": 60})
+        gl = gitlab_class(
+            "http://localhost", private_token="private_token", cache=cache
+        )
+        calls = []
+        mock_etag_server(calls)
+
+        await gl_get_value(gl.http_get("/version"))
+        key, (etag, headers, content, _) = next(iter(cache._entries.items()))
+        cache._entries[key] = gl_cache.CacheEntry(etag, headers, content, 1.0)
+        await gl_get_value(gl.http_get("/version"))
+
+        assert calls[1].headers["If-None-Match"] == '"v1"'
+        assert cache.not_modified == 1
+        # The 304 made the response fresh again
+        assert cache._entries[key].expires > 1.0
@@ -36,6 +36,7 @@ except ImportError:
 
 
 from gitlab import cli
+import gitlab.cache
 import gitlab.v4.cli
 
 
@@ -62,6 +63,24 @@ class TestCLI(unittest.TestCase):
         self.assertEqual(fl.getvalue(), "foobar\n")
         self.assertEqual(test.exception.code, 1)
 
+    def test_purge_cache(self):
+        with tempfile.TemporaryDirectory() as root:
+            path = os.path.join(root, "cache", "http-cache.sqlite")
+            fl = io.StringIO()
+            with redirect_stderr(fl):
+                self.assertFalse(cli._purge_cache(path))
+            self.assertFalse(os.path.exists(os.path.dirname(path)))
+            self.assertIn("No response cache", fl.getvalue())
+
+            gitlab.cache.DiskCache(path).set(
+                "key", gitlab.cache.CacheEntry("etag", [], b"{}", 0.0)
+            )
+            fl = io.StringIO()
+            with redirect_stderr(fl):
+                self.assertTrue(cli._purge_cache(path))
+            self.assertIsNone(gitlab.cache.DiskCache(path).get("key"))
+            self.assertIn("Purged the response cache", fl.getvalue())
+
     def test_parse_value(self):
         ret = cli._parse_value("foobar")
         self.assertEqual(ret, "foobar")
@@ -101,6 +120,14 @@ class TestCLI(unittest.TestCase):
         self.assertTrue(args.verbose)
         self.assertEqual(args.gitlab, "gl_id")
         self.assertEqual(args.config_file, ["foo.cfg", "bar.cfg"])
+        self.assertFalse(args.no_cache)
+        self.assertFalse(args.purge_cache)
+
+    def test_base_parser_cache(self):
+        parser = cli._get_base_parser()
+        args = parser.parse_args(["--no-cache", "--purge-cache"])
+        self.assertTrue(args.no_cache)
+        self.assertTrue(args.purge_cache)
 
 
 class TestV4CLI(unittest.TestCase):
@@ -0,0 +1,120 @@
+import pytest
+import respx
+from gitlab import AsyncGitlab, Gitlab
+from gitlab import codec
+from httpx import codes
+
+
+class TestGetCodec:
+    def test_default(self):
+        assert codec.get_codec().name == "json"
+        assert codec.get_codec("json").name == "json"
+
+    def test_orjson(self):
+        pytest.importorskip("orjson")
+        c = codec.get_codec("orjson")
+
+        assert c.name == "orjson"
+        assert c.loads(b'{"id": 1, "name": "\\u00e9"}') == {"id": 1, "name": "é"}
+        assert c.dumps({"id": 1}) == b'{"id":1}'
+        # Values orjson refuses are encoded by the json module
+        assert c.dumps({"id": 2 ** 70}) == b'{"id": %d}' % 2 ** 70
+
+    def test_orjson_not_installed(self, monkeypatch):
+        monkeypatch.setattr(codec, "orjson", None)
+
+        assert codec.get_codec("orjson").name == "json"
+
+    def test_custom(self):
+        class Custom:
+            loads = dumps = None
+
+        custom = Custom()
+        assert codec.get_codec(custom) is custom
+
+    def test_unknown(self):
+        with pytest.raises(ValueError):
+            codec.get_codec("yaml")
+
+
+@pytest.mark.parametrize("json_backend", ["json", "orjson"])
+@pytest.mark.parametrize("gitlab_class", [Gitlab, AsyncGitlab], ids=["sync", "async"])
+class TestClientCodec:
+    @pytest.fixture
+    def gl(self, gitlab_class, json_backend):
+        return gitlab_class(
+            "http://localhost",
+            private_token="private_token",
+            api_version=4,
+            json_backend=json_backend,
+        )
+
+    @respx.mock
+    @pytest.mark.asyncio
+    async def test_request_bodies(self, gl, gl_get_value):
+        request = respx.post(
+            "http://localhost/api/v4/projects",
+            headers={"content-type": "application/json"},
+            content={"id": 1, "name": "project1"},
+            status_code=codes.CREATED,
+        )
+
+        result = gl.http_post("/projects", post_data={"name": "project1"})
+        result = await gl_get_value(result)
+
+        assert result == {"id": 1, "name": "project1"}
+        sent = request.calls[0][0]
+        assert sent.headers["Content-type"] == "application/json"
+        assert gl.codec.loads(sent.read()) == {"name": "project1"}
+
+    @respx.mock
+    @pytest.mark.asyncio
+    async def test_list(self, gl, gl_get_value):
+        respx.get(
+            "http://localhost/api/v4/projects",
+            headers={"content-type": "application/json"},
+            content=[{"id": 1}, {"id": 2}],
+            status_code=codes.OK,
+        )
+
+        result = await gl_get_value(gl.http_list("/projects"))
+
+        assert result == [{"id": 1}, {"id": 2}]
+
+
+class TestJSONArrayDecoder:
+    def decode(self, body, size):
+        decoder = codec.JSONArrayDecoder()
+        items = []
+        for i in range(0, len(body), size):
+            items.extend(decoder.feed(body[i : i + size]))
+        return items + decoder.close()
+
+    @pytest.mark.parametrize("size", [1, 3, 7, 1000])
+    def test_chunks(self, size):
+        data = [{"id": 1, "title": "café [x]", "labels": ["a,b"]}, 12, None]
+        body = (
+            b'[ {"id": 1, "title": "caf\xc3\xa9 [x]",\n "labels": ["a,b"]},12 , null]'
+        )
+
+        assert self.decode(body, size) == data
+
+    def test_items_returned_when_complete(self):
+        decoder = codec.JSONArrayDecoder()
+
+        assert decoder.feed(b'[{"id": 1}, {"id"') == [{"id": 1}]
+        assert decoder.feed(b": 2}, 3") == [{"id": 2}]
+        # 3 could be the beginning of 34
+        assert decoder.feed(b"4") == []
+        assert decoder.feed(b"]") == [34]
+        assert decoder.close() == []
+
+    def test_empty(self):
+        assert self.decode(b"[]", 1) == []
+
+    @pytest.mark.parametrize(
+        "body", [b'{"id": 1}', b"[1, 2", b"[1 2]", b"[1,]", b"[1] 2"]
+    )
+    def test_invalid(self, body):
+        with pytest.raises(ValueError):
+            self.decode(body, 2)
@@ -0,0 +1,147 @@
+import math
+
+import pytest
+import respx
+from gitlab import columnar
+from gitlab.base import RESTManager
+from gitlab.mixins import ListMixin
+from gitlab.v4.objects import MergeRequest
+from httpx import codes
+
+ITEMS = [
+    {
+        "iid": 1,
+        "state": "merged",
+        "created_at": "2020-01-01T10:00:00.000Z",
+        "merged_at": "2020-01-02T10:00:00.000Z",
+        "author": {"id": 5, "username": "alice"},
+        "labels": ["bug"],
+        "draft": False,
+    },
+    {
+        "iid": 2,
+        "state": "opened",
+        "created_at": "2020-01-03T12:00:00.500+02:00",
+        "merged_at": None,
+        "author": {"id": 6, "username": "bob"},
+        "labels": [],
+        "draft": True,
+    },
+]
+
+
+def build(fields, items=ITEMS):
+    builder = columnar.ColumnsBuilder(fields)
+    for item in items:
+        builder.add(item)
+    return builder.columns()
+
+
+class TestParseTimestamp:
+    def test_datetime(self):
+        assert columnar.parse_timestamp("1970-01-02T00:00:01.250Z") == 86401.25
+
+    def test_offset(self):
+        assert columnar.parse_timestamp("1970-01-01T02:00:00+02:00") == 0
+        assert columnar.parse_timestamp("1970-01-01T00:00:00-0130") == 5400
+
+    def test_date(self):
+        assert columnar.parse_timestamp("1970-01-02") == 86400
+
+    def test_not_a_date(self):
+        assert columnar.parse_timestamp("master") is None
+
+
+class TestColumnsBuilder:
+    def test_inferred_columns(self):
+        columns = build(["iid", "state", "created_at", "draft", "labels"])
+
+        assert columns.rows == 2
+        assert columns.kinds == {
+            "iid": "int",
+            "state": "str",
+            "created_at": "timestamp",
+            "draft": "bool",
+            "labels": "object",
+        }
+        assert columns["iid"].typecode == "q"
+        assert list(columns["iid"]) == [1, 2]
+        assert columns["state"] == ["merged", "opened"]
+        assert list(columns["created_at"]) == [1577872800.0, 1578045600.5]
+        assert list(columns["draft"]) == [0, 1]
+        assert columns["labels"] == [["bug"], []]
+
+    def test_missing_values(self):
+        columns = build(["merged_at", "author.id", "unknown"])
+
+        assert columns.kinds["merged_at"] == "timestamp"
+        assert math.isnan(columns["merged_at"][1])
+        assert list(columns["author.id"]) == [5, 6]
+        assert columns["unknown"] == [None, None]
+
+    def test_int_with_missing_values(self):
+        columns = build(["weight"], [{"weight": None}, {"weight": 3}, {}])
+
+        assert columns.kinds["weight"] == "int"
+        assert columns["weight"].typecode == "d"
+        values = list(columns["weight"])
+        assert math.isnan(values[0]) and values[1] == 3 and math.isnan(values[2])
+
+    def test_explicit_kind(self):
+        columns = build({"state": "str", "iid": None})
+
+        assert columns.kinds == {"state": "str", "iid": "int"}
+
+        with pytest.raises(ValueError):
+            build({"state": "decimal"})
+
+    def test_mismatch(self):
+        items = [{"ref": "2020-01-01"}, {"ref": "master"}]
+
+        with pytest.raises(ValueError, match="ref"):
+            build(["ref"], items)
+        assert build({"ref": "str"}, items)["ref"] == ["2020-01-01", "master"]
+
+    def test_to_numpy(self):
+        numpy = pytest.importorskip("numpy")
+        arrays = build(["iid", "merged_at", "draft"]).to_numpy()
+
+        assert arrays["iid"].dtype == numpy.int64
+        assert arrays["draft"].dtype == bool
+        assert numpy.isnat(arrays["merged_at"][1])
+
+    def test_to_pandas(self):
+        pytest.importorskip("pandas")
+        frame = build(["iid", "created_at"]).to_pandas()
+
+        assert list(frame.columns) == ["iid", "created_at"]
+        assert str(frame["created_at"].dt.tz) == "UTC"
+
+
+class TestToColumns:
+    @respx.mock
+    @pytest.mark.asyncio
+    async def test_to_columns(self, gl, gl_get_value, is_gl_sync):
+        class M(ListMixin, RESTManager):
+            _path = "/merge_requests"
+            _obj_cls = MergeRequest
+
+        for page, item in enumerate(ITEMS, 1):
+            headers = {"content-type": "application/json"}
+            if page == 1:
+                headers["Link"] = (
+                    "<http://localhost/api/v4/merge_requests?page=2>;" ' rel="next"'
+                )
+            url = "http://localhost/api/v4/merge_requests"
+            if page > 1:
+                url += "?page=%d" % page
+            respx.get(url, headers=headers, content=[item], status_code=codes.OK)
+
+        obj_list = await gl_get_value(M(gl).list(as_list=False))
+        if is_gl_sync:
+            columns = obj_list.to_columns(["iid", "author.username"])
+        else:
+            columns = await obj_list.ato_columns(["iid", "author.username"])
+
+        assert list(columns["iid"]) == [1, 2]
+        assert columns["author.username"] == ["alice", "bob"]
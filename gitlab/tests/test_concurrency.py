@@ -0,0 +1,587 @@
+import asyncio
+import threading
+import time
+
+import httpx
+import pytest
+import respx
+from gitlab import AsyncGitlab, Gitlab
+from gitlab import concurrency
+from gitlab import exceptions as exc
+from gitlab.fake import FakeGitlab
+from gitlab.v4.objects import Project
+from httpx import codes
+
+
+@pytest.fixture
+def agl():
+    return AsyncGitlab(
+        "http://localhost",
+        private_token="private_token",
+        api_version=4,
+        max_concurrency=2,
+    )
+
+
+@pytest.fixture
+def sgl():
+    return Gitlab(
+        "http://localhost",
+        private_token="private_token",
+        api_version=4,
+        max_concurrency=2,
+    )
+
+
+class TestGather:
+    @pytest.mark.asyncio
+    async def test_limit(self):
+        running = []
+        peak = []
+
+        async def job(i):
+            running.append(i)
+            peak.append(len(running))
+            await asyncio.sleep(0.01)
+            running.remove(i)
+            return i
+
+        result = await concurrency.gather((job(i) for i in range(10)), limit=3)
+
+        assert result == list(range(10))
+        assert max(peak) == 3
+
+    @pytest.mark.asyncio
+    async def test_return_exceptions(self):
+        async def job(i):
+            if i == 1:
+                raise ValueError(i)
+            return i
+
+        result = await concurrency.gather([job(i) for i in range(3)])
+
+        assert result[0] == 0
+        assert isinstance(result[1], ValueError)
+        assert result[2] == 2
+
+    @pytest.mark.asyncio
+    async def test_cancel_on_error(self):
+        done = []
+
+        async def job(i):
+            if i == 0:
+                raise ValueError(i)
+            await asyncio.sleep(0.01)
+            done.append(i)
+
+        with pytest.raises(ValueError):
+            await concurrency.gather(
+                [job(i) for i in range(5)], limit=2, cancel_on_error=True
+            )
+        await asyncio.sleep(0.02)
+        assert done == []
+
+
+class TestAsyncGitlabFanOut:
+    @respx.mock
+    @pytest.mark.asyncio
+    async def test_manager_map(self, agl):
+        for i in (1, 2):
+            respx.get(
+                "http://localhost/api/v4/projects/%d" % i,
+                headers={"content-type": "application/json"},
+                content={"id": i, "name": "project%d" % i},
+                status_code=codes.OK,
+            )
+        respx.get(
+            "http://localhost/api/v4/projects/3",
+            content="Not found",
+            status_code=codes.NOT_FOUND,
+        )
+
+        result = await agl.projects.map("get", [1, 2, 3], limit=2)
+
+        assert isinstance(result[0], Project)
+        assert result[1].name == "project2"
+        assert isinstance(result[2], exc.GitlabGetError)
+        assert agl._limiter.in_flight == 0
+
+    @respx.mock
+    @pytest.mark.asyncio
+    async def test_gather_cancel_on_error(self, agl):
+        respx.get(
+            "http://localhost/api/v4/projects/1",
+            content="Not found",
+            status_code=codes.NOT_FOUND,
+        )
+
+        with pytest.raises(exc.GitlabGetError):
+            await agl.gather([agl.projects.get(1)], cancel_on_error=True)
+
+
+class TestBatchExecutor:
+    def test_map_order(self):
+        def job(i):
+            if i == 2:
+                raise ValueError(i)
+            return i * 2
+
+        with concurrency.BatchExecutor(max_workers=3) as executor:
+            result = executor.map(job, range(5))
+
+        assert result[:2] == [0, 2]
+        assert isinstance(result[2], ValueError)
+        assert result[3:] == [6, 8]
+
+    def test_cancel_on_error(self):
+        event = threading.Event()
+
+        def job(i):
+            if i == 0:
+                raise ValueError(i)
+            event.wait(1)
+            return i
+
+        with concurrency.BatchExecutor(max_workers=1) as executor:
+            with pytest.raises(ValueError):
+                executor.map(job, range(3), cancel_on_error=True)
+            event.set()
+
+
+class TestGitlabFanOut:
+    @respx.mock
+    def test_manager_map(self, sgl):
+        for i in range(1, 5):
+            respx.get(
+                "http://localhost/api/v4/projects/%d" % i,
+                headers={"content-type": "application/json"},
+                content={"id": i, "name": "project%d" % i},
+                status_code=codes.OK,
+            )
+
+        result = sgl.projects.map("get", range(1, 5), limit=3)
+
+        assert [p.id for p in result] == [1, 2, 3, 4]
+        assert isinstance(sgl._limiter, threading.BoundedSemaphore)
+
+    @respx.mock
+    def test_version_fetched_once(self, sgl):
+        request = respx.get(
+            "http://localhost/api/v4/version",
+            headers={"content-type": "application/json"},
+            content={"version": "13.0.0", "revision": "abc"},
+            status_code=codes.OK,
+        )
+
+        with sgl.executor(max_workers=4) as executor:
+            result = executor.map(lambda _: sgl.version(), range(8))
+
+        assert result == [("13.0.0", "abc")] * 8
+        assert request.call_count == 1
+
+    @respx.mock
+    def test_version_does_not_hold_client_lock(self, sgl):
+        acquired = []
+
+        def content(request):
+            # Another thread can use the client lock during the round trip
+            def acquire():
+                if sgl._lock.acquire(timeout=1):
+                    acquired.append(True)
+                    sgl._lock.release()
+
+            thread = threading.Thread(target=acquire)
+            thread.start()
+            thread.join()
+            return {"version": "13.0.0", "revision": "abc"}
+
+        respx.get(
+            "http://localhost/api/v4/version",
+            headers={"content-type": "application/json"},
+            content=content,
+            status_code=codes.OK,
+        )
+
+        assert sgl.version() == ("13.0.0", "abc")
+        assert acquired == [True]
+
+    def test_auth_headers_replaced(self, sgl):
+        headers = sgl.headers
+        sgl.private_token = None
+        sgl.job_token = "job_token"
+        sgl._set_auth_info()
+
+        assert sgl.headers is not headers
+        assert headers["PRIVATE-TOKEN"] == "private_token"
+        assert sgl.headers["JOB-TOKEN"] == "job_token"
+        assert "PRIVATE-TOKEN" not in sgl.headers
+
+
+class TestAdaptiveLimiter:
+    def test_additive_increase(self):
+        limiter = concurrency.AdaptiveLimiter(initial=2, max_limit=4)
+
+        for _ in range(3):
+            limiter.record(200, 0.1)
+        assert limiter.limit == 3
+        for _ in range(20):
+            limiter.record(200, 0.1)
+        assert limiter.limit == 4
+        assert limiter.increases == 2
+
+    def test_multiplicative_decrease(self):
+        limiter = concurrency.AdaptiveLimiter(initial=16, min_limit=3)
+
+        limiter.record(429, 0.1)
+        assert limiter.limit == 8
+        # In flight when the limit was cut
+        limiter.record(503, 1.0)
+        assert limiter.limit == 8
+
+        limiter._last_cut -= 1
+        limiter.record(None, 0.1)
+        limiter._last_cut -= 1
+        limiter.record(502, 0.1)
+        assert limiter.limit == 3
+        assert limiter.decreases == 3
+
+    def test_latency_spike(self):
+        limiter = concurrency.AdaptiveLimiter(initial=8, max_limit=8, window=10)
+
+        for _ in range(10):
+            limiter.record(200, 0.1)
+        assert limiter.stats["baseline"] == 0.1
+        limiter.record(200, 0.5)
+        assert limiter.limit == 4
+        assert limiter.stats["p95"] is None
+
+    def test_invalid_limits(self):
+        with pytest.raises(ValueError):
+            concurrency.AdaptiveLimiter(initial=10, max_limit=5)
+
+    def test_threads(self):
+        limiter = concurrency.AdaptiveLimiter(initial=2)
+        running = []
+        peak = []
+
+        def job(i):
+            running.append(i)
+            peak.append(len(running))
+            time.sleep(0.01)
+            running.remove(i)
+            return i
+
+        with concurrency.BatchExecutor(max_workers=4, limiter=limiter) as executor:
+            result = executor.map(job, range(8))
+
+        assert result == list(range(8))
+        assert max(peak) <= 3
+        assert limiter.in_flight == 0
+        assert limiter.limit > 2
+
+    @pytest.mark.asyncio
+    async def test_gather(self):
+        limiter = concurrency.AdaptiveLimiter(initial=2, max_limit=2)
+        running = []
+        peak = []
+
+        async def job(i):
+            running.append(i)
+            peak.append(len(running))
+            await asyncio.sleep(0.01)
+            running.remove(i)
+            if i == 5:
+                raise exc.GitlabGetError(response_code=503)
+            return i
+
+        result = await concurrency.gather([job(i) for i in range(8)], limit=limiter)
+
+        assert result[:5] == list(range(5))
+        assert isinstance(result[5], exc.GitlabGetError)
+        assert max(peak) == 2
+        assert limiter.decreases == 1
+
+    @pytest.mark.asyncio
+    async def test_cancelled_waiter(self):
+        limiter = concurrency.AdaptiveLimiter(initial=1)
+        await limiter.aacquire()
+        waiter = asyncio.ensure_future(limiter.aacquire())
+        await asyncio.sleep(0)
+        waiter.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await waiter
+        limiter.release()
+
+        await asyncio.wait_for(limiter.aacquire(), 1)
+        assert limiter.in_flight == 1
+
+
+class TestAdaptiveClient:
+    @respx.mock
+    @pytest.mark.asyncio
+    async def test_server_errors(self, gitlab_class, gl_get_value):
+        limiter = concurrency.AdaptiveLimiter(initial=8)
+        gl = gitlab_class(
+            "http://localhost", private_token="token", max_concurrency=limiter
+        )
+        respx.get("http://localhost/api/v4/projects/1", status_code=codes.BAD_GATEWAY)
+        respx.get(
+            "http://localhost/api/v4/projects/2",
+            headers={"content-type": "application/json"},
+            content={"id": 2},
+        )
+
+        with pytest.raises(exc.GitlabGetError):
+            await gl_get_value(gl.projects.get(1))
+        await gl_get_value(gl.projects.get(2))
+
+        assert gl._get_limiter() is limiter
+        assert limiter.limit == 4
+        assert limiter.in_flight == 0
+
+    @respx.mock
+    def test_executor(self, sgl):
+        limiter = concurrency.AdaptiveLimiter(initial=2, max_limit=6)
+        for i in range(1, 5):
+            respx.get(
+                "http://localhost/api/v4/projects/%d" % i,
+                headers={"content-type": "application/json"},
+                content={"id": i},
+            )
+
+        result = sgl.projects.map("get", range(1, 5), limit=limiter)
+
+        assert [p.id for p in result] == [1, 2, 3, 4]
+        assert limiter.limit == 3
+
+    @respx.mock
+    def test_executor_network_errors(self, sgl):
+        limiter = concurrency.AdaptiveLimiter(initial=8)
+
+        def refuse(request, **kwargs):
+            raise httpx.ConnectError("Connection refused", request=request)
+
+        respx.get("http://localhost/api/v4/projects/1", content=refuse)
+
+        result = sgl.projects.map("get", [1] * 4, limit=limiter, return_exceptions=True)
+
+        assert all(isinstance(r, httpx.ConnectError) for r in result)
+        assert limiter.decreases >= 1
+        assert limiter.limit < 8
+
+
+class TestSingleFlight:
+    def test_threads(self):
+        flight = concurrency.SingleFlight()
+        calls = []
+        event = threading.Event()
+
+        def call():
+            calls.append(1)
+            event.wait(1)
+            return "result"
+
+        with concurrency.BatchExecutor(max_workers=4) as executor:
+            futures = [executor.submit(flight.run, "key", call) for _ in range(4)]
+            while flight.shared < 3:
+                time.sleep(0.001)
+            event.set()
+            results = [future.result() for future in futures]
+
+        assert results == ["result"] * 4
+        assert len(calls) == 1
+        assert len(flight) == 0
+
+    def test_exception(self):
+        flight = concurrency.SingleFlight()
+
+        def call():
+            raise ValueError()
+
+        with pytest.raises(ValueError):
+            flight.run("key", call)
+        assert len(flight) == 0
+
+    @pytest.mark.asyncio
+    async def test_cancelled_caller(self):
+        flight = concurrency.SingleFlight()
+        event = asyncio.Event()
+
+        async def call():
+            await event.wait()
+            return "result"
+
+        first = asyncio.ensure_future(flight.arun("key", call))
+        second = asyncio.ensure_future(flight.arun("key", call))
+        await asyncio.sleep(0)
+        first.cancel()
+        event.set()
+
+        assert await second == "result"
+        assert first.cancelled()
+        assert len(flight) == 0
+
+
+class TestSingleFlightClient:
+    @respx.mock
+    @pytest.mark.asyncio
+    async def test_identical_gets(self):
+        gl = AsyncGitlab("http://localhost", private_token="token", singleflight=True)
+        request = respx.get(
+            "http://localhost/api/v4/projects/1",
+            headers={"content-type": "application/json"},
+            content={"id": 1, "name": "project1"},
+        )
+        other = respx.get(
+            "http://localhost/api/v4/projects/1?sudo=2",
+            headers={"content-type": "application/json"},
+            content={"id": 1, "name": "project1"},
+        )
+
+        projects = await gl.gather(
+            [gl.projects.get(1) for _ in range(5)] + [gl.projects.get(1, sudo=2)]
+        )
+
+        assert request.call_count == 1
+        assert other.call_count == 1
+        assert gl.singleflight.shared == 4
+        projects[0].name = "changed"
+        projects[0]._update_attrs({"name": "saved"})
+        assert projects[1].name == "project1"
+
+    @respx.mock
+    @pytest.mark.asyncio
+    async def test_posts_not_coalesced(self):
+        gl = AsyncGitlab("http://localhost", private_token="token", singleflight=True)
+        request = respx.post(
+            "http://localhost/api/v4/projects",
+            headers={"content-type": "application/json"},
+            content={"id": 1, "name": "project1"},
+            status_code=codes.CREATED,
+        )
+
+        await gl.gather([gl.projects.create({"name": "project1"}) for _ in range(3)])
+
+        assert request.call_count == 3
+        assert gl.singleflight.shared == 0
+
+
+class TestPriorityLimiter:
+    @pytest.mark.asyncio
+    async def test_order(self):
+        limiter = concurrency.PriorityLimiter(1)
+        order = []
+
+        async def run(name, priority):
+            await limiter.acquire(priority)
+            order.append(name)
+            await asyncio.sleep(0)
+            limiter.release()
+
+        await limiter.acquire()
+        tasks = [
+            asyncio.ensure_future(run(name, priority))
+            for name, priority in [("b1", 10), ("b2", 10), ("i1", 0), ("i2", 0)]
+        ]
+        await asyncio.sleep(0)
+        assert limiter.stats["waiting"] == {0: 2, 10: 2}
+        limiter.release()
+        await asyncio.gather(*tasks)
+
+        assert order == ["i1", "i2", "b1", "b2"]
+        assert limiter.in_flight == 0
+
+    @pytest.mark.asyncio
+    async def test_starvation(self, monkeypatch):
+        now = [0.0]
+        monkeypatch.setattr(concurrency.time, "monotonic", lambda: now[0])
+        limiter = concurrency.PriorityLimiter(1, max_wait=1)
+        await limiter.acquire()
+        background = asyncio.ensure_future(limiter.acquire(10))
+        await asyncio.sleep(0)
+        now[0] = 1.0
+        interactive = asyncio.ensure_future(limiter.acquire(0))
+        await asyncio.sleep(0)
+
+        limiter.release()
+        await background
+        assert not interactive.done()
+        assert limiter.promoted == 1
+        limiter.release()
+        await interactive
+
+    @pytest.mark.asyncio
+    async def test_cancelled_waiter(self):
+        limiter = concurrency.PriorityLimiter(1)
+        await limiter.acquire()
+        waiter = asyncio.ensure_future(limiter.acquire())
+        await asyncio.sleep(0)
+        waiter.cancel()
+        await asyncio.gather(waiter, return_exceptions=True)
+
+        assert limiter.waiting == 0
+        limiter.release()
+        assert limiter.in_flight == 0
+
+
+class TestPriorityClient:
+    class FakeClient:
+        def __init__(self):
+            self.paths = []
+
+        async def send(self, request, **kwargs):
+            self.paths.append(request.url.path)
+            await asyncio.sleep(0.001)
+            return httpx.Response(
+                200,
+                headers=[("Content-Type", "application/json")],
+                content=b'{"id": 1}',
+                request=request,
+            )
+
+    @pytest.mark.asyncio
+    async def test_interactive_first(self):
+        gl = AsyncGitlab("http://localhost", private_token="token", max_concurrency=1)
+        gl.client = self.FakeClient()
+
+        with concurrency.priority(concurrency.BACKGROUND):
+            crawl = asyncio.ensure_future(
+                gl.gather(gl.http_get("/projects/%d" % i) for i in range(5))
+            )
+        while gl._get_limiter().waiting < 4:
+            await asyncio.sleep(0)
+        await gl.http_get("/user", priority=concurrency.INTERACTIVE)
+        await crawl
+
+        assert gl.client.paths.index("/api/v4/user") == 1
+        assert all("priority" not in path for path in gl.client.paths)
+
+    @pytest.mark.asyncio
+    @pytest.mark.parametrize(
+        "options", [{}, {"prefetch": True}, {"concurrency": 2}], ids=str
+    )
+    async def test_pages_priority(self, options):
+        fake = FakeGitlab(projects=1, issues=25)
+        gl = fake.async_gitlab(max_concurrency=1)
+        limiter = gl._get_limiter()
+        priorities = []
+        acquire = limiter.acquire
+
+        async def record(priority=concurrency.INTERACTIVE):
+            priorities.append(priority)
+            await acquire(priority)
+
+        limiter.acquire = record
+        issues = gl.projects.get(1, lazy=True).issues
+        result = await issues.list(
+            all=True, per_page=5, priority=concurrency.BACKGROUND, **options
+        )
+
+        assert len(result) == 25
+        assert priorities == [concurrency.BACKGROUND] * 5
+
+    def test_default_limit(self):
+        gl = AsyncGitlab("http://localhost", private_token="token", max_connections=7)
+        assert gl._get_limiter() is None
+        assert gl._get_limiter(concurrency.BACKGROUND).limit == 7
+        assert gl._get_limiter() is gl._limiter
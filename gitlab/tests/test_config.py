@@ -47,6 +47,25 @@ per_page = 50
 [four]
 url = https://four.url
 oauth_token = STUV
+
+[five]
+url = https://five.url
+cache = true
+cache_path = /tmp/gitlab-cache.sqlite
+cache_ttl =
+    /version = 3600
+    /templates/* = 86400
+rate_limit = true
+http2 = true
+max_connections = 200
+max_keepalive_connections = 50
+keepalive_expiry = 30
+"""
+
+invalid_cache_ttl_config = u"""[global]
+[one]
+url = http://one.url
+cache_ttl = /version
 """
 
 no_default_config = u"""[global]
@@ -166,3 +185,30 @@ class TestConfigParser(unittest.TestCase):
         self.assertEqual("STUV", cp.oauth_token)
         self.assertEqual(2, cp.timeout)
         self.assertEqual(True, cp.ssl_verify)
+        self.assertFalse(cp.cache)
+        self.assertFalse(cp.rate_limit)
+        self.assertFalse(cp.http2)
+        self.assertEqual(100, cp.max_connections)
+
+        fd = io.StringIO(valid_config)
+        fd.close = mock.Mock(return_value=None)
+        m_open.return_value = fd
+        cp = config.GitlabConfigParser(gitlab_id="five")
+        self.assertTrue(cp.cache)
+        self.assertEqual("/tmp/gitlab-cache.sqlite", cp.cache_path)
+        self.assertEqual([("/version", 3600), ("/templates/*", 86400)], cp.cache_ttl)
+        self.assertTrue(cp.rate_limit)
+        self.assertTrue(cp.http2)
+        self.assertEqual(200, cp.max_connections)
+        self.assertEqual(50, cp.max_keepalive_connections)
+        self.assertEqual(30.0, cp.keepalive_expiry)
+
+    @mock.patch("os.path.exists")
+    @mock.patch("builtins.open")
+    def test_invalid_cache_ttl(self, m_open, path_exists):
+        fd = io.StringIO(invalid_cache_ttl_config)
+        fd.close = mock.Mock(return_value=None)
+        m_open.return_value = fd
+        path_exists.return_value = True
+        with self.assertRaises(config.GitlabDataError):
+            config.GitlabConfigParser("one")
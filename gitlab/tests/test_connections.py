@@ -0,0 +1,71 @@
+import pickle
+
+import pytest
+import respx
+from gitlab import connections
+from httpx import codes
+
+
+class Obj:
+    def __init__(self, **kwargs):
+        self.__dict__.update(kwargs)
+
+
+def response(connection):
+    return Obj(_raw_stream=Obj(connection=connection))
+
+
+class TestConnectionTracker:
+    def test_get_connection(self):
+        connection = Obj()
+        new_response = Obj(
+            stream=Obj(_stream=Obj(_httpcore_stream=Obj(connection=connection)))
+        )
+
+        assert connections.get_connection(response(connection)) is connection
+        assert connections.get_connection(new_response) is connection
+        assert connections.get_connection(Obj(stream=None)) is None
+
+    def test_track(self):
+        tracker = connections.ConnectionTracker()
+        first, second = Obj(), Obj()
+
+        assert tracker.track(response(first)) is False
+        assert tracker.track(response(first)) is True
+        assert tracker.track(response(second)) is False
+        assert tracker.track(Obj()) is None
+        assert tracker.stats == {"opened": 2, "reused": 1, "unknown": 1}
+
+    def test_pickle(self):
+        tracker = connections.ConnectionTracker()
+        tracker.track(response(Obj()))
+        unpickled = pickle.loads(pickle.dumps(tracker))
+        assert unpickled.stats == {"opened": 1, "reused": 0, "unknown": 0}
+
+
+class TestWarmup:
+    @respx.mock
+    @pytest.mark.asyncio
+    async def test_warmup(self, gitlab_class, gl_get_value):
+        gl = gitlab_class(
+            "http://localhost", private_token="token", max_keepalive_connections=3
+        )
+        request = respx.get(
+            "http://localhost/api/v4/version",
+            content={"version": "13.0.0", "revision": "abc"},
+            status_code=codes.OK,
+        )
+
+        # The connections of mocked responses are unknown
+        assert await gl_get_value(gl.warmup(5)) == 0
+
+        assert request.call_count == 3
+        assert request.calls[0][0].headers["PRIVATE-TOKEN"] == "token"
+        assert gl.connections.unknown == 3
+
+    @pytest.mark.asyncio
+    async def test_warmup_without_keepalive(self, gitlab_class, gl_get_value):
+        gl = gitlab_class(
+            "http://localhost", private_token="token", max_keepalive_connections=0
+        )
+        assert await gl_get_value(gl.warmup(2)) == 0
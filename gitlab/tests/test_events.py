@@ -0,0 +1,172 @@
+import re
+
+import httpx
+import mock
+import pytest
+import respx
+from gitlab import client, events, exceptions
+from gitlab.v4.objects import ProjectManager
+
+PROJECT = '{"id": 1, "name": "project1"}'
+
+
+@pytest.fixture
+def hooked(gitlab_class):
+    gl = gitlab_class("http://localhost", private_token="token")
+    gl.events = []
+    gl.add_request_hook(gl.events.append)
+    return gl
+
+
+def test_url_template():
+    assert events.url_template("/projects") == "/projects"
+    assert events.url_template("/projects/12/issues/3") == "/projects/:id/issues/:id"
+    assert events.url_template("/projects/group%2Fproject") == "/projects/:id"
+    assert (
+        events.url_template("/projects/1/repository/commits/0b4bc9a4")
+        == "/projects/:id/repository/commits/:id"
+    )
+
+
+class TestRequestHooks:
+    @respx.mock
+    @pytest.mark.asyncio
+    async def test_event(self, hooked, gl_get_value):
+        respx.get(
+            "http://localhost/api/v4/projects/1",
+            content=PROJECT,
+            headers={"Content-Type": "application/json"},
+        )
+
+        await gl_get_value(hooked.projects.get(1))
+
+        (event,) = hooked.events
+        assert event.method == "GET"
+        assert event.url == "http://localhost/api/v4/projects/1"
+        assert event.url_template == "/projects/:id"
+        assert event.manager is ProjectManager
+        assert event.status_code == 200
+        assert event.bytes_sent == 0
+        assert event.bytes_received == len(PROJECT)
+        assert 0 <= event.ttfb <= event.elapsed
+        assert event.retries == 0
+        assert event.error is None
+
+    @respx.mock
+    @pytest.mark.asyncio
+    async def test_direct_call(self, hooked, gl_get_value):
+        respx.post(
+            "http://localhost/api/v4/projects",
+            content=PROJECT,
+            headers={"Content-Type": "application/json"},
+            status_code=201,
+        )
+
+        await gl_get_value(hooked.http_post("/projects", post_data={"name": "p"}))
+
+        (event,) = hooked.events
+        assert event.manager is None
+        assert event.bytes_sent == len('{"name": "p"}')
+
+    @respx.mock
+    @pytest.mark.asyncio
+    async def test_retries(self, hooked, gl_get_value):
+        # The retry options are sent in the query string as well
+        respx.get(
+            re.compile(r"http://localhost/api/v4/projects/1\?.*"), status_code=503
+        )
+
+        with mock.patch.object(client.time, "sleep"), mock.patch.object(
+            client.asyncio, "sleep", mock.AsyncMock()
+        ):
+            with pytest.raises(exceptions.GitlabGetError):
+                await gl_get_value(
+                    hooked.projects.get(1, retry_transient_errors=True, max_retries=2)
+                )
+
+        (event,) = hooked.events
+        assert event.status_code == 503
+        assert event.retries == 2
+        assert event.sleep_time > 0
+        assert isinstance(event.error, exceptions.GitlabHttpError)
+
+    @respx.mock
+    @pytest.mark.asyncio
+    async def test_body_read_error_retried(self, hooked, gl_get_value):
+        respx.get(
+            re.compile(r"http://localhost/api/v4/projects/1\?.*"),
+            content=PROJECT,
+            headers={"Content-Type": "application/json"},
+        )
+        # The body is read separately when a hook is registered: fail the
+        # first read after the headers are received
+        failures = []
+        read, aread, received = (
+            httpx.Response.read,
+            httpx.Response.aread,
+            events.RequestEvent.received,
+        )
+
+        def failing_received(event, response):
+            if not event.retries:
+                failures.append(httpx.ReadTimeout("timeout", request=None))
+            return received(event, response)
+
+        def failing_read(response):
+            if failures:
+                raise failures.pop()
+            return read(response)
+
+        async def failing_aread(response):
+            if failures:
+                raise failures.pop()
+            return await aread(response)
+
+        with mock.patch.object(
+            events.RequestEvent, "received", failing_received
+        ), mock.patch.object(httpx.Response, "read", failing_read), mock.patch.object(
+            httpx.Response, "aread", failing_aread
+        ), mock.patch.object(
+            client.time, "sleep"
+        ), mock.patch.object(
+            client.asyncio, "sleep", mock.AsyncMock()
+        ):
+            project = await gl_get_value(
+                hooked.projects.get(1, retry_transient_errors=True)
+            )
+
+        assert project.name == "project1"
+        (event,) = hooked.events
+        assert event.status_code == 200
+        assert event.retries == 1
+
+    @respx.mock
+    @pytest.mark.asyncio
+    async def test_network_error(self, hooked, gl_get_value):
+        respx.get(
+            "http://localhost/api/v4/projects/1",
+            content=httpx.ConnectError("failed", request=None),
+        )
+
+        with pytest.raises(httpx.ConnectError):
+            await gl_get_value(hooked.projects.get(1))
+
+        (event,) = hooked.events
+        assert event.status_code is None
+        assert isinstance(event.error, httpx.ConnectError)
+
+    @respx.mock
+    @pytest.mark.asyncio
+    async def test_remove(self, hooked, gl_get_value):
+        respx.get(
+            "http://localhost/api/v4/version",
+            content='{"version": "13.0.0"}',
+            headers={"Content-Type": "application/json"},
+        )
+        hooked.remove_request_hook(hooked.events.append)
+
+        await gl_get_value(hooked.http_get("/version"))
+
+        assert hooked.events == []
+        with pytest.raises(ValueError):
+            hooked.remove_request_hook(hooked.events.append)
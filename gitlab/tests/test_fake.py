@@ -0,0 +1,176 @@
+import asyncio
+
+import mock
+import pytest
+from gitlab import AsyncGitlab, Gitlab, client, exceptions
+from gitlab.fake import FakeGitlab
+
+
+@pytest.fixture
+def fake():
+    return FakeGitlab(private_token="token", projects=2, issues=25)
+
+
+@pytest.fixture
+def gl(gitlab_class, fake):
+    if gitlab_class is AsyncGitlab:
+        return fake.async_gitlab()
+    return fake.gitlab()
+
+
+class TestFakeGitlab:
+    @pytest.mark.asyncio
+    async def test_offset_pagination(self, gl, gl_get_value):
+        project = gl.projects.get(1, lazy=True)
+        issues = await gl_get_value(project.issues.list(as_list=False, per_page=10))
+        assert issues.total == 25
+        assert issues.total_pages == 3
+
+        issues = await gl_get_value(project.issues.list(all=True, per_page=10))
+        assert len(issues) == 25
+        assert len({issue.iid for issue in issues}) == 25
+
+        opened = await gl_get_value(project.issues.list(state="opened", all=True))
+        assert all(issue.state == "opened" for issue in opened)
+
+    @pytest.mark.asyncio
+    async def test_compact_all_from_page(self, gl, gl_get_value):
+        project = gl.projects.get(1, lazy=True)
+        issues = await gl_get_value(
+            project.issues.list(all=True, page=2, per_page=10, compact=True)
+        )
+        assert sorted(issue.iid for issue in issues) == list(range(1, 16))
+
+    @pytest.mark.asyncio
+    async def test_keyset_pagination(self, fake, gitlab_class, gl_get_value):
+        gl = (fake.async_gitlab if gitlab_class is AsyncGitlab else fake.gitlab)(
+            pagination="keyset", order_by="id"
+        )
+        project = gl.projects.get(1, lazy=True)
+        issues = await gl_get_value(project.issues.list(all=True, per_page=7))
+        assert len(issues) == 25
+        assert fake.request_count == 4
+
+    @pytest.mark.asyncio
+    async def test_objects(self, gl, gl_get_value):
+        project = await gl_get_value(gl.projects.get("group/project-2"))
+        assert project.id == 2
+        jobs = await gl_get_value(project.jobs.list())
+        artifacts = await gl_get_value(jobs[0].artifacts())
+        assert len(artifacts) == 64 * 1024
+
+        with pytest.raises(exceptions.GitlabGetError) as e:
+            await gl_get_value(project.issues.get(1000))
+        assert e.value.response_code == 404
+
+    @pytest.mark.asyncio
+    async def test_etag(self, fake, gitlab_class, gl_get_value):
+        gl = (fake.async_gitlab if gitlab_class is AsyncGitlab else fake.gitlab)(
+            cache=True
+        )
+        await gl_get_value(gl.projects.get(1))
+        await gl_get_value(gl.projects.get(1))
+        assert fake.statuses == {200: 1, 304: 1}
+
+    @pytest.mark.asyncio
+    async def test_authentication(self, fake, gitlab_class, gl_get_value):
+        gl = (fake.async_gitlab if gitlab_class is AsyncGitlab else fake.gitlab)(
+            private_token="wrong"
+        )
+        with pytest.raises(exceptions.GitlabAuthenticationError):
+            await gl_get_value(gl.projects.get(1))
+
+    @pytest.mark.asyncio
+    async def test_errors(self, fake, gl, gl_get_value):
+        fake.fail_next(503, count=2)
+        with mock.patch.object(client.time, "sleep"), mock.patch.object(
+            client.asyncio, "sleep", mock.AsyncMock()
+        ):
+            project = await gl_get_value(
+                gl.projects.get(1, retry_transient_errors=True)
+            )
+        assert project.id == 1
+        assert fake.statuses == {503: 2, 200: 1}
+
+    @pytest.mark.asyncio
+    async def test_rate_limit(self, gitlab_class, gl_get_value):
+        fake = FakeGitlab(rate_limit=2)
+        gl = fake.async_gitlab() if gitlab_class is AsyncGitlab else fake.gitlab()
+        await gl_get_value(gl.projects.get(1))
+        await gl_get_value(gl.projects.get(1))
+        with pytest.raises(exceptions.GitlabGetError) as e:
+            await gl_get_value(gl.projects.get(1, obey_rate_limit=False))
+        assert e.value.response_code == 429
+
+
+@pytest.mark.asyncio
+async def test_concurrency():
+    fake = FakeGitlab(latency=0.01)
+    agl = fake.async_gitlab(max_concurrency=3)
+    projects = await asyncio.gather(*(agl.projects.get(1) for _ in range(12)))
+    assert len(projects) == 12
+    assert fake.max_in_flight == 3
+
+
+def test_statistics(fake):
+    gl = fake.gitlab()
+    (project,) = gl.projects.list(per_page=1, statistics=True)
+    assert project.statistics["commit_count"] == project.id * 3
+    assert "statistics" not in gl.projects.get(1).attributes
+
+
+def test_serve():
+    fake = FakeGitlab(projects=1, issues=30)
+    server = fake.serve()
+    try:
+        gl = Gitlab(fake.url)
+        issues = gl.projects.get(1, lazy=True).issues.list(all=True)
+        assert len(issues) == 30
+        assert server.connections == 1
+    finally:
+        server.shutdown()
+        server.server_close()
+
+
+def test_serve_streamed_close():
+    fake = FakeGitlab(projects=1, issues=60)
+    server = fake.serve()
+    try:
+        gl = Gitlab(fake.url, max_connections=6, timeout=5)
+        for _ in range(4):
+            issues = gl.http_list(
+                "/projects/1/issues",
+                as_list=False,
+                per_page=10,
+                concurrency=4,
+                streamed=True,
+            )
+            next(issues)
+            issues.close()
+        assert len(gl.projects.get(1, lazy=True).issues.list(all=True)) == 60
+    finally:
+        server.shutdown()
+        server.server_close()
+
+
+@pytest.mark.asyncio
+async def test_serve_streamed_aclose():
+    fake = FakeGitlab(projects=1, issues=60)
+    server = fake.serve()
+    try:
+        agl = AsyncGitlab(fake.url, max_connections=6, timeout=5)
+        for _ in range(4):
+            issues = await agl.http_list(
+                "/projects/1/issues",
+                as_list=False,
+                per_page=10,
+                concurrency=4,
+                streamed=True,
+            )
+            await issues.__anext__()
+            await issues.aclose()
+        issues = await agl.projects.get(1, lazy=True).issues.list(all=True)
+        assert len(issues) == 60
+    finally:
+        server.shutdown()
+        server.server_close()
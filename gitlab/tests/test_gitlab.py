@@ -15,9 +15,11 @@
 #
 # You should have received a copy of the GNU Lesser General Public License
 # along with this program.  If not, see <http://www.gnu.org/licenses/>.
+import asyncio
 import json
 import os
 import re
+import sys
 import unittest
 
 import httpx
@@ -25,7 +27,9 @@ import pytest
 import respx
 from gitlab import AsyncGitlab, Gitlab
 from gitlab import exceptions as exc
+from gitlab.base import RESTManager
 from gitlab.client import _sanitize
+from gitlab.mixins import ListMixin
 from gitlab.types import GitlabList
 from gitlab.v4.objects import (
     CurrentUser,
@@ -148,6 +152,34 @@ class TestGitlabAuth:
         assert "Authorization" not in gl.headers
 
 
+class TestTransport:
+    def test_pool_limits(self, gitlab_class, monkeypatch):
+        calls = []
+        monkeypatch.setattr(
+            gitlab_class,
+            "_httpx_client_class",
+            staticmethod(lambda **kwargs: calls.append(kwargs)),
+        )
+
+        gitlab_class(
+            "http://localhost",
+            private_token="private_token",
+            max_connections=200,
+            max_keepalive_connections=50,
+        )
+
+        (kwargs,) = calls
+        assert kwargs["http2"] is False
+        assert kwargs["limits"].max_connections == 200
+        assert kwargs["limits"].max_keepalive_connections == 50
+
+    def test_http2_without_h2(self, gitlab_class, monkeypatch):
+        monkeypatch.setitem(sys.modules, "h2", None)
+
+        with pytest.raises(ImportError, match="http2"):
+            gitlab_class("http://localhost", private_token="token", http2=True)
+
+
 class TestGitlabList:
     @respx.mock
     @pytest.mark.asyncio
@@ -224,6 +256,222 @@ class TestGitlabList:
 
         assert isinstance(result, GitlabList)
 
+    @staticmethod
+    def _mock_pages(count):
+        routes = []
+        for page in range(1, count + 1):
+            headers = {
+                "content-type": "application/json",
+                "X-Page": str(page),
+                "X-Per-Page": "1",
+                "X-Total-Pages": str(count),
+                "X-Total": str(count),
+            }
+            if page < count:
+                headers["X-Next-Page"] = str(page + 1)
+                headers["Link"] = (
+                    "<http://localhost/api/v4/tests?per_page=1&page=%d>;"
+                    ' rel="next"' % (page + 1)
+                )
+            url = "http://localhost/api/v4/tests"
+            if page > 1:
+                url += "?per_page=1&page=%d" % page
+            routes.append(
+                respx.get(
+                    url, headers=headers, content=[{"id": page}], status_code=codes.OK,
+                )
+            )
+        return routes
+
+    @respx.mock
+    @pytest.mark.asyncio
+    async def test_all_concurrent_pages(self, gl, gl_get_value):
+        routes = self._mock_pages(5)
+
+        result = gl.http_list("/tests", all=True, concurrency=3)
+        result = await gl_get_value(result)
+
+        assert [item["id"] for item in result] == [1, 2, 3, 4, 5]
+        assert all(route.call_count == 1 for route in routes)
+
+    @respx.mock
+    @pytest.mark.asyncio
+    async def test_concurrent_pages_early_break(self, gl, gl_get_value, is_gl_sync):
+        self._mock_pages(6)
+
+        obj = gl.http_list("/tests", as_list=False, concurrency=3)
+        obj = await gl_get_value(obj)
+        pending = list(obj._pending)
+
+        if is_gl_sync:
+            for item in obj:
+                break
+            obj.close()
+        else:
+            async for item in obj:
+                break
+            await obj.aclose()
+            await asyncio.sleep(0)
+
+        assert item["id"] == 1
+        assert not obj._pending
+        assert not obj._page_urls
+        assert obj._executor is None
+        assert all(future.done() for future in pending)
+        if is_gl_sync:
+            assert list(obj) == []
+        else:
+            assert await obj.as_list() == []
+
+    @respx.mock
+    @pytest.mark.asyncio
+    async def test_concurrent_pages_error(self, gl, gl_get_value, is_gl_sync):
+        # Registered first to take precedence over the mocked page
+        respx.get(
+            "http://localhost/api/v4/tests?per_page=1&page=2",
+            content="Server error",
+            status_code=codes.INTERNAL_SERVER_ERROR,
+        )
+        self._mock_pages(5)
+
+        obj = gl.http_list("/tests", as_list=False, concurrency=3)
+        obj = await gl_get_value(obj)
+
+        with pytest.raises(exc.GitlabHttpError):
+            if is_gl_sync:
+                list(obj)
+            else:
+                await obj.as_list()
+        assert not obj._pending
+        assert obj._executor is None
+
+    @respx.mock
+    @pytest.mark.asyncio
+    async def test_generator_concurrent_pages(self, gl, gl_get_value, is_gl_sync):
+        self._mock_pages(4)
+
+        obj = gl.http_list("/tests", as_list=False, concurrency=2)
+        obj = await gl_get_value(obj)
+
+        assert len(obj._pending) == 2
+        if is_gl_sync:
+            items = list(obj)
+        else:
+            items = await obj.as_list()
+        assert [item["id"] for item in items] == [1, 2, 3, 4]
+        assert obj.current_page == 4
+
+    @respx.mock
+    @pytest.mark.asyncio
+    async def test_prefetch_keyset_pages(self, gl, gl_get_value, is_gl_sync):
+        for cursor, next_cursor in ((None, 1), (1, 2), (2, None)):
+            url = "http://localhost/api/v4/tests"
+            if cursor:
+                url += "?id_after=%d" % cursor
+            headers = {"content-type": "application/json"}
+            if next_cursor:
+                headers["Link"] = (
+                    '<http://localhost/api/v4/tests?id_after=%d>; rel="next"'
+                    % next_cursor
+                )
+            respx.get(
+                url,
+                headers=headers,
+                content=[{"id": (cursor or 0) + 1}],
+                status_code=codes.OK,
+            )
+
+        obj = gl.http_list("/tests", as_list=False, prefetch=True)
+        obj = await gl_get_value(obj)
+
+        # the second page is already requested
+        assert len(obj._pending) == 1
+        if is_gl_sync:
+            items = list(obj)
+        else:
+            items = await obj.as_list()
+        assert [item["id"] for item in items] == [1, 2, 3]
+        assert not obj._pending
+
+    @respx.mock
+    @pytest.mark.asyncio
+    async def test_streamed_pages(self, gl, gl_get_value, is_gl_sync):
+        routes = self._mock_pages(3)
+
+        obj = gl.http_list("/tests", as_list=False, streamed=True)
+        obj = await gl_get_value(obj)
+
+        # nothing is decoded before iterating
+        assert obj._data == []
+        assert obj.total_pages == 3
+        if is_gl_sync:
+            items = list(obj)
+        else:
+            items = await obj.as_list()
+        assert [item["id"] for item in items] == [1, 2, 3]
+        assert obj.current_page == 3
+        assert obj._stream is None
+        assert all(route.call_count == 1 for route in routes)
+
+    @respx.mock
+    @pytest.mark.asyncio
+    async def test_streamed_concurrent_pages(self, gl, gl_get_value):
+        self._mock_pages(4)
+
+        result = gl.http_list("/tests", all=True, streamed=True, concurrency=2)
+        result = await gl_get_value(result)
+
+        assert [item["id"] for item in result] == [1, 2, 3, 4]
+
+    @respx.mock
+    @pytest.mark.asyncio
+    async def test_streamed_parsing_error(self, gl, gl_get_value, is_gl_sync):
+        respx.get(
+            "http://localhost/api/v4/tests",
+            headers={"content-type": "application/json"},
+            content='[{"id": 1}, {"id"',
+            status_code=codes.OK,
+        )
+
+        obj = await gl_get_value(gl.http_list("/tests", as_list=False, streamed=True))
+        with pytest.raises(exc.GitlabParsingError):
+            if is_gl_sync:
+                list(obj)
+            else:
+                await obj.as_list()
+
+    @respx.mock
+    @pytest.mark.asyncio
+    async def test_streamed_http_error(self, gl, gl_get_value):
+        respx.get(
+            "http://localhost/api/v4/tests",
+            headers={"content-type": "application/json"},
+            content='{"message": "404 Not Found"}',
+            status_code=codes.NOT_FOUND,
+        )
+
+        with pytest.raises(exc.GitlabHttpError) as e:
+            await gl_get_value(gl.http_list("/tests", as_list=False, streamed=True))
+        assert e.value.response_code == 404
+        assert e.value.error_message == "404 Not Found"
+
+    @respx.mock
+    @pytest.mark.asyncio
+    async def test_list_all_compact(self, gl, gl_get_value):
+        class M(ListMixin, RESTManager):
+            _path = "/tests"
+            _obj_cls = Project
+
+        self._mock_pages(3)
+
+        result = M(gl).list(all=True, compact=True)
+        result = await gl_get_value(result)
+
+        assert isinstance(result, list)
+        assert [record.id for record in result] == [1, 2, 3]
+        assert isinstance(result[0], Project._get_record_class())
+        assert isinstance(result[0].to_object(), Project)
+
 
 class TestGitlabHttpMethods:
     def test_build_url(self, gl):
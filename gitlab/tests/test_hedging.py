@@ -0,0 +1,156 @@
+import asyncio
+
+import httpx
+import pytest
+from gitlab import AsyncGitlab, hedging
+
+
+class FakeClient:
+    """Async client answering the n-th request after delays[n] seconds."""
+
+    def __init__(self, *delays, fail=()):
+        self.delays = list(delays)
+        self.fail = fail
+        self.requests = []
+        self.cancelled = []
+        self.closed = []
+
+    async def send(self, request, **kwargs):
+        index = len(self.requests)
+        self.requests.append(request)
+        try:
+            await asyncio.sleep(self.delays[index])
+        except asyncio.CancelledError:
+            self.cancelled.append(index)
+            raise
+        if index in self.fail:
+            raise httpx.ConnectError("failed", request=request)
+        response = httpx.Response(
+            200,
+            headers=[("Content-Type", "application/json")],
+            content=b'{"id": %d}' % index,
+            request=request,
+        )
+        response.aclose = lambda: self.closed.append(index) or asyncio.sleep(0)
+        return response
+
+
+def request(method="GET"):
+    return httpx.Request(method, "http://localhost/api/v4/projects/1")
+
+
+class TestHedgePolicy:
+    def test_delay(self):
+        policy = hedging.HedgePolicy(percentile=90, initial_delay=0.5, min_samples=10)
+        assert policy.delay() == 0.5
+
+        for i in range(1, 11):
+            policy.record(i / 10)
+        assert policy.delay() == 1.0
+        policy.record(0.001)
+        assert policy.delay() == 0.9
+
+    def test_cap(self):
+        policy = hedging.HedgePolicy(max_per_second=2)
+        assert [policy.allow() for _ in range(3)] == [True, True, False]
+        assert policy.stats["throttled"] == 1
+
+    def test_invalid_percentile(self):
+        with pytest.raises(ValueError):
+            hedging.HedgePolicy(percentile=100)
+
+
+class TestSend:
+    @pytest.mark.asyncio
+    async def test_fast_response(self):
+        client = FakeClient(0)
+        policy = hedging.HedgePolicy(initial_delay=0.05)
+
+        response = await hedging.send(client, policy, request())
+
+        assert response.json() == {"id": 0}
+        assert len(client.requests) == 1
+        assert policy.stats["hedged"] == 0
+
+    @pytest.mark.asyncio
+    async def test_hedge_wins(self):
+        client = FakeClient(1, 0)
+        policy = hedging.HedgePolicy(initial_delay=0.01)
+
+        response = await hedging.send(client, policy, request())
+
+        assert response.json() == {"id": 1}
+        assert client.cancelled == [0]
+        assert client.requests[1].url == client.requests[0].url
+        stats = policy.stats
+        assert (stats["requests"], stats["hedged"], stats["wins"]) == (1, 1, 1)
+        assert stats["hedge_rate"] == 1.0
+
+    @pytest.mark.asyncio
+    async def test_original_wins(self):
+        client = FakeClient(0.03, 1)
+        policy = hedging.HedgePolicy(initial_delay=0.01)
+
+        response = await hedging.send(client, policy, request())
+
+        assert response.json() == {"id": 0}
+        assert client.cancelled == [1]
+        assert policy.wins == 0
+
+    @pytest.mark.asyncio
+    async def test_failed_original(self):
+        client = FakeClient(0.02, 0.03, fail=(0,))
+        policy = hedging.HedgePolicy(initial_delay=0.01)
+
+        response = await hedging.send(client, policy, request())
+
+        assert response.json() == {"id": 1}
+
+    @pytest.mark.asyncio
+    async def test_all_failed(self):
+        client = FakeClient(0.02, 0.01, fail=(0, 1))
+        policy = hedging.HedgePolicy(initial_delay=0.01)
+
+        with pytest.raises(httpx.ConnectError):
+            await hedging.send(client, policy, request())
+
+    @pytest.mark.asyncio
+    async def test_throttled(self):
+        client = FakeClient(0.02, 0.02, 0.02)
+        policy = hedging.HedgePolicy(initial_delay=0.01, max_per_second=1)
+
+        await hedging.send(client, policy, request())
+        await hedging.send(client, policy, request())
+
+        assert len(client.requests) == 3
+        assert policy.throttled == 1
+
+
+class TestHedgedClient:
+    @pytest.mark.asyncio
+    async def test_get(self):
+        gl = AsyncGitlab(
+            "http://localhost",
+            private_token="token",
+            hedging=hedging.HedgePolicy(initial_delay=0.01),
+        )
+        gl.client = FakeClient(1, 0)
+
+        project = await gl.projects.get(1)
+
+        assert project.id == 1
+        assert gl.hedging.wins == 1
+
+    @pytest.mark.asyncio
+    async def test_post_not_hedged(self):
+        gl = AsyncGitlab(
+            "http://localhost",
+            private_token="token",
+            hedging=hedging.HedgePolicy(initial_delay=0.01),
+        )
+        gl.client = FakeClient(0.05)
+
+        await gl.http_post("/projects", post_data={"name": "project"})
+
+        assert len(gl.client.requests) == 1
+        assert gl.hedging.requests == 0
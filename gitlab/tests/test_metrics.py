@@ -0,0 +1,151 @@
+import random
+import threading
+import urllib.request
+
+import pytest
+import respx
+from gitlab import events, metrics
+from gitlab.v4.objects import ProjectBranch
+
+JSON = {"Content-Type": "application/json"}
+
+
+def event(method="GET", path="/projects/:id", status_code=200, elapsed=0.1):
+    event = events.RequestEvent(
+        method, events.httpx.URL("http://localhost/api/v4/x"), "http://localhost"
+    )
+    event.url_template = path
+    event.status_code = status_code
+    event.ttfb = elapsed / 2
+    event.bytes_received = 100
+    event.elapsed = elapsed
+    return event
+
+
+class TestLatencyHistogram:
+    def test_percentiles(self):
+        histogram = metrics.LatencyHistogram()
+        values = sorted(random.expovariate(10) for _ in range(10000))
+        for value in values:
+            histogram.record(value)
+
+        for percentile in (50, 90, 99):
+            expected = values[int(len(values) * percentile / 100) - 1]
+            assert histogram.percentile(percentile) == pytest.approx(expected, rel=0.02)
+        assert histogram.percentile(100) == values[-1]
+
+    def test_buckets(self):
+        histogram = metrics.LatencyHistogram(buckets=(0.1, 1))
+        for value in (0, 0.1, 0.5, 2):
+            histogram.record(value)
+        assert histogram.cumulative_buckets() == [(0.1, 2), (1, 3), (float("inf"), 4)]
+        assert histogram.percentile(25) == 0.0
+
+    def test_empty(self):
+        assert metrics.LatencyHistogram().percentile(50) is None
+
+
+class TestUrlTemplate:
+    def test_manager_path(self, gl):
+        manager = gl.projects.get(1, lazy=True).jobs
+        assert (
+            events.url_template("/projects/1/jobs/5/trace", manager)
+            == "/projects/:id/jobs/:id/trace"
+        )
+
+    def test_object(self, gl):
+        branches = gl.projects.get(1, lazy=True).branches
+        branch = ProjectBranch(branches, {"name": "main"})
+        assert (
+            events.url_template("/projects/1/repository/branches/main/protect", branch)
+            == "/projects/:id/repository/branches/:id/protect"
+        )
+
+    def test_other_path(self, gl):
+        assert events.url_template("/users/3", gl.projects) == "/users/:id"
+
+
+class TestMetricsCollector:
+    def test_render(self):
+        collector = metrics.MetricsCollector(buckets=(0.5,))
+        collector(event())
+        collector(event(status_code=404, elapsed=1))
+        collector(event(path='/a"b', status_code=None))
+
+        text = collector.render()
+
+        assert "# TYPE gitlab_client_requests_total counter" in text
+        assert (
+            'gitlab_client_requests_total{method="GET",path="/projects/:id",'
+            'status="200"} 1' in text
+        )
+        assert (
+            'gitlab_client_request_duration_seconds_bucket{method="GET",'
+            'path="/projects/:id",le="0.5"} 1' in text
+        )
+        assert (
+            'gitlab_client_request_duration_seconds_bucket{method="GET",'
+            'path="/projects/:id",le="+Inf"} 2' in text
+        )
+        assert (
+            'gitlab_client_response_bytes_total{method="GET",path="/projects/:id"}'
+            " 200" in text
+        )
+        assert 'path="/a\\"b",status="error"' in text
+
+    def test_threads(self):
+        collector = metrics.MetricsCollector()
+
+        def record():
+            for _ in range(1000):
+                collector(event())
+
+        threads = [threading.Thread(target=record) for _ in range(8)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        (summary,) = collector.summary().values()
+        assert summary["count"] == 8000
+        assert summary["statuses"] == {"200": 8000}
+
+    def test_write(self, tmp_path):
+        collector = metrics.MetricsCollector()
+        collector(event())
+        path = tmp_path / "gitlab.prom"
+        collector.write(str(path))
+        assert path.read_text() == collector.render()
+
+    def test_serve(self):
+        collector = metrics.MetricsCollector()
+        collector(event())
+        server = collector.serve(port=0)
+        try:
+            url = "http://127.0.0.1:%d/metrics" % server.server_address[1]
+            with urllib.request.urlopen(url) as response:
+                assert response.read().decode() == collector.render()
+        finally:
+            server.shutdown()
+            server.server_close()
+
+
+class TestClientMetrics:
+    @respx.mock
+    @pytest.mark.asyncio
+    async def test_requests(self, gitlab_class, gl_get_value):
+        gl = gitlab_class("http://localhost", private_token="token", metrics=True)
+        respx.get(
+            "http://localhost/api/v4/projects/1",
+            content='{"id": 1, "name": "project1"}',
+            headers=JSON,
+        )
+
+        await gl_get_value(gl.projects.get(1))
+        await gl_get_value(gl.projects.get(1))
+
+        summary = gl.metrics.summary()[("GET", "/projects/:id")]
+        assert summary["count"] == 2
+        assert summary["statuses"] == {"200": 2}
+        assert summary["bytes_received"] == 2 * len('{"id": 1, "name": "project1"}')
+        assert gl._request_hooks == (gl.metrics,)
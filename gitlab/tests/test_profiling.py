@@ -0,0 +1,83 @@
+import threading
+
+import pytest
+import respx
+from gitlab import AsyncGitlab, Gitlab
+
+JSON = {"Content-Type": "application/json"}
+
+
+def mock_projects():
+    respx.get(
+        "http://localhost/api/v4/projects",
+        content='[{"id": 1, "name": "p1"}, {"id": 2, "name": "p2"}]',
+        headers=JSON,
+    )
+    for i in range(1, 7):
+        respx.get(
+            "http://localhost/api/v4/projects/%d" % i,
+            content='{"id": %d, "name": "p%d"}' % (i, i),
+            headers=JSON,
+        )
+
+
+class TestProfile:
+    @respx.mock
+    def test_sync(self):
+        gl = Gitlab("http://localhost", private_token="token")
+        mock_projects()
+        gl.projects.get(1)
+
+        with gl.profile() as p:
+            gl.projects.list()
+            for i in range(1, 7):
+                gl.projects.get(i)
+            # Not recorded: made by another thread
+            thread = threading.Thread(target=gl.projects.get, args=(1,))
+            thread.start()
+            thread.join()
+
+        summary = p.summary()
+        assert summary["requests"] == 7
+        assert summary["endpoints"][("GET", "/projects")]["count"] == 1
+        assert summary["endpoints"][("GET", "/projects/:id")]["count"] == 6
+        assert summary["objects"] == {"Project": 8}
+        assert summary["decode_time"] > 0
+        assert 0 < summary["http_time"] <= summary["wall_time"]
+        (suspect,) = summary["n_plus_one"]
+        assert suspect == {
+            "endpoint": "GET /projects/:id",
+            "manager": "ProjectManager",
+            "requests": 6,
+            "objects": 6,
+        }
+        assert gl._request_hooks == ()
+
+        report = p.report()
+        assert "Requests: 7 (0 errors, 0 retries)" in report
+        assert "N+1: GET /projects/:id called 6 times for 6 objects" in report
+
+    @respx.mock
+    @pytest.mark.asyncio
+    async def test_async(self):
+        gl = AsyncGitlab("http://localhost", private_token="token")
+        mock_projects()
+
+        async with gl.profile(n_plus_one_threshold=10) as p:
+            await gl.gather(gl.projects.get(i) for i in range(1, 7))
+            await gl.projects.list()
+
+        summary = p.summary()
+        assert summary["requests"] == 7
+        assert summary["objects"] == {"Project": 8}
+        assert summary["n_plus_one"] == []
+
+    @respx.mock
+    def test_executor(self):
+        gl = Gitlab("http://localhost", private_token="token")
+        mock_projects()
+
+        with gl.profile() as p:
+            gl.projects.map("get", [1, 2, 3], limit=3)
+
+        assert p.summary()["requests"] == 3
@@ -0,0 +1,117 @@
+import pickle
+
+import mock
+import pytest
+import respx
+from gitlab import ratelimit
+
+
+def headers(remaining, reset, limit=600):
+    return {
+        "RateLimit-Limit": str(limit),
+        "RateLimit-Remaining": str(remaining),
+        "RateLimit-Reset": str(reset),
+    }
+
+
+class TestRateLimiter:
+    def test_not_paced_without_headers(self, clock):
+        limiter = ratelimit.RateLimiter(burst=2)
+        limiter.update({})
+        assert [limiter.reserve() for _ in range(5)] == [0.0] * 5
+        assert limiter.budget["rate"] is None
+
+    def test_pacing(self, clock):
+        limiter = ratelimit.RateLimiter(burst=3)
+        limiter.update(headers(10, int(clock.time()) + 10))
+
+        assert [limiter.reserve() for _ in range(3)] == [0.0] * 3
+        assert limiter.reserve() == pytest.approx(1.0)
+        assert limiter.reserve() == pytest.approx(2.0)
+        clock.now += 2
+        assert limiter.reserve() == pytest.approx(1.0)
+        assert limiter.waits == 3
+        assert limiter.waited == pytest.approx(4.0)
+
+    def test_reset_in_seconds(self, clock):
+        limiter = ratelimit.RateLimiter()
+        limiter.update(headers(30, 60))
+        assert limiter.budget["rate"] == pytest.approx(0.5)
+        assert limiter.budget["reset"] == pytest.approx(60)
+
+    def test_exhausted(self, clock):
+        limiter = ratelimit.RateLimiter()
+        limiter.update(headers(0, 5, limit=600))
+
+        assert limiter.reserve() == pytest.approx(5.0)
+        clock.now += 5
+        assert limiter.reserve() == 0.0
+        budget = limiter.budget
+        assert budget["remaining"] == 600
+        assert budget["rate"] is None
+
+    def test_margin(self, clock):
+        limiter = ratelimit.RateLimiter(burst=10, margin=8)
+        limiter.update(headers(10, 10))
+        assert limiter.budget["tokens"] == 2
+        assert limiter.budget["rate"] == pytest.approx(0.2)
+
+    def test_out_of_order_responses(self, clock):
+        limiter = ratelimit.RateLimiter()
+        limiter.update(headers(100, 30))
+        limiter.update(headers(102, 30))
+        assert limiter.remaining == 100
+
+        # A new window
+        limiter.update(headers(599, 60))
+        assert limiter.remaining == 599
+
+    def test_pickle(self, clock):
+        limiter = ratelimit.RateLimiter(burst=4)
+        limiter.update(headers(10, 10))
+        unpickled = pickle.loads(pickle.dumps(limiter))
+        assert unpickled.remaining == 10
+        assert unpickled.reserve() == 0.0
+
+
+class TestRateLimitedRequests:
+    @respx.mock
+    @pytest.mark.asyncio
+    async def test_budget(self, gitlab_class, gl_get_value):
+        gl = gitlab_class("http://localhost", private_token="token", rate_limit=True)
+        respx.get(
+            "http://localhost/api/v4/version",
+            content='{"version": "13.0.0"}',
+            headers=dict(headers(512, 40), **{"Content-Type": "application/json"}),
+        )
+
+        await gl_get_value(gl.http_get("/version"))
+
+        budget = gl.rate_limiter.budget
+        assert budget["limit"] == 600
+        assert budget["remaining"] == 512
+        assert 0 < budget["reset"] <= 40
+
+    @respx.mock
+    @pytest.mark.asyncio
+    async def test_wait_before_sending(self, gitlab_class, gl_get_value):
+        gl = gitlab_class("http://localhost", private_token="token", rate_limit=True)
+        respx.get(
+            "http://localhost/api/v4/version",
+            content='{"version": "13.0.0"}',
+            headers=dict(headers(0, 2), **{"Content-Type": "application/json"}),
+        )
+        await gl_get_value(gl.http_get("/version"))
+
+        with mock.patch.object(ratelimit.time, "sleep") as sleep, mock.patch.object(
+            ratelimit.asyncio, "sleep", mock.AsyncMock()
+        ) as asleep:
+            await gl_get_value(gl.http_get("/version"))
+
+        (delay,) = (sleep.call_args or asleep.call_args)[0]
+        assert 0 < delay <= 2
+        assert gl.rate_limiter.waits == 1
+
+    def test_disabled_by_default(self, gitlab_class):
+        gl = gitlab_class("http://localhost", private_token="token")
+        assert gl.rate_limiter is None
@@ -0,0 +1,174 @@
+import email.utils
+import pickle
+import re
+
+import httpx
+import mock
+import pytest
+import respx
+from gitlab import client, exceptions, retry
+
+URL = "http://localhost/api/v4/projects/1"
+# The retry arguments of the calls are sent in the query string as well
+URL_RE = re.compile(re.escape(URL) + r"(\?.*)?$")
+
+
+@pytest.fixture
+def sleeps():
+    with mock.patch.object(client.time, "sleep") as sleep, mock.patch.object(
+        client.asyncio, "sleep", mock.AsyncMock()
+    ) as asleep:
+        yield lambda: [c[0][0] for c in sleep.call_args_list + asleep.call_args_list]
+
+
+def failing(count, error=httpx.ConnectError):
+    """Content raising ``error`` for the first ``count`` requests."""
+    calls = []
+
+    def content(request):
+        calls.append(request)
+        if len(calls) <= count:
+            raise error("failed", request=request)
+        return '{"id": 1}'
+
+    content.calls = calls
+    return content
+
+
+class TestParseRetryAfter:
+    def test_seconds(self):
+        assert retry.parse_retry_after("120") == 120.0
+
+    def test_http_date(self):
+        value = email.utils.formatdate(retry.time.time() + 30, usegmt=True)
+        assert 28 < retry.parse_retry_after(value) <= 30
+
+    def test_past_date(self):
+        assert retry.parse_retry_after("Wed, 21 Oct 2015 07:28:00 GMT") == 0.0
+
+    def test_invalid(self):
+        assert retry.parse_retry_after("soon") is None
+
+
+class TestRetryPolicy:
+    def test_jittered_backoff(self):
+        policy = retry.RetryPolicy(backoff_factor=0.5, max_backoff=3)
+        with mock.patch.object(retry.random, "uniform", lambda a, b: b):
+            assert [policy.backoff(i) for i in range(5)] == [0.5, 1, 2, 3, 3]
+        assert all(0 <= policy.backoff(2) <= 2 for _ in range(20))
+
+    def test_retry_after(self):
+        policy = retry.RetryPolicy()
+        response = httpx.Response(429, headers={"Retry-After": "7"})
+        assert policy.get_delay(0, response) == 7.0
+
+    def test_call_arguments_override_policy(self):
+        policy = retry.RetryPolicy(max_retries=1, retry_transient_errors=True)
+        attempt = policy.start("get", httpx.URL(URL), {"max_retries": 0})
+        assert attempt.on_response(httpx.Response(503)) is None
+        assert attempt.retry_transient_errors
+
+    def test_network_errors_of_idempotent_methods(self):
+        policy = retry.RetryPolicy(retry_transient_errors=True)
+        error = httpx.ConnectError("failed", request=httpx.Request("GET", URL))
+        assert policy.start("PUT", httpx.URL(URL), {}).on_error(error) is not None
+        assert policy.start("POST", httpx.URL(URL), {}).on_error(error) is None
+
+
+class TestCircuitBreaker:
+    def test_open_after_failures(self, clock):
+        breaker = retry.CircuitBreaker(failure_threshold=2, reset_timeout=10)
+        breaker.record_failure("localhost")
+        breaker.before_request("localhost")
+        breaker.record_failure("localhost")
+        assert breaker.state("localhost") == "open"
+        with pytest.raises(exceptions.GitlabCircuitOpenError):
+            breaker.before_request("localhost")
+        breaker.before_request("other")
+
+    def test_probe(self, clock):
+        breaker = retry.CircuitBreaker(failure_threshold=1, reset_timeout=10)
+        breaker.record_failure("localhost")
+        clock.now += 10
+        assert breaker.state("localhost") == "half-open"
+
+        # One request probes the host, the others still fail fast
+        breaker.before_request("localhost")
+        with pytest.raises(exceptions.GitlabCircuitOpenError):
+            breaker.before_request("localhost")
+        breaker.record_failure("localhost")
+        assert breaker.state("localhost") == "open"
+
+        clock.now += 10
+        breaker.before_request("localhost")
+        breaker.record_success("localhost")
+        assert breaker.state("localhost") == "closed"
+
+    def test_pickle(self, clock):
+        breaker = retry.CircuitBreaker(failure_threshold=1)
+        breaker.record_failure("localhost")
+        unpickled = pickle.loads(pickle.dumps(breaker))
+        assert unpickled.state("localhost") == "open"
+
+
+class TestRetriedRequests:
+    @respx.mock
+    @pytest.mark.asyncio
+    async def test_network_error_retried(self, gitlab_class, gl_get_value, sleeps):
+        gl = gitlab_class("http://localhost", private_token="token")
+        content = failing(2)
+        respx.get(URL_RE, content=content, headers={"Content-Type": "application/json"})
+
+        result = await gl_get_value(
+            gl.http_get("/projects/1", retry_transient_errors=True)
+        )
+
+        assert result == {"id": 1}
+        assert len(content.calls) == 3
+        assert len(sleeps()) == 2
+        assert gl.retry_policy.retries == 2
+
+    @respx.mock
+    @pytest.mark.asyncio
+    async def test_network_error_not_retried(self, gitlab_class, gl_get_value):
+        gl = gitlab_class("http://localhost", private_token="token")
+        respx.get(URL_RE, content=failing(1, httpx.ReadTimeout))
+        respx.post(URL_RE, content=failing(1))
+
+        with pytest.raises(httpx.ReadTimeout):
+            await gl_get_value(gl.http_get("/projects/1"))
+        with pytest.raises(httpx.ConnectError):
+            await gl_get_value(gl.http_post("/projects/1", retry_transient_errors=True))
+
+    @respx.mock
+    @pytest.mark.asyncio
+    async def test_retry_after_http_date(self, gitlab_class, gl_get_value, sleeps):
+        gl = gitlab_class("http://localhost", private_token="token")
+        date = email.utils.formatdate(retry.time.time() + 5, usegmt=True)
+        respx.get(URL_RE, status_code=429, headers={"Retry-After": date})
+
+        with pytest.raises(exceptions.GitlabHttpError):
+            await gl_get_value(gl.http_get("/projects/1", max_retries=1))
+
+        (delay,) = sleeps()
+        assert 3 < delay <= 5
+
+    @respx.mock
+    @pytest.mark.asyncio
+    async def test_circuit_breaker(self, gitlab_class, gl_get_value, sleeps):
+        breaker = retry.CircuitBreaker(failure_threshold=3)
+        policy = retry.RetryPolicy(retry_transient_errors=True, circuit_breaker=breaker)
+        gl = gitlab_class(
+            "http://localhost", private_token="token", retry_policy=policy
+        )
+        content = failing(10)
+        respx.get(URL_RE, content=content)
+
+        with pytest.raises(exceptions.GitlabCircuitOpenError):
+            await gl_get_value(gl.http_get("/projects/1"))
+        assert len(content.calls) == 3
+
+        # Fail fast while the circuit is open
+        with pytest.raises(exceptions.GitlabCircuitOpenError):
+            await gl_get_value(gl.http_get("/projects/1"))
+        assert len(content.calls) == 3
@@ -0,0 +1,83 @@
+import json
+import logging
+
+import pytest
+import respx
+from gitlab import events, slowlog
+
+JSON = {"Content-Type": "application/json"}
+
+
+def event(elapsed=0.1, bytes_received=100):
+    event = events.RequestEvent(
+        "GET",
+        events.httpx.URL(
+            "http://localhost/api/v4/projects/1/jobs?private_token=secret&page=2"
+        ),
+        "http://localhost/api/v4",
+    )
+    event.status_code = 200
+    event.bytes_received = bytes_received
+    event.elapsed = elapsed
+    return event
+
+
+def records(caplog):
+    return [json.loads(r.getMessage()) for r in caplog.records]
+
+
+class TestSlowRequestLogger:
+    def test_thresholds(self, caplog):
+        logger = slowlog.SlowRequestLogger(latency_threshold=1, size_threshold=1000)
+        with caplog.at_level(logging.INFO, logger="gitlab.slowlog"):
+            logger(event())
+            logger(event(elapsed=2))
+            logger(event(bytes_received=5000))
+
+        slow, large = records(caplog)
+        assert slow["reason"] == "slow"
+        assert slow["endpoint"] == "/projects/:id/jobs"
+        assert slow["query"] == ["page", "private_token"]
+        assert slow["status"] == 200
+        assert slow["duration"] == 2
+        assert large["reason"] == "large"
+        assert "secret" not in caplog.text
+
+    def test_sample(self, caplog):
+        logger = slowlog.SlowRequestLogger(latency_threshold=None, sample_rate=1)
+        with caplog.at_level(logging.INFO, logger="gitlab.slowlog"):
+            logger(event())
+        (record,) = records(caplog)
+        assert record["reason"] == "sampled"
+
+    def test_disabled_logger(self, caplog):
+        logger = slowlog.SlowRequestLogger(latency_threshold=0)
+        with caplog.at_level(logging.ERROR, logger="gitlab.slowlog"):
+            logger(event())
+        assert caplog.records == []
+
+
+class TestClientSlowLog:
+    @respx.mock
+    @pytest.mark.asyncio
+    async def test_requests(self, gitlab_class, gl_get_value, caplog):
+        gl = gitlab_class(
+            "http://localhost",
+            private_token="secret-token",
+            slow_log=slowlog.SlowRequestLogger(latency_threshold=0),
+        )
+        respx.get(
+            "http://localhost/api/v4/projects/1",
+            content='{"id": 1, "name": "project1"}',
+            headers=JSON,
+        )
+
+        with caplog.at_level(logging.INFO, logger="gitlab.slowlog"):
+            await gl_get_value(gl.projects.get(1))
+
+        (record,) = records(caplog)
+        assert record["method"] == "GET"
+        assert record["endpoint"] == "/projects/:id"
+        assert record["manager"] == "ProjectManager"
+        assert record["retries"] == 0
+        assert "secret-token" not in caplog.text
@@ -15,6 +15,14 @@
 # You should have received a copy of the GNU Lesser General Public License
 # along with this program.  If not, see <http://www.gnu.org/licenses/>.
 
+import asyncio
+import collections
+import concurrent.futures
+import contextvars
+from urllib.parse import parse_qsl, urlencode, urlsplit, urlunsplit
+
+from . import codec, profiling
+from .concurrency import get_priority
 from .exceptions import GitlabParsingError
 
 
@@ -58,23 +66,64 @@ class ImageAttribute(FileAttribute):
         return "%s.png" % attr_name if attr_name else "image.png"
 
 
+def _close_page(future):
+    if not future.cancelled() and future.exception() is None:
+        future.result().close()
+
+
 class GitlabList:
     """Generator representing a list of remote objects.
 
     The object handles the links returned by a query to the API, and will call
     the API again when needed.
+
+    If ``concurrency`` is greater than 1 and the server announces the number
+    of pages (``X-Total-Pages``), the remaining pages are requested in
+    parallel (``concurrency`` requests at most in flight) and consumed in
+    server order.
+
+    If ``prefetch`` is True, the next page is requested in the background
+    while the current one is consumed. This follows the ``next`` links, so it
+    also works with keyset pagination, and never holds more than two pages.
+
+    If ``streamed`` is True, the body of each page is read as a stream and
+    its items are decoded one at a time while iterating, instead of
+    decoding the whole page when it is received.
     """
 
     @classmethod
-    def create(cls, gl, url, query_data, get_next=True, **kwargs):
+    def create(
+        cls,
+        gl,
+        url,
+        query_data,
+        get_next=True,
+        concurrency=None,
+        prefetch=False,
+        streamed=False,
+        **kwargs
+    ):
         self = GitlabList()
         self._gl = gl
+        self._init_pending(concurrency, prefetch, streamed)
         self._query(url, query_data, **kwargs)
         self._get_next = get_next
+        self._prepare_pages()
+        self._schedule_pages(self._submit)
         return self
 
     @classmethod
-    async def acreate(cls, gl, url, query_data, get_next=True, **kwargs):
+    async def acreate(
+        cls,
+        gl,
+        url,
+        query_data,
+        get_next=True,
+        concurrency=None,
+        prefetch=False,
+        streamed=False,
+        **kwargs
+    ):
         """Create GitlabList with data
 
         Create is made in factory way since it's cleaner to use such way
@@ -82,10 +131,33 @@ class GitlabList:
         """
         self = GitlabList()
         self._gl = gl
+        self._init_pending(concurrency, prefetch, streamed)
+        # The following pages are requested with the priority of the first
+        if kwargs.get("priority") is None:
+            kwargs["priority"] = get_priority()
+        self._priority = kwargs["priority"]
         await self._aquery(url, query_data, **kwargs)
         self._get_next = get_next
+        self._prepare_pages()
+        self._schedule_pages(self._asubmit)
         return self
 
+    def _init_pending(self, concurrency, prefetch=False, streamed=False):
+        self._concurrency = concurrency or 1
+        self._prefetch = prefetch
+        self._streamed = streamed
+        # Body of the current page and its decoder, in streamed mode
+        self._stream = None
+        self._chunks = None
+        self._decoder = None
+        # URLs of the pages not requested yet, and the requests in flight (in
+        # server order)
+        self._page_urls = collections.deque()
+        self._pending = collections.deque()
+        self._executor = None
+        # Priority of the page requests (AsyncGitlab only)
+        self._priority = None
+
     def _process_query_result(self, result):
         try:
             self._next_url = result.links["next"]["url"]
@@ -97,26 +169,200 @@ class GitlabList:
         self._per_page = result.headers.get("X-Per-Page")
         self._total_pages = result.headers.get("X-Total-Pages")
         self._total = result.headers.get("X-Total")
+        self._current = 0
+
+        if self._streamed:
+            # The items are decoded while iterating, see _read_items()
+            self._data = []
+            self._stream = result
+            self._chunks = None
+            self._decoder = codec.JSONArrayDecoder()
+            return
 
         try:
-            self._data = result.json()
+            self._data = profiling.decode(self._gl.codec.loads, result.content)
         except Exception:
             raise GitlabParsingError(error_message="Failed to parse the server message")
 
+    def _decode_chunk(self, chunk):
+        try:
+            if chunk is None:
+                self._stream = self._chunks = None
+                self._data = profiling.decode(self._decoder.close)
+            else:
+                self._data = profiling.decode(self._decoder.feed, chunk)
+        except ValueError:
+            raise GitlabParsingError(error_message="Failed to parse the server message")
         self._current = 0
 
+    def _read_items(self):
+        """Decode the next items of a streamed page, False at its end."""
+        while self._stream is not None:
+            if self._chunks is None:
+                self._chunks = self._stream.iter_bytes()
+            self._decode_chunk(next(self._chunks, None))
+            if self._data:
+                return True
+        return False
+
+    async def _aread_items(self):
+        while self._stream is not None:
+            if self._chunks is None:
+                self._chunks = self._stream.aiter_bytes()
+            try:
+                chunk = await self._chunks.__anext__()
+            except StopAsyncIteration:
+                chunk = None
+            self._decode_chunk(chunk)
+            if self._data:
+                return True
+        return False
+
     async def _aquery(self, url, query_data=None, **kwargs):
         query_data = query_data or {}
         result = await self._gl.http_request(
-            "get", url, query_data=query_data, **kwargs
+            "get", url, query_data=query_data, streamed=self._streamed, **kwargs
         )
         self._process_query_result(result)
 
     def _query(self, url, query_data=None, **kwargs):
         query_data = query_data or {}
-        result = self._gl.http_request("get", url, query_data=query_data, **kwargs)
+        result = self._gl.http_request(
+            "get", url, query_data=query_data, streamed=self._streamed, **kwargs
+        )
         return self._process_query_result(result)
 
+    def _prepare_pages(self):
+        """Compute the URLs of the remaining pages for parallel fetching.
+
+        This is only possible with offset pagination, when the server tells
+        us how many pages there are. Otherwise we keep following the
+        ``next`` links.
+        """
+        if (
+            self._concurrency < 2
+            or self._get_next is not True
+            or not self._next_url
+            or not self._total_pages
+            or not self._current_page
+        ):
+            return
+
+        scheme, netloc, path, query, fragment = urlsplit(self._next_url)
+        params = [(k, v) for k, v in parse_qsl(query) if k != "page"]
+        first = int(self._current_page) + 1
+        for page in range(first, int(self._total_pages) + 1):
+            query = urlencode(params + [("page", page)])
+            self._page_urls.append(urlunsplit((scheme, netloc, path, query, fragment)))
+
+    def _schedule_pages(self, submit):
+        while self._page_urls and len(self._pending) < self._concurrency:
+            self._pending.append(submit(self._page_urls.popleft()))
+
+        # Read-ahead: request the page following the one being consumed
+        if (
+            self._prefetch
+            and not self._pending
+            and self._next_url
+            and self._get_next is True
+        ):
+            self._pending.append(submit(self._next_url))
+
+    def _submit(self, url):
+        if self._executor is None:
+            self._executor = concurrent.futures.ThreadPoolExecutor(
+                max_workers=self._concurrency
+            )
+        # The pages are requested in the context of the caller (profiles)
+        return self._executor.submit(
+            contextvars.copy_context().run,
+            self._gl.http_request,
+            "get",
+            url,
+            streamed=self._streamed,
+        )
+
+    def _asubmit(self, url):
+        return asyncio.ensure_future(
+            self._gl.http_request(
+                "get", url, streamed=self._streamed, priority=self._priority
+            )
+        )
+
+    def _release_executor(self):
+        if self._executor is not None and not self._pending:
+            self._executor.shutdown(wait=False)
+            self._executor = None
+
+    def _cancel_pending(self):
+        """Cancel the page requests in flight and forget the other pages.
+
+        Returns:
+            list: The streamed responses received but not read, to close
+        """
+        self._page_urls.clear()
+        responses = []
+        while self._pending:
+            pending = self._pending.popleft()
+            if not pending.done():
+                try:
+                    cancelled = pending.cancel()
+                except RuntimeError:
+                    # The event loop of the task is closed
+                    continue
+                if not cancelled and self._streamed:
+                    # Running in a worker thread: close the page once received
+                    pending.add_done_callback(_close_page)
+            elif not pending.cancelled():
+                # Also marks the exception of the tasks as retrieved
+                if pending.exception() is None and self._streamed:
+                    responses.append(pending.result())
+        self._release_executor()
+        return responses
+
+    def _close_pending(self):
+        for response in self._cancel_pending():
+            response.close()
+
+    async def _aclose_pending(self):
+        for response in self._cancel_pending():
+            await response.aclose()
+
+    def close(self):
+        """Stop requesting the next pages.
+
+        The page requests in flight are cancelled, the thread pool is shut
+        down and the streamed pages received are closed. Use :meth:`aclose`
+        with AsyncGitlab.
+        """
+        self._get_next = False
+        self._close_pending()
+        if self._stream is not None:
+            self._stream.close()
+            self._stream = self._chunks = None
+
+    async def aclose(self):
+        """Stop requesting the next pages (see :meth:`close`)."""
+        self._get_next = False
+        await self._aclose_pending()
+        if self._stream is not None:
+            await self._stream.aclose()
+            self._stream = self._chunks = None
+
+    def __del__(self):
+        if not getattr(self, "_pending", None):
+            return
+        if not isinstance(self._pending[0], asyncio.Future):
+            self._close_pending()
+            return
+        responses = self._cancel_pending()
+        try:
+            loop = asyncio.get_running_loop()
+        except RuntimeError:
+            return
+        for response in responses:
+            loop.create_task(response.aclose())
+
     @property
     def current_page(self):
         """The current page number."""
@@ -170,10 +416,24 @@ class GitlabList:
         except IndexError:
             pass
 
+        if self._read_items():
+            return self.next()
+
+        if self._pending:
+            try:
+                self._process_query_result(self._pending.popleft().result())
+            except BaseException:
+                self._close_pending()
+                raise
+            self._schedule_pages(self._submit)
+            self._release_executor()
+            return self.next()
+
         if self._next_url and self._get_next is True:
             self._query(self._next_url)
             return self.next()
 
+        self._close_pending()
         raise StopIteration
 
     def __aiter__(self):
@@ -190,10 +450,23 @@ class GitlabList:
         except IndexError:
             pass
 
+        if await self._aread_items():
+            return await self.anext()
+
+        if self._pending:
+            try:
+                self._process_query_result(await self._pending.popleft())
+            except BaseException:
+                await self._aclose_pending()
+                raise
+            self._schedule_pages(self._asubmit)
+            return await self.anext()
+
         if self._next_url and self._get_next is True:
-            await self._aquery(self._next_url)
+            await self._aquery(self._next_url, priority=self._priority)
             return await self.anext()
 
+        await self._aclose_pending()
         raise StopAsyncIteration
 
     async def as_list(self):
@@ -44,5 +44,7 @@ setup(
     extras_require={
         "autocompletion": ["argcomplete>=1.10.0,<2"],
         "yaml": ["PyYaml>=5.2"],
+        "orjson": ["orjson>=3"],
+        "http2": ["httpx[http2]>=0.18.1,<0.19"],
     },
 )
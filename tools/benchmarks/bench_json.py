@@ -0,0 +1,58 @@
+#!/usr/bin/env python
+"""Compare the JSON backends (``json_backend`` client option).
+
+For each backend, decode and encode a page of 100 projects with their
+statistics, then list all the projects through a client using it. The
+backends that are not installed are skipped.
+
+Usage::
+
+    python tools/benchmarks/bench_json.py --projects 20000
+"""
+
+import argparse
+import time
+
+import common
+
+from gitlab import codec
+
+
+def codec_loop(backend, page, count):
+    c = codec.get_codec(backend)
+    start = time.perf_counter()
+    for _ in range(count):
+        c.dumps(c.loads(page))
+    return time.perf_counter() - start
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--projects", type=int, default=20000)
+    parser.add_argument("--pages", type=int, default=200)
+    args = parser.parse_args()
+
+    fake = common.fake_projects(args.projects)
+    _, _, page = fake.handle(
+        "GET", "/api/v4/projects", "per_page=100&statistics=true", {}
+    )
+    backends = [b for b in codec.BACKENDS if codec.get_codec(b).name == b]
+
+    rows = []
+    for backend in backends:
+        elapsed = codec_loop(backend, page, args.pages)
+        rows.append(("%s: %d pages round-trip" % (backend, args.pages), elapsed, 0))
+
+    for backend in backends:
+        gl = fake.gitlab(json_backend=backend)
+        projects, elapsed, peak = common.measure(
+            lambda: gl.projects.list(all=True, per_page=100, statistics=True)
+        )
+        assert len(projects) == args.projects
+        rows.append(("%s: list all" % backend, elapsed, peak))
+        del projects
+    common.report(rows)
+
+
+if __name__ == "__main__":
+    main()
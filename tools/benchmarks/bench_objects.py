@@ -0,0 +1,43 @@
+#!/usr/bin/env python
+"""Measure the cost of building RESTObjects for ``projects.list(all=True)``.
+
+The ``eager`` run creates all the nested managers of each project, like
+RESTObject did before managers became lazy; the ``lazy`` run only creates
+them on access.
+
+Usage::
+
+    python tools/benchmarks/bench_objects.py --projects 10000
+"""
+
+import argparse
+
+import common
+
+
+def list_projects(gl, eager):
+    projects = gl.projects.list(all=True, per_page=100)
+    if eager:
+        for project in projects:
+            project._create_managers()
+    return projects
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--projects", type=int, default=10000)
+    args = parser.parse_args()
+
+    gl = common.fake_projects(args.projects).gitlab()
+
+    rows = []
+    for label, eager in (("eager managers", True), ("lazy managers", False)):
+        projects, elapsed, peak = common.measure(lambda: list_projects(gl, eager))
+        assert len(projects) == args.projects
+        rows.append((label, elapsed, peak))
+        del projects
+    common.report(rows)
+
+
+if __name__ == "__main__":
+    main()
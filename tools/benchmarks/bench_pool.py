@@ -0,0 +1,114 @@
+#!/usr/bin/env python
+"""Compare the connection pool settings of an AsyncGitlab client.
+
+A :class:`gitlab.fake.FakeGitlab` served over HTTP/1.1 stands in for
+GitLab: it answers ``GET /api/v4/projects/:id`` after a fixed latency, in one
+thread per connection, and counts the connections opened by the client. For
+each setting, the client fetches the projects with ``gather()`` and the
+throughput is reported. Idle connections above ``max_keepalive_connections`` are closed,
+so a pool keeping fewer connections than the requests in flight reconnects
+for most of the requests. The server delays the first response of each
+connection by ``--handshake`` milliseconds, to stand in for the TLS
+handshake.
+
+The first calls of a new client are then timed with and without
+``warmup()``.
+
+HTTP/2 is only compared when the ``h2`` package is installed and ``--url``
+points to a GitLab server (or proxy) supporting it over TLS, since httpx
+doesn't negotiate HTTP/2 without TLS.
+
+Usage::
+
+    python tools/benchmarks/bench_pool.py --requests 1000 --latency 10
+"""
+
+import argparse
+import asyncio
+import time
+
+import gitlab
+from gitlab.fake import FakeGitlab
+
+# (label, max_concurrency, pool settings). The requests in flight are kept
+# under the number of connections: with httpx < 0.19, requests waiting for a
+# connection of a full pool time out.
+SETTINGS = [
+    ("10 in flight, 10 connections", 10, {"max_connections": 10}),
+    ("100 in flight, no keep-alive", 100, {"max_keepalive_connections": 0}),
+    ("100 in flight, defaults", 100, {}),
+    ("100 in flight, 100 keep-alive", 100, {"max_keepalive_connections": 100}),
+    (
+        "200 in flight, 200 keep-alive",
+        200,
+        {"max_connections": 200, "max_keepalive_connections": 200},
+    ),
+]
+
+
+async def fetch_all(url, count, token="token", warmup=0, **kwargs):
+    async with gitlab.AsyncGitlab(
+        url, private_token=token, timeout=120, **kwargs
+    ) as gl:
+        if warmup:
+            await gl.warmup(warmup)
+        start = time.perf_counter()
+        projects = await gl.gather(
+            (gl.projects.get(i) for i in range(1, count + 1)), return_exceptions=False,
+        )
+        elapsed = time.perf_counter() - start
+    assert len(projects) == count
+    return elapsed
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--requests", type=int, default=1000)
+    parser.add_argument("--latency", type=float, default=10, help="in milliseconds")
+    parser.add_argument("--handshake", type=float, default=20, help="in milliseconds")
+    parser.add_argument("--url", help="Compare HTTP/1.1 and HTTP/2 on this server")
+    parser.add_argument("--token", help="Private token for --url")
+    args = parser.parse_args()
+
+    print("%-34s %10s %10s %12s" % ("", "time (s)", "req/s", "connections"))
+
+    fake = FakeGitlab(
+        projects=args.requests,
+        issues=0,
+        merge_requests=0,
+        jobs=0,
+        latency=args.latency / 1000,
+    )
+    server = fake.serve(handshake=args.handshake / 1000)
+    url = fake.url
+    for label, max_concurrency, settings in SETTINGS:
+        server.connections = 0
+        elapsed = asyncio.run(
+            fetch_all(url, args.requests, max_concurrency=max_concurrency, **settings)
+        )
+        print(
+            "%-34s %10.3f %10.0f %12d"
+            % (label, elapsed, args.requests / elapsed, server.connections)
+        )
+
+    for label, warmup in (("first 10 calls", 0), ("first 10 calls, warmup(10)", 10)):
+        server.connections = 0
+        elapsed = asyncio.run(fetch_all(url, 10, warmup=warmup))
+        print("%-34s %10.3f %10s %12d" % (label, elapsed, "", server.connections))
+    server.shutdown()
+
+    if args.url:
+        try:
+            import h2  # noqa
+        except ImportError:
+            print("h2 is not installed, skipping HTTP/2")
+            return
+        for label, http2 in (("HTTP/1.1", False), ("HTTP/2", True)):
+            elapsed = asyncio.run(
+                fetch_all(args.url, args.requests, token=args.token, http2=http2)
+            )
+            print("%-34s %10.3f %10.0f" % (label, elapsed, args.requests / elapsed))
+
+
+if __name__ == "__main__":
+    main()
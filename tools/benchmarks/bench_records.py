@@ -0,0 +1,37 @@
+#!/usr/bin/env python
+"""Measure the memory used by ``projects.list(all=True, compact=True)``.
+
+The ``objects`` run keeps RESTObjects, the ``records`` run keeps the compact
+read-only records. The retained column is the memory still used by the list
+once it is built.
+
+Usage::
+
+    python tools/benchmarks/bench_records.py --projects 100000
+"""
+
+import argparse
+
+import common
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--projects", type=int, default=100000)
+    args = parser.parse_args()
+
+    gl = common.fake_projects(args.projects).gitlab()
+
+    rows = []
+    for label, compact in (("objects", False), ("records", True)):
+        projects, elapsed, peak = common.measure(
+            lambda: gl.projects.list(all=True, per_page=100, compact=compact)
+        )
+        assert len(projects) == args.projects
+        rows.append((label, elapsed, peak, common.measure.retained))
+        del projects
+    common.report(rows)
+
+
+if __name__ == "__main__":
+    main()
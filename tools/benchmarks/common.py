@@ -0,0 +1,41 @@
+"""Shared helpers for the python-gitlab benchmarks.
+
+The benchmarks don't need a GitLab server: the clients use
+:class:`gitlab.fake.FakeGitlab`, which serves generated data with the GitLab
+pagination headers.
+"""
+
+import time
+import tracemalloc
+
+from gitlab.fake import FakeGitlab
+
+
+def fake_projects(count):
+    """Return a fake server holding ``count`` projects, without children."""
+    return FakeGitlab(projects=count, issues=0, merge_requests=0, jobs=0)
+
+
+def measure(func):
+    """Call ``func`` and return (result, seconds, peak allocated bytes).
+
+    The bytes still allocated when ``func`` returns (mostly the result) are
+    available as ``measure.retained``.
+    """
+    tracemalloc.start()
+    start = time.perf_counter()
+    try:
+        result = func()
+        elapsed = time.perf_counter() - start
+        measure.retained, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    return result, elapsed, peak
+
+
+def report(rows):
+    """Print a table of (label, seconds, bytes[, retained bytes]) rows."""
+    print("%-28s %10s %12s %14s" % ("", "time (s)", "peak (MiB)", "retained (MiB)"))
+    for label, elapsed, peak, *retained in rows:
+        retained = "%14.1f" % (retained[0] / 2 ** 20) if retained else ""
+        print("%-28s %10.3f %12.1f %s" % (label, elapsed, peak / 2 ** 20, retained))